@@ -111,6 +111,8 @@ BEGIN
         gameTime   TIME,
         gameType   ENUM ('preseason', 'regular season', 'playoff', 'tournament', 'exhibition'),
         status     ENUM ('scheduled', 'in progress', 'completed', 'cancelled', 'postponed', 'forfeited'),
+        homeScore  INT,
+        awayScore  INT,
         PRIMARY KEY (gameID),
         FOREIGN KEY (homeTeamID)
             REFERENCES Teams (teamID)
@@ -122,9 +124,94 @@ BEGIN
             REFERENCES Facilities (facilityID)
             ON DELETE CASCADE,
         CONSTRAINT unique_teams CHECK (homeTeamID != awayTeamID),
+        CONSTRAINT valid_scores CHECK (homeScore >= 0 AND awayScore >= 0),
         CONSTRAINT facility_in_use UNIQUE (facilityID, gameDate)
     );
 
+    -- Standings Table
+    -- One row per team (a team already belongs to one season and academic year) holding
+    -- its record from counted games: completed or forfeited, with both scores entered.
+    -- Kept up to date incrementally by the game procedures in PL.sql.
+    DROP TABLE IF EXISTS Standings;
+    CREATE TABLE Standings
+    (
+        teamID        INT(11) NOT NULL,
+        gamesPlayed   INT     NOT NULL DEFAULT 0,
+        wins          INT     NOT NULL DEFAULT 0,
+        losses        INT     NOT NULL DEFAULT 0,
+        ties          INT     NOT NULL DEFAULT 0,
+        pointsFor     INT     NOT NULL DEFAULT 0,
+        pointsAgainst INT     NOT NULL DEFAULT 0,
+        PRIMARY KEY (teamID),
+        FOREIGN KEY (teamID)
+            REFERENCES Teams (teamID)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE
+    );
+
+    -- RosterView Table
+    -- Denormalized, display-ready copy of each Players row with its athlete, team and
+    -- school details, so /players and /players/roster read one table instead of a
+    -- four-way join. Rows are refreshed by the player, athlete and team procedures in
+    -- PL.sql and go away with their Players row.
+    DROP TABLE IF EXISTS RosterView;
+    CREATE TABLE RosterView
+    (
+        playerID     INT(11)      NOT NULL,
+        athleteID    INT(11)      NOT NULL,
+        teamID       INT(11)      NOT NULL,
+        firstName    VARCHAR(120) NOT NULL,
+        lastName     VARCHAR(120) NOT NULL,
+        school       VARCHAR(120) NOT NULL,
+        sportType    VARCHAR(20)  NOT NULL,
+        varsityJv    VARCHAR(10)  NOT NULL,
+        academicYear YEAR         NOT NULL,
+        eligible     CHAR(1)      NOT NULL,
+        active       CHAR(1)      NOT NULL,
+        PRIMARY KEY (playerID),
+        FOREIGN KEY (playerID)
+            REFERENCES Players (playerID)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        INDEX idx_roster_team (teamID),
+        INDEX idx_roster_athlete (athleteID),
+        INDEX idx_roster_last_name (lastName)
+    ) DEFAULT CHARSET = utf8mb4;  -- eligible / active hold '✓' / '✗'
+
+    /*
+        SECONDARY INDEXES
+        Covering indexes for the app's access paths. Lookups already served by a
+        key are noted instead of indexed twice:
+        - Teams by schoolID (/players/teams, /players/updateTeams): unique_teams leads with schoolID
+        - Players by athleteID (eligible-team anti-joins): unique_players leads with athleteID
+        - Players by teamID (sp_RefreshRoster for a team): FK index on teamID
+        - RosterView by teamID / athleteID / lastName: declared with the table above
+        - Games by facility and date: facility_in_use (facilityID, gameDate)
+    */
+
+    -- /games/teams filters by sportType; /games counts teams per sportType
+    CREATE INDEX idx_teams_sport ON Teams (sportType, schoolID, varsityJv, academicYear);
+
+    -- Schedule listings and exports order Games by date and time
+    CREATE INDEX idx_games_date ON Games (gameDate, gameTime);
+
+    -- Per-team schedule and double-booking lookups (also serve the home / away FKs)
+    CREATE INDEX idx_games_home_date ON Games (homeTeamID, gameDate, gameTime);
+    CREATE INDEX idx_games_away_date ON Games (awayTeamID, gameDate, gameTime);
+
+    /*
+        SEARCH INDEXES
+        Prefix search (/search, database/search.py) reads `name LIKE 'term%'` as a
+        range on these, in index order. Schools.name is already indexed by distinct_name.
+    */
+
+    -- Athletes by last name / first name, and by "first last" or "last first"
+    CREATE INDEX idx_athletes_last_name ON Athletes (lastName, firstName, schoolID);
+    CREATE INDEX idx_athletes_first_name ON Athletes (firstName, lastName, schoolID);
+
+    CREATE INDEX idx_teams_name ON Teams (teamName);
+    CREATE INDEX idx_facilities_name ON Facilities (facilityName);
+
     /*
         INSERT DATA
     */
@@ -337,7 +424,7 @@ BEGIN
             (SELECT athleteID FROM Athletes WHERE firstName = 'Matthew' AND lastName = 'Taylor'));
 
     -- Games table
-    INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status) VALUES
+    INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, homeScore, awayScore) VALUES
     (
         (SELECT teamID FROM Teams WHERE teamName='Lincoln Lions' AND sportType='football' AND varsityJv='varsity'),
         (SELECT teamID FROM Teams WHERE teamName='Jefferson Jaguars' AND sportType='basketball' AND varsityJv='varsity'),
@@ -345,7 +432,9 @@ BEGIN
         '2024-09-15',
         '19:00:00',
         'regular season',
-        'scheduled'
+        'scheduled',
+        NULL,
+        NULL
     ),
     (
         (SELECT teamID FROM Teams WHERE teamName='Lincoln Lions' AND sportType='volleyball' AND varsityJv='varsity'),
@@ -354,7 +443,9 @@ BEGIN
         '2024-10-20',
         '17:30:00',
         'tournament',
-        'scheduled'
+        'scheduled',
+        NULL,
+        NULL
     ),
     (
         (SELECT teamID FROM Teams WHERE teamName='Jefferson Jaguars' AND sportType='soccer' AND varsityJv='jv'),
@@ -363,7 +454,9 @@ BEGIN
         '2024-11-10',
         '16:00:00',
         'exhibition',
-        'scheduled'
+        'scheduled',
+        NULL,
+        NULL
     ),
     (
         (SELECT teamID FROM Teams WHERE teamName='Washington Wildcats' AND sportType='tennis' AND varsityJv='varsity'),
@@ -372,7 +465,9 @@ BEGIN
         '2024-04-12',
         '15:00:00',
         'preseason',
-        'completed'
+        'completed',
+        6,
+        2
     ),
     (
         (SELECT teamID FROM Teams WHERE teamName='Roosevelt Ravens' AND sportType='basketball' AND varsityJv='jv'),
@@ -381,12 +476,160 @@ BEGIN
         '2024-12-05',
         '18:00:00',
         'regular season',
-        'scheduled'
+        'scheduled',
+        NULL,
+        NULL
     );
 
+    -- Standings for the sample results, and the roster read model
+    CALL sp_rebuild_standings();
+    CALL sp_rebuild_roster();
+
     SET FOREIGN_KEY_CHECKS = 1;
     COMMIT;
 
+    -- Keep a copy of the sample data for sp_reset_athleticsdb
+    CALL sp_snapshot_seed();
+
+END //
+
+DELIMITER ;
+
+
+/*
+    FAST RESET
+    sp_load_athleticsdb snapshots the sample rows into seed_* tables. sp_reset_athleticsdb
+    then restores them in one CALL: TRUNCATE (no DROP / CREATE, indexes and
+    AUTO_INCREMENT counters reset in place) followed by one INSERT ... SELECT per table.
+    If there is no snapshot yet, it falls back to the full sp_load_athleticsdb.
+
+    The reset is not atomic. TRUNCATE commits implicitly, so if an INSERT fails the
+    tables after it stay empty until the next successful reset; the caller cannot roll
+    it back. (Swapping in *_new tables with one RENAME TABLE does not work here: the
+    foreign keys of the remaining tables would follow the renamed originals.)
+
+    The seed_* tables are copied with CREATE TABLE ... AS SELECT, so they keep the column
+    list of the schema they were taken from. After any change to the tables above, run
+    a full reset (sp_load_athleticsdb, or /reset-database with mode=full) to retake the
+    snapshot; the fast path would otherwise copy the old columns.
+*/
+
+-- Snapshots are rebuilt from the current schema, so re-running this file discards them
+DROP TABLE IF EXISTS seed_Schools, seed_Teams, seed_Facilities, seed_Athletes, seed_Players, seed_Games,
+    seed_Standings, seed_RosterView;
+
+DROP PROCEDURE IF EXISTS sp_snapshot_seed;
+DROP PROCEDURE IF EXISTS sp_reset_athleticsdb;
+
+DELIMITER //
+
+CREATE PROCEDURE sp_snapshot_seed()
+BEGIN
+    DROP TABLE IF EXISTS seed_Schools, seed_Teams, seed_Facilities, seed_Athletes, seed_Players, seed_Games,
+    seed_Standings, seed_RosterView;
+
+    CREATE TABLE seed_Schools AS SELECT * FROM Schools;
+    CREATE TABLE seed_Teams AS SELECT * FROM Teams;
+    CREATE TABLE seed_Facilities AS SELECT * FROM Facilities;
+    CREATE TABLE seed_Athletes AS SELECT * FROM Athletes;
+    CREATE TABLE seed_Players AS SELECT * FROM Players;
+    CREATE TABLE seed_Games AS SELECT * FROM Games;
+    CREATE TABLE seed_Standings AS SELECT * FROM Standings;
+    CREATE TABLE seed_RosterView AS SELECT * FROM RosterView;
+END //
+
+CREATE PROCEDURE sp_reset_athleticsdb()
+BEGIN
+    -- Never leave the pooled session with foreign key checks off
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET FOREIGN_KEY_CHECKS = 1;
+        RESIGNAL;
+    END;
+
+    IF (SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = 'seed_RosterView') = 0 THEN
+        CALL sp_load_athleticsdb();
+    ELSE
+        SET FOREIGN_KEY_CHECKS = 0;
+
+        TRUNCATE TABLE RosterView;
+        TRUNCATE TABLE Standings;
+        TRUNCATE TABLE Games;
+        TRUNCATE TABLE Players;
+        TRUNCATE TABLE Athletes;
+        TRUNCATE TABLE Facilities;
+        TRUNCATE TABLE Teams;
+        TRUNCATE TABLE Schools;
+
+        INSERT INTO Schools SELECT * FROM seed_Schools;
+        INSERT INTO Teams SELECT * FROM seed_Teams;
+        INSERT INTO Facilities SELECT * FROM seed_Facilities;
+        INSERT INTO Athletes SELECT * FROM seed_Athletes;
+        INSERT INTO Players SELECT * FROM seed_Players;
+        INSERT INTO Games SELECT * FROM seed_Games;
+        INSERT INTO Standings SELECT * FROM seed_Standings;
+        INSERT INTO RosterView SELECT * FROM seed_RosterView;
+
+        SET FOREIGN_KEY_CHECKS = 1;
+    END IF;
+END //
+
+DELIMITER ;
+
+
+/*
+    STANDINGS
+    Full rebuild from Games, used only when the data is bulk-loaded. Day-to-day
+    changes are applied incrementally by sp_ApplyGameResult (PL.sql).
+*/
+
+DROP PROCEDURE IF EXISTS sp_rebuild_standings;
+
+DELIMITER //
+
+CREATE PROCEDURE sp_rebuild_standings()
+BEGIN
+    DELETE FROM Standings;
+
+    INSERT INTO Standings (teamID, gamesPlayed, wins, losses, ties, pointsFor, pointsAgainst)
+    SELECT teamID, COUNT(*), SUM(scored > allowed), SUM(scored < allowed), SUM(scored = allowed),
+           SUM(scored), SUM(allowed)
+    FROM (
+        SELECT homeTeamID AS teamID, homeScore AS scored, awayScore AS allowed FROM Games
+        WHERE status IN ('completed', 'forfeited') AND homeScore IS NOT NULL AND awayScore IS NOT NULL
+        UNION ALL
+        SELECT awayTeamID, awayScore, homeScore FROM Games
+        WHERE status IN ('completed', 'forfeited') AND homeScore IS NOT NULL AND awayScore IS NOT NULL
+    ) AS results
+    GROUP BY teamID;
+END //
+
+DELIMITER ;
+
+
+/*
+    ROSTER READ MODEL
+    Full rebuild of RosterView from Players, used only when the data is bulk-loaded.
+    Day-to-day changes are applied by sp_RefreshRoster (PL.sql).
+*/
+
+DROP PROCEDURE IF EXISTS sp_rebuild_roster;
+
+DELIMITER //
+
+CREATE PROCEDURE sp_rebuild_roster()
+BEGIN
+    DELETE FROM RosterView;
+
+    INSERT INTO RosterView (playerID, athleteID, teamID, firstName, lastName, school, sportType, varsityJv,
+                            academicYear, eligible, active)
+    SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv,
+           t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗')
+    FROM Players AS p
+    JOIN Athletes AS a ON a.athleteID = p.athleteID
+    JOIN Teams AS t ON t.teamID = p.teamID
+    JOIN Schools AS s ON s.schoolID = a.schoolID;
 END //
 
-DELIMITER ;
\ No newline at end of file
+DELIMITER ;
@@ -111,20 +111,19 @@ INSERT INTO Players (teamID, athleteID)
 VALUES (@teamIdInput, @athleteIdInput);
 
 -- Read All Players: retrieves full list of players with associated athlete and team information
-SELECT 
-  p.playerID as id,
-  a.firstName as first_name,
-  a.lastName as last_name,
-  s.name AS school,
-  t.sportType as sport,
-  t.varsityJv as 'varsity_/_JV',
-  t.academicYear as academic_year,
-  IF(a.isEligible, '✓', '✗') AS eligible,
-  IF(a.isActive, '✓', '✗') AS active
-FROM Players AS p
-JOIN Athletes AS a ON p.athleteID = a.athleteID
-JOIN Teams AS t ON p.teamID = t.teamID
-JOIN Schools AS s ON s.schoolID = a.schoolID;
+-- from the denormalized RosterView read model (kept in sync by the procedures in PL.sql)
+SELECT
+  r.playerID as id,
+  r.firstName as first_name,
+  r.lastName as last_name,
+  r.school,
+  r.sportType as sport,
+  r.varsityJv as 'varsity_/_JV',
+  r.academicYear as academic_year,
+  r.eligible,
+  r.active
+FROM RosterView AS r
+ORDER BY r.playerID;
 
 -- Update: An athlete can be assigned to a different team, but a player cannot be changed to a different athlete
 UPDATE Players
@@ -172,6 +171,32 @@ JOIN Teams AS t ON p.teamID = t.teamID
 JOIN Schools AS s ON s.schoolID = a.schoolID
 WHERE a.athleteID = @athleteIdInput;
 
+-- Read Roster (as served by /players/roster): one team's rows of the RosterView read model
+SELECT
+  r.playerID as id,
+  r.firstName as first_name,
+  r.lastName as last_name,
+  r.school,
+  r.sportType as sport,
+  r.varsityJv as 'varsity_/_JV',
+  r.academicYear as academic_year,
+  r.eligible,
+  r.active
+FROM RosterView AS r
+WHERE r.teamID = @teamIdInput
+ORDER BY r.playerID;
+
+-- Refresh the RosterView rows of one player (see sp_RefreshRoster in PL.sql)
+REPLACE INTO RosterView (playerID, athleteID, teamID, firstName, lastName, school, sportType, varsityJv,
+                         academicYear, eligible, active)
+SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv,
+       t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗')
+FROM Players AS p
+JOIN Athletes AS a ON a.athleteID = p.athleteID
+JOIN Teams AS t ON t.teamID = p.teamID
+JOIN Schools AS s ON s.schoolID = a.schoolID
+WHERE p.playerID = @playerIdInput;
+
 -- Update Player / Team dropdown select: Filters teams in Player creation dropdown by selected Athlete's school
 SELECT
   teamID,
@@ -184,6 +209,38 @@ JOIN Teams as t ON s.schoolID = t.schoolID
 JOIN Athletes as a ON a.schoolID = s.schoolID
 WHERE a.athleteID = @teamIDInput;
 
+-- Create Player / Team dropdown select: teams at the athlete's school they are not already on
+-- (anti-join on Players' (athleteID, teamID) unique key instead of a NOT IN subquery)
+SELECT
+  t.teamID,
+  s.name AS schoolName,
+  t.teamName,
+  t.sportType,
+  t.varsityJv,
+  t.academicYear
+FROM Athletes AS a
+JOIN Teams AS t ON t.schoolID = a.schoolID
+JOIN Schools AS s ON s.schoolID = t.schoolID
+LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID
+WHERE a.athleteID = @athleteIdInput AND p.playerID IS NULL;
+
+-- Update Player / Team dropdown select: teams an existing player can be moved to,
+-- resolving the athlete and school from the playerID in the same statement
+SELECT
+  t.teamID,
+  s.name AS schoolName,
+  t.teamName,
+  t.sportType,
+  t.varsityJv,
+  t.seasonName,
+  t.academicYear
+FROM Players AS cur
+JOIN Athletes AS a ON a.athleteID = cur.athleteID
+JOIN Teams AS t ON t.schoolID = a.schoolID
+JOIN Schools AS s ON s.schoolID = t.schoolID
+LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID
+WHERE cur.playerID = @playerIdInput AND p.playerID IS NULL;
+
 
 
 /****************
@@ -191,8 +248,9 @@ WHERE a.athleteID = @teamIDInput;
 *****************/
 
 -- Create
-INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status)
-VALUES (@homeTeamIdInput, @awayTeamIdInput, @facilityIdInput, @gameDateInput, @gameTimeInput, @gameTypeInput, @statusInput);
+INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, homeScore, awayScore)
+VALUES (@homeTeamIdInput, @awayTeamIdInput, @facilityIdInput, @gameDateInput, @gameTimeInput, @gameTypeInput, @statusInput,
+        @homeScoreInput, @awayScoreInput);
 
 -- Read: Retrieves the list of games and relevant details to display
 -- including team names, location details, times, type and status
@@ -205,7 +263,8 @@ SELECT
   g.gameDate AS game_date,
   g.gameTime as game_time,
   g.gameType as game_type,
-  g.status
+  g.status,
+  COALESCE(CONCAT(g.homeScore, ' - ', g.awayScore), '') AS score
 FROM Games AS g JOIN Teams AS ht ON g.homeTeamID = ht.teamID
 JOIN Teams AS at ON g.awayTeamID = at.teamID
 JOIN Facilities AS f ON g.facilityID = f.facilityID
@@ -220,13 +279,52 @@ SET
   gameDate = @gameDateInput,
   gameTime = @gameTimeInput,
   gameType = @gameTypeInput,
-  status = @statusInput
+  status = @statusInput,
+  homeScore = @homeScoreInput,
+  awayScore = @awayScoreInput
 WHERE gameID = @gameIdInput;
 
 -- Delete
 DELETE FROM Games
 WHERE gameID = @gameIdInput;
 
+-- Standings: apply one counted result (or take it back with negated values) for a team
+INSERT INTO Standings (teamID, gamesPlayed, wins, losses, ties, pointsFor, pointsAgainst)
+VALUES (@teamIdInput, 1, @winInput, @lossInput, @tieInput, @pointsForInput, @pointsAgainstInput)
+ON DUPLICATE KEY UPDATE
+  gamesPlayed = gamesPlayed + VALUES(gamesPlayed),
+  wins = wins + VALUES(wins),
+  losses = losses + VALUES(losses),
+  ties = ties + VALUES(ties),
+  pointsFor = pointsFor + VALUES(pointsFor),
+  pointsAgainst = pointsAgainst + VALUES(pointsAgainst);
+
+-- Schedule a season: existing bookings in the season window for the scheduled teams / their facilities
+SELECT homeTeamID, awayTeamID, facilityID, gameDate
+FROM Games
+WHERE gameDate BETWEEN @seasonStartInput AND @seasonEndInput
+AND (facilityID IN (SELECT facilityID FROM Facilities WHERE schoolID IN (@schoolIdsInput))
+     OR homeTeamID IN (@teamIdsInput) OR awayTeamID IN (@teamIdsInput));
+
+-- Schedule a season: every generated game in one multi-row insert
+INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status)
+VALUES (@homeTeamIdInput, @awayTeamIdInput, @facilityIdInput, @gameDateInput, @gameTimeInput, @gameTypeInput, 'scheduled'),
+       (@homeTeamIdInput2, @awayTeamIdInput2, @facilityIdInput2, @gameDateInput2, @gameTimeInput, @gameTypeInput, 'scheduled');
+
+-- Conflict check: games already booked at the proposed facilities / by the proposed teams on those dates
+-- (one row-constructor IN list per kind for the whole batch)
+SELECT gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, status
+FROM Games
+WHERE (facilityID, gameDate) IN ((@facilityIdInput, @gameDateInput), (@facilityIdInput2, @gameDateInput2));
+
+SELECT gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, status
+FROM Games
+WHERE (homeTeamID, gameDate) IN ((@teamIdInput, @gameDateInput), (@teamIdInput2, @gameDateInput2));
+
+SELECT gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, status
+FROM Games
+WHERE (awayTeamID, gameDate) IN ((@teamIdInput, @gameDateInput), (@teamIdInput2, @gameDateInput2));
+
 -- Read team list for create game dropdowns
 SELECT
   teamID,
@@ -258,4 +356,22 @@ SELECT
   t.varsityJv,
   t.academicYear
 FROM Teams as t JOIN Schools as s ON t.schoolID = s.schoolID
-WHERE t.sportType = @sportTypeInput;
\ No newline at end of file
+WHERE t.sportType = @sportTypeInput;
+
+
+
+/****************
+  Standings Page
+*****************/
+
+-- Read: one sport's standings (teams without a counted game show 0-0-0), ranked by win percentage
+SELECT t.teamID AS id, s.name AS school, t.teamName AS team_name, t.varsityJv AS level,
+       t.academicYear AS academic_year, COALESCE(st.gamesPlayed, 0) AS played,
+       COALESCE(st.wins, 0) AS wins, COALESCE(st.losses, 0) AS losses, COALESCE(st.ties, 0) AS ties,
+       COALESCE(st.pointsFor, 0) AS points_for, COALESCE(st.pointsAgainst, 0) AS points_against,
+       COALESCE(st.pointsFor - st.pointsAgainst, 0) AS difference
+FROM Teams AS t JOIN Schools AS s ON s.schoolID = t.schoolID
+LEFT JOIN Standings AS st ON st.teamID = t.teamID
+WHERE t.sportType = @sportTypeInput
+ORDER BY t.academicYear DESC, t.varsityJv,
+         COALESCE((st.wins + st.ties / 2) / NULLIF(st.gamesPlayed, 0), 0) DESC, difference DESC, t.teamID;
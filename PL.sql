@@ -5,6 +5,66 @@ Adapted from: CS340 Module 8 Exploration: Implementing CUD Operations In Your Ap
 Source URL: https://canvas.oregonstate.edu/courses/2017561/pages/exploration-implementing-cud-operations-in-your-app?module_item_id=25645149
 */
 
+/*
+Transactions: the create / update / delete procedures do not start or commit a
+transaction of their own. The app calls them inside db.transaction() (see
+database/db_connector.py), which commits the CALL together with any statements
+that follow it in the same block (RosterView refreshes, reading back the new ID)
+or rolls all of it back. Call them inside START TRANSACTION ... COMMIT elsewhere.
+*/
+
+/****************
+  RosterView
+*****************/
+
+-- REFRESH helper for the roster read model (RosterView, see DDL.sql)
+-- Re-projects the RosterView rows of one player, every player of an athlete, or every
+-- player on a team (pass exactly one ID; the others NULL). Deleted players need no
+-- refresh: their RosterView rows cascade away with the Players row.
+-- Runs inside the caller's transaction.
+DROP PROCEDURE IF EXISTS sp_RefreshRoster;
+
+DELIMITER //
+CREATE PROCEDURE sp_RefreshRoster(
+    IN r_playerID INT(11),
+    IN r_athleteID INT(11),
+    IN r_teamID INT(11)
+)
+BEGIN
+    IF r_playerID IS NOT NULL THEN
+        REPLACE INTO RosterView (playerID, athleteID, teamID, firstName, lastName, school, sportType, varsityJv,
+                                 academicYear, eligible, active)
+        SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv,
+               t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗')
+        FROM Players AS p
+        JOIN Athletes AS a ON a.athleteID = p.athleteID
+        JOIN Teams AS t ON t.teamID = p.teamID
+        JOIN Schools AS s ON s.schoolID = a.schoolID
+        WHERE p.playerID = r_playerID;
+    ELSEIF r_athleteID IS NOT NULL THEN
+        REPLACE INTO RosterView (playerID, athleteID, teamID, firstName, lastName, school, sportType, varsityJv,
+                                 academicYear, eligible, active)
+        SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv,
+               t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗')
+        FROM Players AS p
+        JOIN Athletes AS a ON a.athleteID = p.athleteID
+        JOIN Teams AS t ON t.teamID = p.teamID
+        JOIN Schools AS s ON s.schoolID = a.schoolID
+        WHERE p.athleteID = r_athleteID;
+    ELSEIF r_teamID IS NOT NULL THEN
+        REPLACE INTO RosterView (playerID, athleteID, teamID, firstName, lastName, school, sportType, varsityJv,
+                                 academicYear, eligible, active)
+        SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv,
+               t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗')
+        FROM Players AS p
+        JOIN Athletes AS a ON a.athleteID = p.athleteID
+        JOIN Teams AS t ON t.teamID = p.teamID
+        JOIN Schools AS s ON s.schoolID = a.schoolID
+        WHERE p.teamID = r_teamID;
+    END IF;
+END //
+DELIMITER ;
+
 /****************
   Athletes Table
 *****************/
@@ -37,18 +97,16 @@ BEGIN
     END;
 
     -- Create athlete
-    START TRANSACTION;
-        INSERT INTO Athletes(schoolID, firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact)
-        VALUES(a_schoolID, a_firstName, a_lastName, a_gradeLevel, a_isEligible, a_isActive, a_emergencyContact);
-
-        -- Raise error if create fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('Athlete was not created: ', a_firstName, ' ', a_lastName);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-
-        SET athleteID = LAST_INSERT_ID();
-    COMMIT;
+    INSERT INTO Athletes(schoolID, firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact)
+    VALUES(a_schoolID, a_firstName, a_lastName, a_gradeLevel, a_isEligible, a_isActive, a_emergencyContact);
+
+    -- Raise error if create fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('Athlete was not created: ', a_firstName, ' ', a_lastName);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    SET athleteID = LAST_INSERT_ID();
 END //
 DELIMITER ;
 
@@ -80,24 +138,25 @@ BEGIN
     END;
 
     -- Update athlete
-    START TRANSACTION;
-        UPDATE Athletes
-        SET
-            schoolID = a_schoolID,
-            firstName = a_firstName,
-            lastName = a_lastName,
-            gradeLevel = a_gradeLevel,
-            isEligible = a_isEligible,
-            isActive = a_isActive,
-            emergencyContact = a_emergencyContact
-        WHERE athleteID = a_id;
-
-        -- Raise error if update fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('No matching athlete found for id: ', a_id);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-    COMMIT;
+    UPDATE Athletes
+    SET
+        schoolID = a_schoolID,
+        firstName = a_firstName,
+        lastName = a_lastName,
+        gradeLevel = a_gradeLevel,
+        isEligible = a_isEligible,
+        isActive = a_isActive,
+        emergencyContact = a_emergencyContact
+    WHERE athleteID = a_id;
+
+    -- Raise error if update fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('No matching athlete found for id: ', a_id);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    -- Names, school and eligibility are copied onto each of the athlete's roster rows
+    CALL sp_RefreshRoster(NULL, a_id, NULL);
 END //
 DELIMITER ;
 
@@ -122,17 +181,14 @@ BEGIN
     END;
 
     -- Delete athlete
-    START TRANSACTION;
-        DELETE FROM Athletes WHERE athleteID = a_ID;
-
-        -- ROW_COUNT() returns the number of rows affected by the preceding statement.
-        IF ROW_COUNT() = 0 THEN
-            set error_message = CONCAT('No matching record found in Athletes for athleteID: ', a_ID);
-            -- Trigger custom error, invoke EXIT HANDLER
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
+    DELETE FROM Athletes WHERE athleteID = a_ID;
 
-    COMMIT;
+    -- ROW_COUNT() returns the number of rows affected by the preceding statement.
+    IF ROW_COUNT() = 0 THEN
+        set error_message = CONCAT('No matching record found in Athletes for athleteID: ', a_ID);
+        -- Trigger custom error, invoke EXIT HANDLER
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
 
 END //
 DELIMITER ;
@@ -188,18 +244,16 @@ BEGIN
     END IF;
 
     -- Create team
-    START TRANSACTION;
-        INSERT INTO Teams(schoolID, teamName, sportType, varsityJv, seasonName, academicYear)
-        VALUES(t_schoolID, t_teamName, t_sportType, t_varsityJv, t_seasonName, t_academicYear);
-
-        -- Raise error if create fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('Team was not created: ', t_teamName);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-
-        SET teamID = LAST_INSERT_ID();
-    COMMIT;
+    INSERT INTO Teams(schoolID, teamName, sportType, varsityJv, seasonName, academicYear)
+    VALUES(t_schoolID, t_teamName, t_sportType, t_varsityJv, t_seasonName, t_academicYear);
+
+    -- Raise error if create fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('Team was not created: ', t_teamName);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    SET teamID = LAST_INSERT_ID();
 END //
 DELIMITER ;
 
@@ -250,23 +304,24 @@ BEGIN
     END IF;
 
     -- Update team
-    START TRANSACTION;
-        UPDATE Teams
-        SET
-            schoolID = t_schoolID,
-            teamName = t_teamName,
-            sportType = t_sportType,
-            varsityJv = t_varsityJv,
-            seasonName = t_seasonName,
-            academicYear = t_academicYear
-        WHERE teamID = t_id;
-
-        -- Raise error if update fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('No matching team found for id: ', t_id);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-    COMMIT;
+    UPDATE Teams
+    SET
+        schoolID = t_schoolID,
+        teamName = t_teamName,
+        sportType = t_sportType,
+        varsityJv = t_varsityJv,
+        seasonName = t_seasonName,
+        academicYear = t_academicYear
+    WHERE teamID = t_id;
+
+    -- Raise error if update fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('No matching team found for id: ', t_id);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    -- Sport, level and year are copied onto each of the team's roster rows
+    CALL sp_RefreshRoster(NULL, NULL, t_id);
 END //
 DELIMITER ;
 
@@ -291,17 +346,37 @@ BEGIN
     END;
 
     -- Delete team
-    START TRANSACTION;
-        DELETE FROM Teams WHERE teamID = t_ID;
-
-        -- ROW_COUNT() returns the number of rows affected by the preceding statement.
-        IF ROW_COUNT() = 0 THEN
-            set error_message = CONCAT('No matching record found in Teams for teamID: ', t_ID);
-            -- Trigger custom error, invoke EXIT HANDLER
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-
-    COMMIT;
+    -- The team's games cascade away with it, so take their results back out of
+    -- the opponents' standings first (the team's own row cascades too)
+    UPDATE Standings AS s
+    JOIN (
+        SELECT IF(homeTeamID = t_ID, awayTeamID, homeTeamID) AS teamID,
+               COUNT(*) AS played,
+               SUM(IF(homeTeamID = t_ID, awayScore > homeScore, homeScore > awayScore)) AS won,
+               SUM(IF(homeTeamID = t_ID, awayScore < homeScore, homeScore < awayScore)) AS lost,
+               SUM(homeScore = awayScore) AS tied,
+               SUM(IF(homeTeamID = t_ID, awayScore, homeScore)) AS scored,
+               SUM(IF(homeTeamID = t_ID, homeScore, awayScore)) AS allowed
+        FROM Games
+        WHERE (homeTeamID = t_ID OR awayTeamID = t_ID)
+          AND status IN ('completed', 'forfeited') AND homeScore IS NOT NULL AND awayScore IS NOT NULL
+        GROUP BY IF(homeTeamID = t_ID, awayTeamID, homeTeamID)
+    ) AS r ON r.teamID = s.teamID
+    SET s.gamesPlayed = s.gamesPlayed - r.played,
+        s.wins = s.wins - r.won,
+        s.losses = s.losses - r.lost,
+        s.ties = s.ties - r.tied,
+        s.pointsFor = s.pointsFor - r.scored,
+        s.pointsAgainst = s.pointsAgainst - r.allowed;
+
+    DELETE FROM Teams WHERE teamID = t_ID;
+
+    -- ROW_COUNT() returns the number of rows affected by the preceding statement.
+    IF ROW_COUNT() = 0 THEN
+        set error_message = CONCAT('No matching record found in Teams for teamID: ', t_ID);
+        -- Trigger custom error, invoke EXIT HANDLER
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
 
 END //
 DELIMITER ;
@@ -331,16 +406,13 @@ BEGIN
     END;
 
     -- Delete player
-    START TRANSACTION;
-        DELETE FROM Players WHERE playerID = p_ID;
-
-        -- Raise error if delete fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('No matching player found for id: ', p_ID);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
+    DELETE FROM Players WHERE playerID = p_ID;
 
-    COMMIT;
+    -- Raise error if delete fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('No matching player found for id: ', p_ID);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
 END //
 DELIMITER ;
 
@@ -367,18 +439,19 @@ BEGIN
     END;
 
     -- Create player
-    START TRANSACTION;
-        INSERT INTO Players(athleteID, teamID)
-        VALUES(athleteID, teamID);
-
-        -- Raise error if create fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('Player was not created for athleteID: ', athleteID, ' teamID: ', teamID);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-
-        SET playerID = LAST_INSERT_ID();
-    COMMIT;
+    INSERT INTO Players(athleteID, teamID)
+    VALUES(athleteID, teamID);
+
+    -- Raise error if create fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('Player was not created for athleteID: ', athleteID, ' teamID: ', teamID);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    SET playerID = LAST_INSERT_ID();
+
+    -- Add the new player to the roster read model
+    CALL sp_RefreshRoster(playerID, NULL, NULL);
 END //
 DELIMITER ;
 
@@ -404,17 +477,17 @@ BEGIN
         END;
 
     -- Update player
-    START TRANSACTION;
-        UPDATE Players
-        SET teamID = updateTeamID
-        WHERE playerID = updatePlayerID;
+    UPDATE Players
+    SET teamID = updateTeamID
+    WHERE playerID = updatePlayerID;
 
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = 'Player team assignment update failed';
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = 'Player team assignment update failed';
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
 
-    COMMIT;
+    -- Copy the new team's details onto the player's roster row
+    CALL sp_RefreshRoster(updatePlayerID, NULL, NULL);
 
 END //
 
@@ -423,6 +496,40 @@ DELIMITER ;
 /****************
   Games Table
 *****************/
+-- STANDINGS helper
+-- Adds (a_direction = 1) or takes back (a_direction = -1) one game's result in Standings.
+-- Only completed or forfeited games with both scores entered count; anything else is a no-op.
+-- Runs inside the caller's transaction.
+DROP PROCEDURE IF EXISTS sp_ApplyGameResult;
+
+DELIMITER //
+CREATE PROCEDURE sp_ApplyGameResult(
+    IN a_home INT(11),
+    IN a_away INT(11),
+    IN a_homeScore INT,
+    IN a_awayScore INT,
+    IN a_status ENUM ('scheduled', 'in progress', 'completed', 'cancelled', 'postponed', 'forfeited'),
+    IN a_direction INT
+)
+BEGIN
+    IF a_status IN ('completed', 'forfeited') AND a_homeScore IS NOT NULL AND a_awayScore IS NOT NULL THEN
+        INSERT INTO Standings (teamID, gamesPlayed, wins, losses, ties, pointsFor, pointsAgainst)
+        VALUES
+            (a_home, a_direction, a_direction * (a_homeScore > a_awayScore), a_direction * (a_homeScore < a_awayScore),
+             a_direction * (a_homeScore = a_awayScore), a_direction * a_homeScore, a_direction * a_awayScore),
+            (a_away, a_direction, a_direction * (a_awayScore > a_homeScore), a_direction * (a_awayScore < a_homeScore),
+             a_direction * (a_homeScore = a_awayScore), a_direction * a_awayScore, a_direction * a_homeScore)
+        ON DUPLICATE KEY UPDATE
+            gamesPlayed = gamesPlayed + VALUES(gamesPlayed),
+            wins = wins + VALUES(wins),
+            losses = losses + VALUES(losses),
+            ties = ties + VALUES(ties),
+            pointsFor = pointsFor + VALUES(pointsFor),
+            pointsAgainst = pointsAgainst + VALUES(pointsAgainst);
+    END IF;
+END //
+
+DELIMITER ;
 
 -- CREATE procedure
 -- Adapted from: CS340 Module 8 Exploration: Implementing CUD Operations In Your App
@@ -438,6 +545,8 @@ CREATE PROCEDURE sp_CreateGame(
     IN gameTime TIME,
     IN gameType ENUM ('preseason', 'regular season', 'playoff', 'tournament', 'exhibition'),
     IN status ENUM ('scheduled', 'in progress', 'completed', 'cancelled', 'postponed', 'forfeited'),
+    IN homeScore INT,
+    IN awayScore INT,
     OUT gameID INT(11)
 )
 BEGIN
@@ -451,18 +560,19 @@ BEGIN
     END;
 
     -- Create game
-    START TRANSACTION;
-        INSERT INTO Games(homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status)
-        VALUES (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status);
-
-        -- Raise error if create fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = 'Game was not created';
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-
-        SET gameID = LAST_INSERT_ID();
-    COMMIT;
+    INSERT INTO Games(homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, homeScore, awayScore)
+    VALUES (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, homeScore, awayScore);
+
+    -- Raise error if create fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = 'Game was not created';
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    SET gameID = LAST_INSERT_ID();
+
+    -- Count the result, if the game already has one
+    CALL sp_ApplyGameResult(homeTeamID, awayTeamID, homeScore, awayScore, status, 1);
 END //
 
 DELIMITER ;
@@ -479,6 +589,8 @@ CREATE PROCEDURE sp_DeleteGame(
 )
 BEGIN
     DECLARE error_message VARCHAR(255);
+    DECLARE old_home, old_away, old_homeScore, old_awayScore INT;
+    DECLARE old_status VARCHAR(20);
 
     -- Exit handler
     DECLARE EXIT HANDLER FOR SQLEXCEPTION
@@ -488,16 +600,20 @@ BEGIN
         END;
 
     -- Delete game
-    START TRANSACTION;
-        DELETE FROM Games WHERE gameID = g_id;
+    SELECT homeTeamID, awayTeamID, homeScore, awayScore, status
+    INTO old_home, old_away, old_homeScore, old_awayScore, old_status
+    FROM Games WHERE gameID = g_ID FOR UPDATE;
+
+    DELETE FROM Games WHERE gameID = g_id;
 
-        -- Raise error if delete fails
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('No matching game found for id: ', g_ID);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
+    -- Raise error if delete fails
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('No matching game found for id: ', g_ID);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
 
-    COMMIT;
+    -- Take the deleted result back out of the standings
+    CALL sp_ApplyGameResult(old_home, old_away, old_homeScore, old_awayScore, old_status, -1);
 END //
 DELIMITER ;
 
@@ -514,10 +630,14 @@ CREATE PROCEDURE sp_UpdateGame(
     IN g_date DATE,
     IN g_time TIME,
     IN g_type ENUM ('preseason', 'regular season', 'playoff', 'tournament', 'exhibition'),
-    IN g_status ENUM ('scheduled', 'in progress', 'completed', 'cancelled', 'postponed', 'forfeited')
+    IN g_status ENUM ('scheduled', 'in progress', 'completed', 'cancelled', 'postponed', 'forfeited'),
+    IN g_homeScore INT,
+    IN g_awayScore INT
 )
 BEGIN
     DECLARE error_message VARCHAR(255);
+    DECLARE old_home, old_away, old_homeScore, old_awayScore INT;
+    DECLARE old_status VARCHAR(20);
 
     -- Exit handler
     DECLARE EXIT HANDLER FOR SQLEXCEPTION
@@ -527,21 +647,29 @@ BEGIN
         END;
 
     -- Update transaction
-    START TRANSACTION;
-        UPDATE Games
-        SET
-            facilityID = g_facility,
-            gameDate = g_date,
-            gameTime = g_time,
-            gameType = g_type,
-            status = g_status
-        WHERE gameID = g_id;
-
-        IF ROW_COUNT() = 0 THEN
-            SET error_message = CONCAT('Error updating game ID: ', g_id);
-            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
-        END IF;
-    COMMIT;
-END;
-
-DELIMITER ;
\ No newline at end of file
+    SELECT homeTeamID, awayTeamID, homeScore, awayScore, status
+    INTO old_home, old_away, old_homeScore, old_awayScore, old_status
+    FROM Games WHERE gameID = g_id FOR UPDATE;
+
+    UPDATE Games
+    SET
+        facilityID = g_facility,
+        gameDate = g_date,
+        gameTime = g_time,
+        gameType = g_type,
+        status = g_status,
+        homeScore = g_homeScore,
+        awayScore = g_awayScore
+    WHERE gameID = g_id;
+
+    IF ROW_COUNT() = 0 THEN
+        SET error_message = CONCAT('Error updating game ID: ', g_id);
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = error_message;
+    END IF;
+
+    -- Swap the old result for the new one (each call is a no-op if that result doesn't count)
+    CALL sp_ApplyGameResult(old_home, old_away, old_homeScore, old_awayScore, old_status, -1);
+    CALL sp_ApplyGameResult(old_home, old_away, g_homeScore, g_awayScore, g_status, 1);
+END //
+
+DELIMITER ;
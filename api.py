@@ -0,0 +1,115 @@
+"""
+Versioned JSON REST API (/api/v1) for Schools, Facilities, Athletes, Teams, Players, Games
+and team Standings.
+
+Every response carries an ETag and Last-Modified header derived from the data
+versions of the tables it reads (see http_cache.py). Clients that send them back
+get a 304 without the query or serialization being repeated.
+"""
+
+import json
+from flask import Blueprint, abort, jsonify, request
+import database.db_connector as db
+import database.pagination as pagination
+import http_cache
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Resource name -> table, primary key and exposed columns
+ENTITIES = {
+    "schools": {
+        "table": "Schools", "key": "schoolID",
+        "columns": ("schoolID", "name", "address", "phone"),
+    },
+    "facilities": {
+        "table": "Facilities", "key": "facilityID",
+        "columns": ("facilityID", "schoolID", "facilityName", "capacity"),
+    },
+    "athletes": {
+        "table": "Athletes", "key": "athleteID",
+        "columns": ("athleteID", "schoolID", "firstName", "lastName", "gradeLevel",
+                    "isEligible", "isActive", "emergencyContact"),
+    },
+    "teams": {
+        "table": "Teams", "key": "teamID",
+        "columns": ("teamID", "schoolID", "teamName", "sportType", "varsityJv",
+                    "seasonName", "academicYear"),
+    },
+    "players": {
+        "table": "Players", "key": "playerID",
+        "columns": ("playerID", "teamID", "athleteID"),
+    },
+    "games": {
+        "table": "Games", "key": "gameID",
+        "columns": ("gameID", "homeTeamID", "awayTeamID", "facilityID", "gameDate",
+                    "gameTime", "gameType", "status", "homeScore", "awayScore"),
+    },
+    # Read model kept current by the game procedures (PL.sql); one row per team with results
+    "standings": {
+        "table": "Standings", "key": "teamID",
+        "columns": ("teamID", "gamesPlayed", "wins", "losses", "ties", "pointsFor", "pointsAgainst"),
+    },
+}
+
+
+def toJSON(payload):
+    # DATE / TIME columns come back as date / timedelta objects; emit them as ISO-style strings
+    return json.dumps(payload, default=str)
+
+def getEntity(name):
+    entity = ENTITIES.get(name)
+    if entity is None:
+        abort(404)
+    return entity
+
+
+@api.route("/<name>", methods=["GET"])
+def list_entities(name):
+    """
+    Returns one page of an entity, ordered by primary key
+    Query string: size (page size), after (cursor from the previous page's "next")
+    """
+    entity = getEntity(name)
+
+    def build():
+        dbConnection = db.getConnection()
+        page = pagination.Page(request.args, {"id": entity["key"]}, key=entity["key"])
+        query, params = page.query(f"SELECT {', '.join(entity['columns'])} FROM {entity['table']}")
+        rows = page.load(db.query(dbConnection, query, params).fetchall())
+        return toJSON({
+            "data": rows,
+            "next": page.nextCursor if page.hasNext else None,
+            "total": pagination.count(dbConnection, entity["table"]),
+        })
+
+    return http_cache.conditional((entity["table"],), build)
+
+
+@api.route("/<name>/<int:entityID>", methods=["GET"])
+def get_entity(name, entityID):
+    """
+    Returns a single entity by primary key
+    """
+    entity = getEntity(name)
+
+    def build():
+        dbConnection = db.getConnection()
+        query = (f"SELECT {', '.join(entity['columns'])} FROM {entity['table']} "
+                 f"WHERE {entity['key']} = %s")
+        row = db.query(dbConnection, query, (entityID,)).fetchone()
+        if row is None:
+            abort(404)
+        return toJSON(row)
+
+    return http_cache.conditional((entity["table"],), build)
+
+
+@api.errorhandler(404)
+def not_found(e):
+    return jsonify({"error": "Resource not found"}), 404
+
+
+@api.errorhandler(Exception)
+def api_error(e):
+    print(f"Error executing API request: {e}")
+    return jsonify({"error": "An error occurred while executing the database queries."}), 500
@@ -8,12 +8,280 @@ Source URL: https://canvas.oregonstate.edu/courses/2017561/pages/exploration-web
 # ########################################
 # ########## SETUP
 
-from flask import Flask, render_template, request, redirect, jsonify, url_for
+from flask import Flask, Response, render_template, request, redirect, jsonify, url_for, stream_with_context
+import click
+import csv
+import datetime
+import io
+import json
+import os
+import time
 import database.db_connector as db
+import database.pagination as pagination
+import database.cache as cache
+import database.importer as importer
+import database.generator as generator
+import database.scheduler as scheduler
+import database.conflicts as conflicts
+import database.lookups as lookups
+import database.search as search
+from api import api
+import metrics
+import http_cache
+import fragments
 
 PORT = 3092
+MAX_RESET_SCALE = int(os.getenv('MAX_RESET_SCALE', 1000))  # largest dataset /reset-database will generate
 
 app = Flask(__name__)
+db.init_app(app)  # Return pooled connections at the end of each request
+app.register_blueprint(api)  # Versioned JSON API under /api/v1
+metrics.init_app(app)  # Query / route / template timings, served at /metrics
+fragments.init_app(app)  # Cached dropdown fragments, precompiled templates
+
+# ########################################
+# ########## HELPERS
+
+def exportResponse(query, filename, columns):
+    """
+    Streams the rows of a query as CSV (default) or NDJSON (?format=ndjson)
+    Rows are read through an unbuffered cursor and written out as they arrive,
+    so the export uses constant memory regardless of table size
+    columns: the query's column names, in order; the CSV header is written even when no rows match
+    """
+    exportFormat = request.args.get("format", "csv").lower()
+
+    def ndjson(rows):
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+
+    def csvLines(rows, flushEvery=500):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % flushEvery == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+
+    rows = db.stream(db.getConnection(), query)
+    if exportFormat == "ndjson":
+        body, mimetype, extension = ndjson(rows), "application/x-ndjson", "ndjson"
+    else:
+        body, mimetype, extension = csvLines(rows), "text/csv", "csv"
+
+    return Response(
+        stream_with_context(body), mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"}
+    )
+
+
+def wantsJSON():
+    """
+    True when the client prefers a JSON response over an HTML page
+    """
+    return request.accept_mimetypes.best_match(["text/html", "application/json"]) == "application/json"
+
+
+def partialRequested():
+    """
+    True when the page's script asks for the changed table row instead of a redirect (static/partial.js)
+    """
+    return request.headers.get("X-Partial") == "row"
+
+
+def writeResponse(endpoint, msg, action, rowID, template=None, rowQuery=None):
+    """
+    Finishes a successful create / update / delete. A plain form post is redirected back to
+    the list page; a partial request gets the changed row rendered by template, and a JSON
+    client the row itself, so neither has to reload the whole page
+    action: "created", "updated" or "deleted"
+    """
+    if not (partialRequested() or wantsJSON()):
+        return redirect(url_for(endpoint, msg=msg))
+
+    row = None
+    if action != "deleted":
+        row = db.query(db.getConnection(), rowQuery, (rowID,)).fetchone()
+
+    if partialRequested():
+        response = Response(render_template(template, row=row) if row else "", mimetype="text/html")
+    else:
+        response = jsonify({"msg": msg, "action": action, "id": rowID, "row": row})
+    response.headers["X-Row-Action"] = action
+    response.headers["X-Row-Id"] = str(rowID)
+    return response
+
+
+def writeError(endpoint, error, status=400, **params):
+    """
+    Reports a failed write: a redirect for a plain form post, otherwise JSON naming the error
+    and the list page URL that displays its message
+    """
+    location = url_for(endpoint, error=error, **params)
+    if partialRequested() or wantsJSON():
+        return jsonify({"error": error, "location": location}), status
+    return redirect(location)
+
+
+def scoreField(name):
+    """
+    Reads an optional score from the submitted form; blank means no result yet
+    """
+    value = request.form.get(name, "").strip()
+    return int(value) if value else None
+
+
+# ########################################
+# ########## LIST ROWS
+
+# The SELECT behind each paginated list page; the *_ROW form reads back the one row a write changed
+ATHLETE_ROWS = ("SELECT a.athleteID as 'Id', s.name as 'School', "
+                "a.firstName as 'First Name', a.lastName as 'Last Name', a.gradeLevel as 'Grade Level', "
+                "IF(a.isEligible, '✓', '✗') AS 'Eligible', IF(a.isActive, '✓', '✗') as 'Active', "
+                "a.emergencyContact as 'Emergency Contact' FROM Athletes a "
+                "LEFT JOIN Schools s ON a.schoolID = s.schoolID")
+ATHLETE_ROW = ATHLETE_ROWS + " WHERE a.athleteID = %s"
+
+TEAM_ROWS = ("SELECT t.teamID as 'Id', s.name as 'School', "
+             "t.teamName as 'Team Name', t.sportType as 'Sport Type', t.varsityJv as 'Varsity / JV', "
+             "t.seasonName as 'Season Name', t.academicYear as 'Academic Year' FROM Teams t "
+             "LEFT JOIN Schools s ON t.schoolID = s.schoolID")
+TEAM_ROW = TEAM_ROWS + " WHERE t.teamID = %s"
+
+PLAYER_ROWS = ("SELECT r.playerID AS 'id', r.firstName AS 'first_name', r.lastName AS 'last_name', "
+               "r.school AS 'school', r.sportType AS 'sport', r.varsityJv AS 'varsity_/_JV', "
+               "r.academicYear AS 'academic_year', r.eligible AS 'eligible', r.active AS 'active' "
+               "FROM RosterView AS r")
+PLAYER_ROW = PLAYER_ROWS + " WHERE r.playerID = %s"
+# One range read of the roster read model on idx_roster_team (teamID, playerID)
+TEAM_ROSTER = PLAYER_ROWS + " WHERE r.teamID = %s ORDER BY r.playerID"
+
+GAME_ROWS = ("SELECT g.gameID AS id, ht.sportType as sport_type, "
+             "ht.teamName AS home_team, at.teamName AS away_team, "
+             "s.name AS facility_location, f.facilityName AS facility_name, "
+             "g.gameDate AS game_date, g.gameTime as game_time, g.gameType as game_type, g.status, "
+             "COALESCE(CONCAT(g.homeScore, ' - ', g.awayScore), '') AS score "
+             "FROM Games AS g JOIN Teams AS ht ON g.homeTeamID = ht.teamID "
+             "JOIN Teams AS at ON g.awayTeamID = at.teamID "
+             "JOIN Facilities AS f ON g.facilityID = f.facilityID "
+             "JOIN Schools AS s ON s.schoolID = f.schoolID")
+GAME_ROW = GAME_ROWS + " WHERE g.gameID = %s"
+
+# The full schedule streamed by /games/export
+SCHEDULE_EXPORT = ("SELECT g.gameID, ht.sportType, ht.teamName AS homeTeam, at.teamName AS awayTeam, "
+                   "s.name AS facilityLocation, f.facilityName, g.gameDate, g.gameTime, g.gameType, g.status, "
+                   "g.homeScore, g.awayScore "
+                   "FROM Games AS g JOIN Teams AS ht ON g.homeTeamID = ht.teamID "
+                   "JOIN Teams AS at ON g.awayTeamID = at.teamID "
+                   "JOIN Facilities AS f ON g.facilityID = f.facilityID "
+                   "JOIN Schools AS s ON s.schoolID = f.schoolID "
+                   "ORDER BY g.gameDate, g.gameTime, g.gameID")
+SCHEDULE_EXPORT_COLUMNS = ["gameID", "sportType", "homeTeam", "awayTeam", "facilityLocation", "facilityName",
+                           "gameDate", "gameTime", "gameType", "status", "homeScore", "awayScore"]
+
+# The full roster streamed by /players/export
+ROSTER_EXPORT = ("SELECT p.playerID, a.athleteID, a.firstName, a.lastName, s.name AS school, "
+                 "t.teamID, t.teamName, t.sportType, t.varsityJv, t.seasonName, t.academicYear, "
+                 "a.gradeLevel, a.isEligible, a.isActive "
+                 "FROM Players AS p JOIN Athletes AS a ON p.athleteID = a.athleteID "
+                 "JOIN Teams AS t ON p.teamID = t.teamID "
+                 "JOIN Schools AS s ON s.schoolID = a.schoolID "
+                 "ORDER BY p.playerID")
+ROSTER_EXPORT_COLUMNS = ["playerID", "athleteID", "firstName", "lastName", "school", "teamID", "teamName",
+                         "sportType", "varsityJv", "seasonName", "academicYear", "gradeLevel", "isEligible",
+                         "isActive"]
+
+# Sortable columns of each list page: sort parameter -> SQL expression (see database/pagination.py)
+# ENUM columns are compared as text so ORDER BY and the seek predicate agree
+ATHLETE_SORT = {"id": "a.athleteID", "school": "s.name", "first_name": "a.firstName",
+                "last_name": "a.lastName", "grade": "a.gradeLevel"}
+
+TEAM_SORT = {"id": "t.teamID", "school": "s.name", "team_name": "t.teamName",
+             "sport": "CAST(t.sportType AS CHAR)", "season": "CAST(t.seasonName AS CHAR)",
+             "academic_year": "t.academicYear"}
+
+PLAYER_SORT = {"id": "r.playerID", "first_name": "r.firstName", "last_name": "r.lastName",
+               "school": "r.school", "sport": "r.sportType", "academic_year": "r.academicYear"}
+
+GAME_SORT = {"id": "g.gameID", "game_date": "g.gameDate", "sport": "CAST(ht.sportType AS CHAR)",
+             "home_team": "ht.teamName", "away_team": "at.teamName",
+             "game_type": "CAST(g.gameType AS CHAR)", "status": "CAST(g.status AS CHAR)"}
+
+# Every row for the update forms' dropdowns, which must offer rows from any page, not just the one shown
+ATHLETE_OPTIONS = db.Cached("SELECT a.athleteID as 'Id', a.firstName as 'First Name', a.lastName as 'Last Name', "
+                            "s.name as 'School' FROM Athletes a LEFT JOIN Schools s ON a.schoolID = s.schoolID "
+                            "ORDER BY a.athleteID", tables=("Athletes", "Schools"))
+
+TEAM_OPTIONS = db.Cached("SELECT t.teamID as 'Id', t.teamName as 'Team Name', t.sportType as 'Sport Type', "
+                         "s.name as 'School' FROM Teams t LEFT JOIN Schools s ON t.schoolID = s.schoolID "
+                         "ORDER BY t.teamID", tables=("Teams", "Schools"))
+
+PLAYER_OPTIONS = db.Cached("SELECT r.playerID AS 'id', r.firstName AS 'first_name', r.lastName AS 'last_name', "
+                           "r.school AS 'school', r.sportType AS 'sport', r.varsityJv AS 'varsity_/_JV', "
+                           "r.academicYear AS 'academic_year' FROM RosterView AS r ORDER BY r.playerID",
+                           tables=("RosterView",))
+
+GAME_OPTIONS = db.Cached("SELECT g.gameID AS id, ht.teamName AS home_team, at.teamName AS away_team, "
+                         "g.gameDate AS game_date, g.gameTime as game_time "
+                         "FROM Games AS g JOIN Teams AS ht ON g.homeTeamID = ht.teamID "
+                         "JOIN Teams AS at ON g.awayTeamID = at.teamID ORDER BY g.gameID",
+                         tables=("Games", "Teams"))
+
+
+# ########################################
+# ########## LOOKUP QUERIES
+
+# The JSON lookups behind the forms' dropdowns (also served by asgi.py)
+ATHLETE_DETAILS = ("SELECT athleteID, schoolID, firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact "
+                   "FROM Athletes WHERE athleteID = %s")
+
+TEAM_DETAILS = ("SELECT teamID, schoolID, teamName, sportType, varsityJv, seasonName, academicYear "
+                "FROM Teams WHERE teamID = %s")
+
+GAME_DETAILS = ("SELECT gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, "
+                "homeScore, awayScore FROM Games WHERE gameID = %s")
+
+ELIGIBLE_TEAMS = ("SELECT t.teamID, s.name AS schoolName, t.teamName, t.sportType, t.varsityJv, t.academicYear "
+                  "FROM Athletes AS a "
+                  "JOIN Teams AS t ON t.schoolID = a.schoolID "
+                  "JOIN Schools AS s ON s.schoolID = t.schoolID "
+                  "LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID "
+                  "WHERE a.athleteID = %s AND p.playerID IS NULL")
+
+REASSIGNABLE_TEAMS = ("SELECT t.teamID, s.name AS schoolName, t.teamName, "
+                      "t.sportType, t.varsityJv, t.seasonName, t.academicYear "
+                      "FROM Players AS cur "
+                      "JOIN Athletes AS a ON a.athleteID = cur.athleteID "
+                      "JOIN Teams AS t ON t.schoolID = a.schoolID "
+                      "JOIN Schools AS s ON s.schoolID = t.schoolID "
+                      "LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID "
+                      "WHERE cur.playerID = %s AND p.playerID IS NULL ;")
+
+SPORT_TEAMS = ("SELECT t.teamID, s.name AS 'schoolName', t.varsityJv, t.academicYear "
+               "FROM Teams as t JOIN Schools as s ON t.schoolID = s.schoolID "
+               "WHERE t.sportType = %s")
+
+# Sports by number of teams, most first
+SPORT_COUNTS = db.Cached("SELECT sportType, COUNT(*) as numTeams FROM Teams GROUP BY sportType ORDER BY 2 DESC",
+                         tables=("Teams",))
+
+# Teams of one sport with their record; filters and the ranking are added in standings()
+STANDINGS_ROWS = ("SELECT t.teamID AS id, s.name AS school, t.teamName AS team_name, t.varsityJv AS level, "
+                  "t.academicYear AS academic_year, COALESCE(st.gamesPlayed, 0) AS played, "
+                  "COALESCE(st.wins, 0) AS wins, COALESCE(st.losses, 0) AS losses, COALESCE(st.ties, 0) AS ties, "
+                  "COALESCE(st.pointsFor, 0) AS points_for, COALESCE(st.pointsAgainst, 0) AS points_against, "
+                  "COALESCE(st.pointsFor - st.pointsAgainst, 0) AS difference "
+                  "FROM Teams AS t JOIN Schools AS s ON s.schoolID = t.schoolID "
+                  "LEFT JOIN Standings AS st ON st.teamID = t.teamID")
+
+# Ranked within each level / year by win percentage (a tie is half a win), then point difference
+STANDINGS_ORDER = (" ORDER BY t.academicYear DESC, t.varsityJv, "
+                   "COALESCE((st.wins + st.ties / 2) / NULLIF(st.gamesPlayed, 0), 0) DESC, difference DESC, t.teamID")
+
 
 # ########################################
 # ########## ROUTE HANDLERS
@@ -30,14 +298,15 @@ def home():
 
 
 @app.route("/schools", methods=["GET"])
+@http_cache.cachedPage("Schools")
 def schools():
     try:
-        dbConnection = db.connectDB()  # Open our database connection
+        dbConnection = db.getConnection()
 
         # Retrieve list of Schools and associated info
-        query = ("SELECT schoolID AS 'Id', name AS 'Name', address AS 'Address', phone AS 'Phone' "
-                 "FROM Schools;")
-        schools = db.query(dbConnection, query).fetchall()
+        query = db.Cached("SELECT schoolID AS 'Id', name AS 'Name', address AS 'Address', phone AS 'Phone' "
+                          "FROM Schools;", tables=("Schools",))
+        schools, = db.queryBatch(dbConnection, (query,))
 
         # Render schools.j2 file, and send school query results
         return render_template(
@@ -48,24 +317,19 @@ def schools():
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/facilities", methods=["GET"])
+@http_cache.cachedPage("Facilities", "Schools")
 def facilities():
     try:
-        dbConnection = db.connectDB()  # Open our database connection
+        dbConnection = db.getConnection()
 
         # Create and execute queries
         query1 = "SELECT f.facilityID as 'Id', s.name as 'School', \
             f.facilityName as 'Name', f.capacity as 'Capacity' FROM Facilities f \
             LEFT JOIN Schools s ON f.schoolID = s.schoolID;"
-        query2 = "SELECT * FROM Schools;"
-        facilities = db.query(dbConnection, query1).fetchall()
-        schools = db.query(dbConnection, query2).fetchall()
+        query2 = db.Cached("SELECT * FROM Schools;", tables=("Schools",))
+        facilities, schools = db.queryBatch(dbConnection, (query1, query2))
 
         # Render the facilities.j2 file, and also send the renderer
         # a couple objects that contains facilities and schools information
@@ -77,26 +341,22 @@ def facilities():
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/athletes", methods=["GET"])
+@http_cache.cachedPage("Athletes", "Schools")
 def athletes():
     try:
-        dbConnection = db.connectDB()  # Open our database connection
+        dbConnection = db.getConnection()
+
+        # Page through athletes by the requested sort column, seeking past the previous page
+        page = pagination.Page(request.args, ATHLETE_SORT, key="a.athleteID")
 
         # Create and execute queries
-        query1 = "SELECT a.athleteID as 'Id', s.name as 'School', \
-            a.firstName as 'First Name', a.lastName as 'Last Name', a.gradeLevel as 'Grade Level', \
-            IF(a.isEligible, '✓', '✗') AS 'Eligible', IF(a.isActive, '✓', '✗') as 'Active', \
-            a.emergencyContact as 'Emergency Contact' FROM Athletes a \
-            LEFT JOIN Schools s ON a.schoolID = s.schoolID;"
-        query2 = "SELECT * FROM Schools;"
-        athletes = db.query(dbConnection, query1).fetchall()
-        schools = db.query(dbConnection, query2).fetchall()
+        query1 = page.query(ATHLETE_ROWS)
+        query2 = db.Cached("SELECT * FROM Schools;", tables=("Schools",))
+        athletes, schools, athleteOptions = db.queryBatch(dbConnection, (query1, query2, ATHLETE_OPTIONS))
+        athletes = page.load(athletes)
+        page.total = pagination.count(dbConnection, "Athletes")
 
         headers = ('Id', 'School', 'First Name', 'Last Name', 'Grade Level', 
                    'Eligible', 'Active', 'Emergency Contact')
@@ -104,24 +364,19 @@ def athletes():
         # Render the athletes.j2 file, and also send the renderer
         # a couple objects that contains athletes and schools information
         return render_template(
-            "athletes.j2", athletes=athletes, schools=schools, headers=headers
+            "athletes.j2", athletes=athletes, schools=schools, athleteOptions=athleteOptions,
+            headers=headers, page=page
         )
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/athletes/create", methods=["POST"])
 def create_athlete():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         # Get form data
         schoolID = request.form["create_athlete_school"]
@@ -132,38 +387,32 @@ def create_athlete():
         isActive = request.form["create_athlete_isActive"]
         emergencyContact = request.form.get("create_athlete_emergencyContact", "")
 
-        # Call stored procedure to create an athlete
-        query = "CALL sp_CreateAthlete(%s, %s, %s, %s, %s, %s, %s, @newAthleteID)"
-        cursor.execute(query, (schoolID, firstName, lastName, gradeLevel, 
-                              isEligible, isActive, emergencyContact))
-
-        # Retrieve new athlete ID from out variable
-        cursor.execute("SELECT @newAthleteID AS athleteID")
-        row = cursor.fetchone()
-        athleteID = row[0] if row else None
+        with db.transaction(dbConnection, tables=("Athletes",)) as cursor:
+            # Call stored procedure to create an athlete
+            query = "CALL sp_CreateAthlete(%s, %s, %s, %s, %s, %s, %s, @newAthleteID)"
+            cursor.execute(query, (schoolID, firstName, lastName, gradeLevel, 
+                                  isEligible, isActive, emergencyContact))
 
-        dbConnection.commit()
+            # Retrieve new athlete ID from out variable
+            cursor.execute("SELECT @newAthleteID AS athleteID")
+            row = cursor.fetchone()
+            athleteID = row[0] if row else None
 
-        # If successful, redirect back to page with success message
+        # If successful, redirect back to page with success message (or return the new row)
         print(f"Athlete created. ID: {athleteID} Name: {firstName} {lastName}")
-        return redirect("/athletes?msg=create_ok")
+        return writeResponse("athletes", "create_ok", "created", athleteID,
+                             "partials/athlete_row.j2", ATHLETE_ROW)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error creating athlete: {error_message}")
-        return redirect("/athletes?error=create_failed")
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("athletes", "create_failed")
 
 
 @app.route("/athletes/update", methods=["POST"])
 def update_athlete():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         # Get form data
         athleteID = request.form["update_athlete_id"]
@@ -177,45 +426,38 @@ def update_athlete():
 
         # Call stored procedure to update athlete
         query = "CALL sp_UpdateAthlete(%s, %s, %s, %s, %s, %s, %s, %s)"
-        cursor.execute(query, (athleteID, schoolID, firstName, lastName, gradeLevel,
-                              isEligible, isActive, emergencyContact))
-
-        dbConnection.commit()
+        with db.transaction(dbConnection, tables=("Athletes",)) as cursor:
+            cursor.execute(query, (athleteID, schoolID, firstName, lastName, gradeLevel,
+                                  isEligible, isActive, emergencyContact))
 
-        # If successful, redirect back to page with success message
+        # If successful, redirect back to page with success message (or return the updated row)
         print(f"Athlete updated. ID: {athleteID} Name: {firstName} {lastName}")
-        return redirect("/athletes?msg=update_ok")
+        return writeResponse("athletes", "update_ok", "updated", athleteID,
+                             "partials/athlete_row.j2", ATHLETE_ROW)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error updating athlete: {error_message}")
-        return redirect("/athletes?error=update_failed")
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("athletes", "update_failed")
 
 
 @app.route("/athletes/delete", methods=["POST"])
 def delete_athlete():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         athlete_id = request.form["delete_athlete_id"]
         athlete_name = request.form["delete_athlete_name"]
 
         query1 = "CALL sp_DeleteAthlete(%s);"
-        cursor.execute(query1, (athlete_id,))
+        with db.transaction(dbConnection, tables=("Athletes",)) as cursor:
+            cursor.execute(query1, (athlete_id,))
 
-        dbConnection.commit()
         print(f"DELETE athlete. ID: {athlete_id} Name: {athlete_name}")
         # Return success message
-        return redirect("/athletes?msg=delete_ok")
+        return writeResponse("athletes", "delete_ok", "deleted", athlete_id)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error executing queries: {error_message}")
         
@@ -225,13 +467,28 @@ def delete_athlete():
                 error_param = "athlete_has_players"
             else:
                 error_param = "athlete_constraint_error"
-            return redirect(f"/athletes?error={error_param}")
+            return writeError("athletes", error_param, 409)
         else:
-            return redirect(f"/athletes?error=delete_failed")
+            return writeError("athletes", "delete_failed")
 
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+
+@app.route("/athletes/import", methods=["POST"])
+def import_athletes():
+    """
+    Bulk-creates athletes from an uploaded CSV file and returns a per-row error report
+    """
+    try:
+        upload = request.files.get("file")
+        if upload is None or not upload.filename:
+            return jsonify({"error": "Please upload a CSV file in the 'file' field"}), 400
+
+        report = importer.importAthletes(db.getConnection(), upload.stream)
+        print(f"Athlete import: {report.inserted} inserted, {len(report.errors)} rejected")
+        return jsonify(report.asDict())
+
+    except Exception as e:
+        print(f"Error importing athletes: {e}")
+        return jsonify({"error": str(e)}), 500
 
 
 @app.route("/athletes/details", methods=["GET"])
@@ -240,13 +497,11 @@ def athlete_details():
     Returns details of the requested athleteID
     """
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         cursor = dbConnection.cursor()
 
         athleteID = request.args.get("athleteID")
-        query = ("SELECT athleteID, schoolID, firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact "
-                 "FROM Athletes WHERE athleteID = %s")
-        cursor.execute(query, (athleteID,))
+        cursor.execute(ATHLETE_DETAILS, (athleteID,))
         result = cursor.fetchone()
 
         if not result:
@@ -269,24 +524,22 @@ def athlete_details():
         print(f"Error retrieving athlete details: {e}")
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-            
 
 @app.route("/teams", methods=["GET"])
+@http_cache.cachedPage("Teams", "Schools")
 def teams():
     try:
-        dbConnection = db.connectDB()  # Open our database connection
+        dbConnection = db.getConnection()
+
+        # Page through teams by the requested sort column, seeking past the previous page
+        page = pagination.Page(request.args, TEAM_SORT, key="t.teamID")
 
         # Create and execute queries
-        query1 = "SELECT t.teamID as 'Id', s.name as 'School', \
-            t.teamName as 'Team Name', t.sportType as 'Sport Type', t.varsityJv as 'Varsity / JV', \
-            t.seasonName as 'Season Name', t.academicYear as 'Academic Year' FROM Teams t \
-            LEFT JOIN Schools s ON t.schoolID = s.schoolID;"
-        query2 = "SELECT * FROM Schools;"
-        teams = db.query(dbConnection, query1).fetchall()
-        schools = db.query(dbConnection, query2).fetchall()
+        query1 = page.query(TEAM_ROWS)
+        query2 = db.Cached("SELECT * FROM Schools;", tables=("Schools",))
+        teams, schools, teamOptions = db.queryBatch(dbConnection, (query1, query2, TEAM_OPTIONS))
+        teams = page.load(teams)
+        page.total = pagination.count(dbConnection, "Teams")
 
         headers = ('Id', 'School', 'Team Name', 'Sport Type', 'Varsity / JV', 
                    'Season Name', 'Academic Year')
@@ -294,24 +547,18 @@ def teams():
         # Render the athletes.j2 file, and also send the renderer
         # a couple objects that contains teams and schools information
         return render_template(
-            "teams.j2", teams=teams, schools=schools, headers=headers
+            "teams.j2", teams=teams, schools=schools, teamOptions=teamOptions, headers=headers, page=page
         )
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/teams/create", methods=["POST"])
 def create_team():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         # Get form data
         schoolID = request.form["create_team_school"]
@@ -321,24 +568,22 @@ def create_team():
         seasonName = request.form["create_team_seasonName"]
         academicYear = request.form["create_team_academicYear"]
 
-        # Call stored procedure to create a team
-        query = "CALL sp_CreateTeam(%s, %s, %s, %s, %s, %s, @newTeamID)"
-        cursor.execute(query, (schoolID, teamName, sportType, varsityJv, 
-                              seasonName, academicYear))
+        with db.transaction(dbConnection, tables=("Teams",)) as cursor:
+            # Call stored procedure to create a team
+            query = "CALL sp_CreateTeam(%s, %s, %s, %s, %s, %s, @newTeamID)"
+            cursor.execute(query, (schoolID, teamName, sportType, varsityJv, 
+                                  seasonName, academicYear))
 
-        # Retrieve new team ID from out variable
-        cursor.execute("SELECT @newTeamID AS teamID")
-        row = cursor.fetchone()
-        teamID = row[0] if row else None
+            # Retrieve new team ID from out variable
+            cursor.execute("SELECT @newTeamID AS teamID")
+            row = cursor.fetchone()
+            teamID = row[0] if row else None
 
-        dbConnection.commit()
-
-        # If successful, redirect back to page with success message
+        # If successful, redirect back to page with success message (or return the new row)
         print(f"Team created. ID: {teamID} Name: {teamName} ({sportType})")
-        return redirect("/teams?msg=create_ok")
+        return writeResponse("teams", "create_ok", "created", teamID, "partials/team_row.j2", TEAM_ROW)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error creating team: {error_message}")
         
@@ -355,23 +600,15 @@ def create_team():
             else:
                 clean_message = error_message
             
-            # URL encode the message
-            import urllib.parse
-            encoded_message = urllib.parse.quote(clean_message)
-            return redirect(f"/teams?error=season_sport&message={encoded_message}")
+            return writeError("teams", "season_sport", message=clean_message)
         else:
-            return redirect("/teams?error=create_failed")
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+            return writeError("teams", "create_failed")
 
 
 @app.route("/teams/update", methods=["POST"])
 def update_team():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         # Get form data
         teamID = request.form["update_team_id"]
@@ -384,17 +621,15 @@ def update_team():
 
         # Call stored procedure to update team
         query = "CALL sp_UpdateTeam(%s, %s, %s, %s, %s, %s, %s)"
-        cursor.execute(query, (teamID, schoolID, teamName, sportType, 
-                              varsityJv, seasonName, academicYear))
+        with db.transaction(dbConnection, tables=("Teams",)) as cursor:
+            cursor.execute(query, (teamID, schoolID, teamName, sportType, 
+                                  varsityJv, seasonName, academicYear))
 
-        dbConnection.commit()
-
-        # If successful, redirect back to page with success message
+        # If successful, redirect back to page with success message (or return the updated row)
         print(f"Team updated. ID: {teamID} Name: {teamName} ({sportType})")
-        return redirect("/teams?msg=update_ok")
+        return writeResponse("teams", "update_ok", "updated", teamID, "partials/team_row.j2", TEAM_ROW)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error updating team: {error_message}")
         
@@ -402,34 +637,28 @@ def update_team():
         if "does not play in" in error_message:
             # Extract the sport-season error message
             error_param = error_message.split(": ")[-1] if ": " in error_message else error_message
-            return redirect(f"/teams?error=season_sport&message={error_param}")
+            return writeError("teams", "season_sport", message=error_param)
         else:
-            return redirect("/teams?error=update_failed")
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+            return writeError("teams", "update_failed")
 
 
 @app.route("/teams/delete", methods=["POST"])
 def delete_team():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         team_id = request.form["delete_team_id"]
         team_name = request.form["delete_team_name"]
 
         query1 = "CALL sp_DeleteTeam(%s);"
-        cursor.execute(query1, (team_id,))
+        with db.transaction(dbConnection, tables=("Teams",)) as cursor:
+            cursor.execute(query1, (team_id,))
 
-        dbConnection.commit()
         print(f"DELETE team. ID: {team_id} Name: {team_name}")
         # Return success message
-        return redirect("/teams?msg=delete_ok")
+        return writeResponse("teams", "delete_ok", "deleted", team_id)
 
     except Exception as e:
-        dbConnection.rollback()
         error_message = str(e)
         print(f"Error executing queries: {error_message}")
         
@@ -443,13 +672,9 @@ def delete_team():
                 error_param = "team_has_games"
             else:
                 error_param = "team_constraint_error"
-            return redirect(f"/teams?error={error_param}")
+            return writeError("teams", error_param, 409)
         else:
-            return redirect(f"/teams?error=delete_failed")
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+            return writeError("teams", "delete_failed")
 
 
 @app.route("/teams/details", methods=["GET"])
@@ -458,13 +683,11 @@ def team_details():
     Returns details of the requested teamID
     """
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         cursor = dbConnection.cursor()
 
         teamID = request.args.get("teamID")
-        query = ("SELECT teamID, schoolID, teamName, sportType, varsityJv, seasonName, academicYear "
-                 "FROM Teams WHERE teamID = %s")
-        cursor.execute(query, (teamID,))
+        cursor.execute(TEAM_DETAILS, (teamID,))
         result = cursor.fetchone()
 
         if not result:
@@ -486,56 +709,50 @@ def team_details():
         print(f"Error retrieving team details: {e}")
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/players", methods=["GET"])
+@http_cache.cachedPage("RosterView", "Athletes", "Teams", "Schools")
 def players():
     """
     Renders Players page, sends list of players, athletes, and teams
     """
     try:
-        dbConnection = db.connectDB()  # Open our database connection
+        dbConnection = db.getConnection()
+
+        # Page through players by the requested sort column, seeking past the previous page
+        page = pagination.Page(request.args, PLAYER_SORT, key="r.playerID")
 
-        # Retrieve list of Players with their Athlete / Team / School info
-        query1 = ("SELECT p.playerID AS 'id', a.firstName AS 'first_name', a.lastName AS 'last_name', "
-                  "s.name AS 'school', t.sportType AS 'sport', t.varsityJv AS 'varsity_/_JV', "
-                  "t.academicYear AS 'academic_year', IF(a.isEligible, '✓', '✗') AS 'eligible', "
-                  "IF(a.isActive, '✓', '✗') AS 'active' "
-                  "FROM Players AS p JOIN Athletes AS a ON p.athleteID = a.athleteID "
-                  "JOIN Teams AS t ON p.teamID = t.teamID "
-                  "JOIN Schools AS s ON s.schoolID = a.schoolID ;")
-        players = db.query(dbConnection, query1).fetchall()
+        # Retrieve page of Players from the denormalized roster read model (see database/roster.py)
+        query1 = page.query(PLAYER_ROWS)
 
-        query2 = ("SELECT a.athleteID, a.firstName, a.lastName, s.schoolID, s.name AS 'schoolName' "
-                  "FROM Athletes as a "
-                  "JOIN Schools as s ON s.schoolID = a.schoolID ")
-        athletes = db.query(dbConnection, query2).fetchall()
+        # Dropdown data: cached, and only rendered when its fragment in players.j2 is stale
+        query2 = db.Cached("SELECT a.athleteID, a.firstName, a.lastName, s.schoolID, s.name AS 'schoolName' "
+                           "FROM Athletes as a "
+                           "JOIN Schools as s ON s.schoolID = a.schoolID ", tables=("Athletes", "Schools"))
 
-        query3 = ("SELECT DISTINCT t.teamID, s.name as schoolName, t.sportType, t.varsityJv, t.academicYear "
-                  "FROM Teams as t JOIN Schools as s ON t.schoolID = s.schoolID "
-                  "ORDER BY t.teamID ")
-        teams = db.query(dbConnection, query3).fetchall()
+        query3 = db.Cached("SELECT DISTINCT t.teamID, s.name as schoolName, t.sportType, t.varsityJv, t.academicYear "
+                           "FROM Teams as t JOIN Schools as s ON t.schoolID = s.schoolID "
+                           "ORDER BY t.teamID ", tables=("Teams", "Schools"))
+
+        # Fetch players, athletes and teams in a single round trip
+        players, athletes, teams, playerOptions = db.queryBatch(dbConnection,
+                                                                (query1, query2, query3, PLAYER_OPTIONS))
+        players = page.load(players)
+        page.total = pagination.count(dbConnection, "RosterView")
 
         headers = ('Id', 'First Name', 'Last Name', 'School', 'Sport',
                    'Varsity / JV', 'Academic Year', 'Eligible', 'Active')
 
         # Render schools.j2 file, and send school query results
         return render_template(
-            "players.j2", players=players, athletes=athletes, teams=teams, headers = headers
+            "players.j2", players=players, athletes=athletes, teams=teams, playerOptions=playerOptions,
+            headers = headers, page=page
         )
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/players/teams", methods=["GET"])
 def players_fetch_teams():
@@ -543,26 +760,16 @@ def players_fetch_teams():
     Returns list of teams at a single school based on the athleteID provided
     """
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         athleteID = request.args.get("athleteID")
-        query = ("SELECT teamID, name AS schoolName, teamName, sportType, varsityJv, academicYear "
-                 "FROM Schools as s "
-                 "JOIN Teams as t ON s.schoolID = t.schoolID "
-                 "JOIN Athletes as a ON a.schoolID = s.schoolID "
-                 "WHERE a.athleteID = %s "
-                 "AND t.teamID NOT IN (SELECT teamID FROM Players WHERE athleteID = %s)")
-        teams_list = db.query(dbConnection, query, (athleteID, athleteID,)).fetchall()
+        # Anti-join: keep the school's teams with no Players row for this athlete (unique_players lookup)
+        teams_list = db.query(dbConnection, ELIGIBLE_TEAMS, (athleteID,)).fetchall()
         return jsonify(teams_list)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/players/roster", methods=["GET"])
 def players_fetch_roster():
@@ -570,30 +777,49 @@ def players_fetch_roster():
     Returns roster information for a single team based on the teamID provided
     """
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         teamID = request.args.get("teamID")
-        params = []
-        query1 = ("SELECT p.playerID AS 'id', a.firstName AS 'first_name', a.lastName AS 'last_name', "
-                  "s.name AS 'school', t.sportType AS 'sport', t.varsityJv AS 'varsity_/_JV', "
-                  "t.academicYear AS 'academic_year', IF(a.isEligible, '✓', '✗') AS 'eligible', "
-                  "IF(a.isActive, '✓', '✗') AS 'active' "
-                  "FROM Players AS p JOIN Athletes AS a ON p.athleteID = a.athleteID "
-                  "JOIN Teams AS t ON p.teamID = t.teamID "
-                  "JOIN Schools AS s ON s.schoolID = a.schoolID ")
         if teamID:
-            query1 += f"WHERE t.teamID = %s;"
-            params.append(teamID)
-        roster = db.query(dbConnection, query1, params).fetchall()
+            roster = db.query(dbConnection, TEAM_ROSTER, (teamID,)).fetchall()
+        else:
+            roster = db.query(dbConnection, PLAYER_ROWS + " ORDER BY r.playerID").fetchall()
         return jsonify(roster)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+
+@app.route("/players/import", methods=["POST"])
+def import_players():
+    """
+    Bulk-assigns athletes to teams from an uploaded CSV file and returns a per-row error report
+    """
+    try:
+        upload = request.files.get("file")
+        if upload is None or not upload.filename:
+            return jsonify({"error": "Please upload a CSV file in the 'file' field"}), 400
+
+        report = importer.importPlayers(db.getConnection(), upload.stream)
+        print(f"Player import: {report.inserted} inserted, {len(report.errors)} rejected")
+        return jsonify(report.asDict())
+
+    except Exception as e:
+        print(f"Error importing players: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/players/export", methods=["GET"])
+def players_export():
+    """
+    Streams the full roster (every player with athlete / team / school info) as CSV or NDJSON
+    """
+    try:
+        return exportResponse(ROSTER_EXPORT, "roster", ROSTER_EXPORT_COLUMNS)
+
+    except Exception as e:
+        print(f"Error exporting players: {e}")
+        return "An error occurred while executing the database queries.", 500
 
 
 @app.route("/players/delete", methods=["POST"])
@@ -602,29 +828,23 @@ def delete_player():
     Removes an athlete from a team
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         playerID = request.form["delete_playerID"]
         name = request.form["delete_player_name"]
 
         # Construct query and call stored procedure
         query = "CALL sp_DeletePlayer(%s)"
-        cursor.execute(query, (playerID,))
-        dbConnection.commit()
+        with db.transaction(dbConnection, tables=("Players",)) as cursor:
+            cursor.execute(query, (playerID,))
 
         # If successful, redirect back to page
         print(f"PlayerID: {playerID} Name: {name} deleted")
-        return redirect(url_for("players", msg=f"delete_ok"))
+        return writeResponse("players", "delete_ok", "deleted", playerID)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
-        return redirect(url_for("players", error="delete_unknown"))
-
-    finally:
-        # Close the DB connection if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("players", "delete_unknown")
 
 
 @app.route("/players/create", methods=["POST"])
@@ -633,36 +853,29 @@ def create_player():
     Assigns an athlete to a new team
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         athleteID = request.form["athleteID"]
         teamID = request.form["teamID"]
 
-        # Call stored procedure to create a player
-        query = "CALL sp_CreatePlayer(%s, %s, @newPlayerID)"
-        playerID = cursor.execute(query, (athleteID, teamID))
-
-        # Retrieve new player ID from out variable
-        cursor.execute("SELECT @newPlayerID AS playerID")
-        row = cursor.fetchone()
-        playerID = row[0] if row else None
+        with db.transaction(dbConnection, tables=("Players",)) as cursor:
+            # Call stored procedure to create a player
+            query = "CALL sp_CreatePlayer(%s, %s, @newPlayerID)"
+            cursor.execute(query, (athleteID, teamID))
 
-        dbConnection.commit()
+            # Retrieve new player ID from out variable
+            cursor.execute("SELECT @newPlayerID AS playerID")
+            row = cursor.fetchone()
+            playerID = row[0] if row else None
 
         # If successful, redirect back to page
         print(f"AthleteID: {athleteID} added to TeamID: {teamID}, new playerID: {playerID}")
-        return redirect(url_for("players", msg=f"create_ok"))
+        return writeResponse("players", "create_ok", "created", playerID, "partials/player_row.j2", PLAYER_ROW)
 
     except Exception as e:
         # Pass player creation error message
         print(f"Error executing queries: {e}")
-        return redirect(url_for("players", error="create_unknown"))
-
-    finally:
-        # CLose the DB connection
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("players", "create_unknown")
 
 
 @app.route("/players/updateTeams", methods=["GET"])
@@ -671,34 +884,17 @@ def player_update_teams():
     Returns teams that a player can be reassigned to
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
+        # One statement: resolve the player's athlete / school, then anti-join their other memberships
         playerID = request.args.get("playerID")
-        query = ("SELECT a.athleteID, a.schoolID "
-                 "FROM Players AS p JOIN Athletes AS a ON p.athleteID = a.athleteID "
-                 "WHERE p.playerID = %s ;")
-        cursor.execute(query, (playerID,))
-        athleteID, schoolID = cursor.fetchone()
-
-        query = ("SELECT t.teamID, s.name AS schoolName, t.teamName, "
-                 "t.sportType, t.varsityJv, t.seasonName, t.academicYear "
-                 "FROM Teams AS t "
-                 "JOIN Schools AS s ON s.schoolID = t.schoolID "
-                 "WHERE teamID NOT IN (SELECT teamID FROM Players WHERE athleteID = %s) "
-                 "AND s.schoolID = %s ;")
-        teams = db.query(dbConnection, query, (athleteID, schoolID, )).fetchall()
+        teams = db.query(dbConnection, REASSIGNABLE_TEAMS, (playerID,)).fetchall()
         return jsonify(teams)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return redirect(url_for("players", error="teams_unknown"))
 
-    finally:
-        # Close the db connection
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route("/players/update", methods=["POST"])
 def update_player():
@@ -706,103 +902,98 @@ def update_player():
     Updates a player's team assignment
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         playerID = request.form["update_playerID"]
         teamID = request.form["update_teamID"]
 
         query = "CALL sp_UpdatePlayer(%s, %s)"
-        cursor.execute(query, (playerID, teamID,))
-
-        dbConnection.commit()
+        with db.transaction(dbConnection, tables=("Players",)) as cursor:
+            cursor.execute(query, (playerID, teamID,))
 
         print(f"PlayerID: {playerID} Updated TeamID: {teamID}")
-        return redirect(url_for("players", msg=f"update_ok"))
+        return writeResponse("players", "update_ok", "updated", playerID, "partials/player_row.j2", PLAYER_ROW)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
-        return redirect(url_for("players", error="update_unknown"))
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("players", "update_unknown")
 
 
 @app.route("/games", methods=["GET"])
+@http_cache.cachedPage("Games", "Teams", "Facilities", "Schools")
 def games():
     try:
-        dbConnection = db.connectDB()  # Open database connection
+        dbConnection = db.getConnection()
+
+        # Page through games by the requested sort column, seeking past the previous page
+        page = pagination.Page(request.args, GAME_SORT, key="g.gameID")
 
-        # Retrieve scheduled games list with associated details
-        query1 = ("SELECT g.gameID AS id, ht.sportType as sport_type, "
-                  "ht.teamName AS home_team, at.teamName AS away_team, "
-                  "s.name AS facility_location, f.facilityName AS facility_name, "
-                  "g.gameDate AS game_date, g.gameTime as game_time, g.gameType as game_type, g.status "
-                  "FROM Games AS g JOIN Teams AS ht ON g.homeTeamID = ht.teamID "
-                  "JOIN Teams AS at ON g.awayTeamID = at.teamID "
-                  "JOIN Facilities AS f ON g.facilityID = f.facilityID "
-                  "JOIN Schools AS s ON s.schoolID = f.schoolID ;")
-        games = db.query(dbConnection, query1).fetchall()
+        # Retrieve page of scheduled games with associated details
+        query1 = page.query(GAME_ROWS)
 
         # Retrieve team list with associated details
         query2 = ("SELECT teamID, schoolID, teamName, sportType, varsityJv, seasonName, academicYear "
                   "FROM Teams")
-        teams = db.query(dbConnection, query2).fetchall()
 
         # Retrieve list of facilities
-        query3 = ("SELECT facilityID, schoolID, facilityName, capacity "
-                  "FROM Facilities")
-        facilities = db.query(dbConnection, query3).fetchall()
+        query3 = db.Cached("SELECT facilityID, schoolID, facilityName, capacity "
+                           "FROM Facilities", tables=("Facilities",))
 
         # Retrieve list of sport types
-        query4 = "SELECT sportType, COUNT(*) as numTeams FROM Teams GROUP BY sportType ORDER BY 2 DESC"
-        sportTypes = db.query(dbConnection, query4).fetchall()
+        query4 = SPORT_COUNTS
+
+        # Fetch every result set in a single round trip
+        games, teams, facilities, sportTypes, gameOptions = db.queryBatch(
+            dbConnection, (query1, query2, query3, query4, GAME_OPTIONS))
+        games = page.load(games)
+        page.total = pagination.count(dbConnection, "Games")
 
         headers = ('Id', 'Sport', 'Home Team', 'Away Team', 'Facility Location', 'Facility Name',
-                   'Game Date', 'Game Time', 'Game Type', 'Status')
+                   'Game Date', 'Game Time', 'Game Type', 'Status', 'Score')
 
         # Render games.j2 file, and send game query results
         return render_template(
             "games.j2", games=games, teams=teams, facilities=facilities,
-            sportTypes=sportTypes, headers=headers
+            sportTypes=sportTypes, gameOptions=gameOptions, headers=headers, page=page
         )
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+
+@app.route("/games/export", methods=["GET"])
+def games_export():
+    """
+    Streams the full game schedule with team and facility details as CSV or NDJSON
+    """
+    try:
+        return exportResponse(SCHEDULE_EXPORT, "schedule", SCHEDULE_EXPORT_COLUMNS)
+
+    except Exception as e:
+        print(f"Error exporting games: {e}")
+        return "An error occurred while executing the database queries.", 500
 
 
 @app.route("/games/delete", methods=["POST"])
 def delete_game():
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         gameID = request.form["delete_gameID"]
 
         # Construct query and call stored procedure
         query = "CALL sp_DeleteGame(%s)"
-        cursor.execute(query, (gameID,))
-        dbConnection.commit()
+        with db.transaction(dbConnection, tables=("Games",)) as cursor:
+            cursor.execute(query, (gameID,))
 
         # If successful, redirect back to page
         print(f"GameID: {gameID} deleted")
-        return redirect(url_for("games", msg="delete_ok"))
+        return writeResponse("games", "delete_ok", "deleted", gameID)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
-        return redirect(url_for("games", error="delete_unknown"))
-
-    finally:
-        # Close the DB connection if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("games", "delete_unknown")
 
 
 @app.route("/games/create", methods=["POST"])
@@ -811,8 +1002,7 @@ def create_game():
     Creates a new game
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         homeTeamID = request.form["homeTeamID"]
         awayTeamID = request.form["awayTeamID"]
@@ -821,32 +1011,100 @@ def create_game():
         gameTime = request.form["gameTime"]
         gameType = request.form["gameType"]
         status = request.form["status"]
+        homeScore = scoreField("homeScore")
+        awayScore = scoreField("awayScore")
 
-        # Call stored procedure to create a player
-        query = "CALL sp_CreateGame(%s, %s, %s, %s, %s, %s, %s, @gameID)"
-        cursor.execute(query, (homeTeamID, awayTeamID, facilityID,
-                               gameDate, gameTime, gameType, status))
-
-        # Retrieve and store new game ID
-        cursor.execute("SELECT @gameID AS gameID")
-        row = cursor.fetchone()
-        gameID = row[0] if row else None
+        # sp_CreateGame also counts the result in Standings when the game is already decided
+        with db.transaction(dbConnection, tables=("Games",)) as cursor:
+            # Call stored procedure to create a game
+            query = "CALL sp_CreateGame(%s, %s, %s, %s, %s, %s, %s, %s, %s, @gameID)"
+            cursor.execute(query, (homeTeamID, awayTeamID, facilityID,
+                                   gameDate, gameTime, gameType, status, homeScore, awayScore))
 
-        dbConnection.commit()
+            # Retrieve and store new game ID
+            cursor.execute("SELECT @gameID AS gameID")
+            row = cursor.fetchone()
+            gameID = row[0] if row else None
 
         # If successful, redirect back to page
         print(f"Game successfully created gameID = {gameID}")
-        return redirect(url_for("games", msg=f"create_ok"))
+        return writeResponse("games", "create_ok", "created", gameID, "partials/game_row.j2", GAME_ROW)
 
     except Exception as e:
         # Pass game creation error message
         print(f"Error executing queries: {e}")
-        return redirect(url_for("games", error="create_unknown"))
+        return writeError("games", "create_unknown")
+
+
+@app.route("/games/schedule", methods=["POST"])
+def schedule_games():
+    """
+    Generates a round-robin season for the selected teams and inserts it in one transaction
+    """
+    try:
+        dbConnection = db.getConnection()
+
+        endDate = request.form.get("schedule_endDate")
+        result = scheduler.schedule(
+            dbConnection,
+            sportType=request.form["schedule_sport"],
+            startDate=datetime.date.fromisoformat(request.form["schedule_startDate"]),
+            varsityJv=request.form.get("schedule_varsityJv") or None,
+            academicYear=request.form.get("schedule_academicYear") or None,
+            roundDays=int(request.form.get("schedule_roundDays") or scheduler.ROUND_DAYS),
+            endDate=datetime.date.fromisoformat(endDate) if endDate else None,
+            double=request.form.get("schedule_double") == "on",
+            gameTime=request.form.get("schedule_gameTime") or "18:00",
+            gameType=request.form.get("schedule_gameType") or "regular season",
+            dryRun=request.form.get("dryRun") == "1",
+        )
+        print(f"Scheduled {len(result['games'])} games in {result['rounds']} rounds, "
+              f"{len(result['unscheduled'])} could not be placed")
 
-    finally:
-        # Close the DB connection
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        if wantsJSON():
+            return Response(json.dumps(result, default=str), mimetype="application/json")
+        return redirect(url_for("games", msg="schedule_ok", scheduled=len(result["games"]),
+                                unscheduled=len(result["unscheduled"])))
+
+    except (KeyError, ValueError) as e:
+        # Missing / malformed form fields, or too few teams to schedule
+        print(f"Invalid schedule request: {e}")
+        if wantsJSON():
+            return jsonify({"error": str(e)}), 400
+        return redirect(url_for("games", error="schedule_invalid"))
+
+    except Exception as e:
+        print(f"Error scheduling games: {e}")
+        if wantsJSON():
+            return jsonify({"error": str(e)}), 500
+        return redirect(url_for("games", error="schedule_unknown"))
+
+
+@app.route("/games/conflicts", methods=["POST"])
+def games_conflicts():
+    """
+    Checks one proposed game or a batch ({"games": [...]}) for facility and team conflicts
+    Returns every conflict in one response; nothing is written
+    """
+    try:
+        payload = request.get_json(silent=True)
+        if payload is None:
+            payload = request.form.to_dict()
+        proposals = payload.get("games", [payload]) if isinstance(payload, dict) else payload
+        if not isinstance(proposals, list) or not all(isinstance(game, dict) for game in proposals):
+            return jsonify({"error": "Send a game object or {\"games\": [...]}"}), 400
+
+        found = conflicts.check(db.getConnection(), proposals)
+        return jsonify({"ok": not found, "checked": len(proposals), "conflicts": found})
+
+    except ValueError as e:
+        # Malformed IDs, dates or times
+        print(f"Invalid conflict check request: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        print(f"Error checking game conflicts: {e}")
+        return jsonify({"error": str(e)}), 500
 
 
 @app.route("/games/update", methods=["POST"])
@@ -855,8 +1113,7 @@ def update_game():
     Updates a game with the provided information
     """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
 
         # Retrieve updated game details
         gameID = request.form["update_gameID"]
@@ -865,46 +1122,36 @@ def update_game():
         gameTime = request.form["update_gameTime"]
         gameType = request.form["update_gameType"]
         status = request.form["update_gameStatus"]
+        homeScore = scoreField("update_homeScore")
+        awayScore = scoreField("update_awayScore")
 
-        # Call update procedure
-        query = "CALL sp_UpdateGame(%s, %s, %s, %s, %s, %s)"
-        cursor.execute(query, (gameID, facilityID, gameDate, gameTime, gameType, status,))
-        dbConnection.commit()
+        # Call update procedure; it swaps the game's old result for the new one in Standings
+        query = "CALL sp_UpdateGame(%s, %s, %s, %s, %s, %s, %s, %s)"
+        with db.transaction(dbConnection, tables=("Games",)) as cursor:
+            cursor.execute(query, (gameID, facilityID, gameDate, gameTime, gameType, status,
+                                   homeScore, awayScore,))
 
         print(f"Game successfully updated gameID = {gameID}")
-        return redirect(url_for("games", msg=f"update_ok"))
+        return writeResponse("games", "update_ok", "updated", gameID, "partials/game_row.j2", GAME_ROW)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
-        return redirect(url_for("games", error="update_unknown"))
-
-    finally:
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+        return writeError("games", "update_unknown")
 
 
 @app.route("/games/teams", methods=["GET"])
 def games_fetch_teams():
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         sportType = request.args.get("sportType")
         homeTeamID = request.args.get("teamID")
-        query = ("SELECT t.teamID, s.name AS 'schoolName', t.varsityJv, t.academicYear "
-                 "FROM Teams as t JOIN Schools as s ON t.schoolID = s.schoolID "
-                 "WHERE t.sportType = %s")
-
-        teams_list = db.query(dbConnection, query, (sportType,)).fetchall()
+        teams_list = db.query(dbConnection, SPORT_TEAMS, (sportType,)).fetchall()
         return jsonify(teams_list)
 
     except Exception as e:
         print(f"Error executing queries: {e}")
         return "An error occurred while executing the database queries.", 500
 
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
-
 
 @app.route('/games/details', methods=["GET"])
 def game_details():
@@ -912,13 +1159,11 @@ def game_details():
     Returns details of the requested gameID
     """
     try:
-        dbConnection = db.connectDB()
+        dbConnection = db.getConnection()
         cursor = dbConnection.cursor()
 
         gameID = request.args.get("gameID")
-        query = ("SELECT gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status "
-                 "FROM Games WHERE gameID = %s")
-        cursor.execute(query, (gameID,))
+        cursor.execute(GAME_DETAILS, (gameID,))
         result = cursor.fetchone()
 
         if not result:
@@ -932,7 +1177,9 @@ def game_details():
             "gameDate":     str(result[4]),
             "gameTime":     str(result[5]),
             "gameType":     result[6],
-            "status":       result[7]
+            "status":       result[7],
+            "homeScore":    result[8],
+            "awayScore":    result[9]
         }
 
         return jsonify(game)
@@ -942,46 +1189,200 @@ def game_details():
         print(f"Error retrieving game details: {e}")
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        # Close the DB connection
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
+
+@app.route("/standings", methods=["GET"])
+@http_cache.cachedPage("Standings", "Teams", "Schools")
+def standings():
+    """
+    Shows the standings for one sport, read from the Standings table (one row per team)
+    Query string: sportType (defaults to the sport with the most teams), varsityJv, academicYear
+    """
+    try:
+        dbConnection = db.getConnection()
+
+        sportTypes, = db.queryBatch(dbConnection, (SPORT_COUNTS,))
+        sportType = request.args.get("sportType") or (sportTypes[0]["sportType"] if sportTypes else None)
+        varsityJv = request.args.get("varsityJv") or None
+        academicYear = request.args.get("academicYear") or None
+
+        filters, params = ["t.sportType = %s"], [sportType]
+        if varsityJv:
+            filters.append("t.varsityJv = %s")
+            params.append(varsityJv)
+        if academicYear:
+            filters.append("t.academicYear = %s")
+            params.append(academicYear)
+
+        # Teams without a counted game have no Standings row yet and show 0-0-0
+        query = f"{STANDINGS_ROWS} WHERE {' AND '.join(filters)}{STANDINGS_ORDER}"
+        rows = db.query(dbConnection, query, params).fetchall()
+
+        headers = ('Id', 'School', 'Team Name', 'Level', 'Academic Year', 'Played', 'Wins', 'Losses', 'Ties',
+                   'Points For', 'Points Against', 'Difference')
+
+        return render_template(
+            "standings.j2", standings=rows, sportTypes=sportTypes, headers=headers,
+            sportType=sportType, varsityJv=varsityJv, academicYear=academicYear
+        )
+
+    except Exception as e:
+        print(f"Error executing queries: {e}")
+        return "An error occurred while executing the database queries.", 500
+
+
+@app.route("/search", methods=["GET"])
+def search_page():
+    """
+    Prefix search over athlete, team, school and facility names (database/search.py)
+    Query string: q (the search term), limit (results per kind)
+    Returns JSON for the search box's suggestions (static/search.js), otherwise a results page
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit", search.SEARCH_LIMIT)), 50))
+    except ValueError:
+        limit = search.SEARCH_LIMIT
+    asJSON = wantsJSON()
+
+    etag = http_cache.etagFor(search.TABLES, request.full_path, asJSON)
+    lastModified = http_cache.lastModifiedFor(search.TABLES)
+    if http_cache.notModified(etag, lastModified):
+        return http_cache.withValidators(Response(status=304), etag, lastModified)
+
+    try:
+        results = search.search(db.getConnection(), request.args.get("q"), limit)
+
+        # Link each result to its list page, starting at that row where the page is paginated
+        startAt = lambda rowID: {"sort": "id", "after": pagination.encodeCursor(rowID - 1, rowID - 1)}
+        for row in results["athletes"]:
+            row.update(label=f"{row['firstName']} {row['lastName']}", detail=row["school"],
+                       url=url_for("athletes", **startAt(row["id"])))
+        for row in results["teams"]:
+            row.update(label=row["teamName"],
+                       detail=f"{row['school']} · {row['sportType']} {row['varsityJv']} {row['academicYear']}",
+                       url=url_for("teams", **startAt(row["id"])))
+        for row in results["schools"]:
+            row.update(label=row["name"], detail="School", url=url_for("schools"))
+        for row in results["facilities"]:
+            row.update(label=row["facilityName"], detail=row["school"], url=url_for("facilities"))
+
+        if asJSON:
+            response = jsonify(results)
+        else:
+            response = Response(render_template("search.j2", results=results))
+        response.vary.add("Accept")
+        return http_cache.withValidators(response, etag, lastModified)
+
+    except Exception as e:
+        print(f"Error executing search: {e}")
+        if asJSON:
+            return jsonify({"error": str(e)}), 500
+        return "An error occurred while executing the database queries.", 500
+
+
+@app.route("/lookups", methods=["GET"])
+def lookups_index():
+    """
+    Returns the dropdown lookup index (database/lookups.py) for static/lookups.js
+    ?since=<version> returns only the sections that changed after that version
+    """
+    def build():
+        payload = lookups.payload(db.getConnection(), request.args.get("since"))
+        return json.dumps(payload, separators=(",", ":"), default=str)
+
+    return http_cache.conditional(lookups.TABLES, build)
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """
+    Returns hit / miss counters for the reference data cache
+    """
+    return jsonify(cache.stats())
 
 
 # RESET DB ROUTE
 @app.route("/reset-database", methods=["POST"])
 def reset_database():
+    """
+    Restores the sample data from its seed snapshot (mode=full rebuilds every table
+    with sp_load_athleticsdb instead); scale=N (form or query string) grows it to
+    N times the sample with generated rows. Reports how long the reset took
+    The fast reset copies the snapshot taken by the last full reset, so use mode=full
+    after any change to DDL.sql
+    """
     try:
-        dbConnection = db.connectDB()
-        cursor = dbConnection.cursor()
+        dbConnection = db.getConnection()
+        try:
+            scale = int(request.values.get("scale") or 1)
+        except ValueError:
+            scale = 0
+        if not 1 <= scale <= MAX_RESET_SCALE:
+            return f"Scale must be between 1 and {MAX_RESET_SCALE}", 400
+        mode = "full" if request.values.get("mode") == "full" else "fast"
 
         # Call the stored procedure to reset the database
-        query = "CALL sp_load_athleticsdb();"
-        cursor.execute(query)
-        
-        # Consume the result set (if any) before running the next query
-        cursor.nextset()  # Move to the next result set (for CALL statements)
-        
-        dbConnection.commit()  # commit the transaction
-
-        print("Database reset successfully!")
-
-        return redirect("/")
+        started = time.perf_counter()
+        query = "CALL sp_load_athleticsdb();" if mode == "full" else "CALL sp_reset_athleticsdb();"
+        try:
+            # Both procedures TRUNCATE or DROP tables, which commit on their own; a reset that
+            # fails part way leaves the tables it got to empty and cannot be rolled back
+            db.executeDDL(dbConnection, query)
+        finally:
+            # Every table was (or may have been) reloaded, so nothing cached is valid anymore
+            cache.clear()
+        resetSeconds = time.perf_counter() - started
+
+        generated = None
+        if scale > 1:
+            generated = generator.generate(dbConnection, scale - 1)
+            print(f"Generated {scale - 1}x the sample data: {generated}")
+
+        seconds = time.perf_counter() - started
+        print(f"Database reset successfully! ({mode} reset in {resetSeconds:.3f}s, {seconds:.3f}s total)")
+
+        if wantsJSON():
+            return jsonify({"mode": mode, "scale": scale, "resetSeconds": round(resetSeconds, 3),
+                            "seconds": round(seconds, 3), "generated": generated})
+        return redirect(url_for("home", msg="reset_ok", seconds=f"{seconds:.3f}"))
         
     except Exception as e:
         print(f"Error resetting database: {e}")
         return (f"An error occurred while resetting the database: {e}"), 500
-        
-    finally:
-        # Close the DB connection, if it exists
-        if "dbConnection" in locals() and dbConnection:
-            dbConnection.close()
 
 
 
+# ########################################
+# ########## CLI COMMANDS
+
+@app.cli.command("import-athletes")
+@click.argument("csv_file", type=click.File("rb"))
+def import_athletes_command(csv_file):
+    """Bulk-import athletes from CSV_FILE."""
+    report = importer.importAthletes(db.getConnection(), csv_file)
+    click.echo(json.dumps(report.asDict(), indent=2))
+
+
+@app.cli.command("import-players")
+@click.argument("csv_file", type=click.File("rb"))
+def import_players_command(csv_file):
+    """Bulk-import roster assignments (athleteID, teamID) from CSV_FILE."""
+    report = importer.importPlayers(db.getConnection(), csv_file)
+    click.echo(json.dumps(report.asDict(), indent=2))
+
+
+@app.cli.command("generate-data")
+@click.option("--scale", type=int, default=1, show_default=True, help="Multiples of the DDL.sql sample to add.")
+@click.option("--seed", type=int, default=None, help="Random seed for reproducible data.")
+def generate_data_command(scale, seed):
+    """Add synthetic schools, teams, facilities, athletes, players and games."""
+    counts = generator.generate(db.getConnection(), scale, seed=seed)
+    click.echo(json.dumps(counts, indent=2))
+
+
 # ########################################
 # ########## LISTENER
 
+# Development server only; production runs prefork workers: gunicorn -c gunicorn.conf.py wsgi:app
 if __name__ == "__main__":
     app.run(
         port=PORT, debug=True
@@ -0,0 +1,183 @@
+"""
+ASGI entry point: async lookup endpoints in front of the Flask app.
+
+The dropdown / edit-form lookups below are single small queries. Here they run
+as coroutines on an aiomysql pool (database/aio.py), so one worker process keeps
+many of them waiting on MySQL at once instead of blocking a thread per request.
+Every other request is passed to the Flask app (app.py) through asgiref's WSGI
+adapter, which runs it in a thread pool as before.
+
+    WEB_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+    uvicorn asgi:app                  (one process, e.g. for development)
+
+Run several processes only through gunicorn: gunicorn.conf.py moves the cache's
+data versions into shared memory (cache.share()) before forking, so a write in
+one worker invalidates the others. `uvicorn --workers N` starts processes that
+each import app.py with their own versions, so the other workers would keep
+serving stale cached queries, fragments, pages and ETags after a write.
+
+Responses match the synchronous routes of the same paths in app.py, which still
+serve these lookups under wsgi.py.
+"""
+
+import time
+from urllib.parse import parse_qs, urlencode
+from asgiref.wsgi import WsgiToAsgi
+import database.aio as aio
+import metrics
+from app import app as flaskApp
+# Same statements as the synchronous routes
+from app import ATHLETE_DETAILS, TEAM_DETAILS, GAME_DETAILS, ELIGIBLE_TEAMS, REASSIGNABLE_TEAMS, SPORT_TEAMS
+
+wsgiApp = WsgiToAsgi(flaskApp)
+
+
+# ########################################
+# ########## RESPONSES
+
+def jsonResponse(payload, status = 200):
+    '''
+    (status, headers, body) serialized the way flask.jsonify does it
+    '''
+    body = (flaskApp.json.dumps(payload) + "\n").encode()
+    return status, [(b"content-type", b"application/json")], body
+
+def textResponse(text, status):
+    return status, [(b"content-type", b"text/html; charset=utf-8")], text.encode()
+
+def redirectResponse(path, **params):
+    location = f"{path}?{urlencode(params)}" if params else path
+    return 302, [(b"location", location.encode())], b""
+
+
+# ########################################
+# ########## LOOKUPS
+
+async def athlete_details(args):
+    """
+    Returns details of the requested athleteID
+    """
+    try:
+        result = await aio.fetchOne(ATHLETE_DETAILS, (args.get("athleteID"),))
+        if not result:
+            return jsonResponse({"error": "Athlete not found"}, 404)
+
+        result["emergencyContact"] = result["emergencyContact"] if result["emergencyContact"] else ""
+        return jsonResponse(result)
+
+    except Exception as e:
+        print(f"Error retrieving athlete details: {e}")
+        return jsonResponse({"error": str(e)}, 500)
+
+async def team_details(args):
+    """
+    Returns details of the requested teamID
+    """
+    try:
+        result = await aio.fetchOne(TEAM_DETAILS, (args.get("teamID"),))
+        if not result:
+            return jsonResponse({"error": "Team not found"}, 404)
+        return jsonResponse(result)
+
+    except Exception as e:
+        print(f"Error retrieving team details: {e}")
+        return jsonResponse({"error": str(e)}, 500)
+
+async def game_details(args):
+    """
+    Returns details of the requested gameID
+    """
+    try:
+        result = await aio.fetchOne(GAME_DETAILS, (args.get("gameID"),))
+        if not result:
+            return redirectResponse("/games", error="details_unknown")
+
+        result["gameDate"] = str(result["gameDate"])
+        result["gameTime"] = str(result["gameTime"])
+        return jsonResponse(result)
+
+    except Exception as e:
+        print(f"Error retrieving game details: {e}")
+        return jsonResponse({"error": str(e)}, 500)
+
+async def players_fetch_teams(args):
+    """
+    Returns list of teams at a single school based on the athleteID provided
+    """
+    try:
+        return jsonResponse(await aio.fetchAll(ELIGIBLE_TEAMS, (args.get("athleteID"),)))
+
+    except Exception as e:
+        print(f"Error executing queries: {e}")
+        return textResponse("An error occurred while executing the database queries.", 500)
+
+async def player_update_teams(args):
+    """
+    Returns teams that a player can be reassigned to
+    """
+    try:
+        return jsonResponse(await aio.fetchAll(REASSIGNABLE_TEAMS, (args.get("playerID"),)))
+
+    except Exception as e:
+        print(f"Error executing queries: {e}")
+        return redirectResponse("/players", error="teams_unknown")
+
+async def games_fetch_teams(args):
+    try:
+        return jsonResponse(await aio.fetchAll(SPORT_TEAMS, (args.get("sportType"),)))
+
+    except Exception as e:
+        print(f"Error executing queries: {e}")
+        return textResponse("An error occurred while executing the database queries.", 500)
+
+LOOKUPS = {
+    "/athletes/details": athlete_details,
+    "/teams/details": team_details,
+    "/games/details": game_details,
+    "/players/teams": players_fetch_teams,
+    "/players/updateTeams": player_update_teams,
+    "/games/teams": games_fetch_teams,
+}
+
+
+# ########################################
+# ########## ASGI APPLICATION
+
+async def lifespan(receive, send):
+    '''
+    opens the worker's async connection pool at startup and closes it at shutdown
+    '''
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await aio.openPool()
+                await send({"type": "lifespan.startup.complete"})
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+        elif message["type"] == "lifespan.shutdown":
+            await aio.closePool()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    '''
+    serves the lookups directly and hands every other request to Flask
+    '''
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+
+    handler = LOOKUPS.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+    if handler is None:
+        return await wsgiApp(scope, receive, send)
+
+    # Like request.args.get(): the first value of each query string parameter
+    args = {name: values[0] for name, values in
+            parse_qs(scope["query_string"].decode("latin-1"), keep_blank_values = True).items()}
+    started = time.perf_counter()
+    status, headers, body = await handler(args)
+    metrics.ROUTE_SECONDS.observe(time.perf_counter() - started, scope["path"], "GET", str(status))
+
+    await send({"type": "http.response.start", "status": status,
+                "headers": headers + [(b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
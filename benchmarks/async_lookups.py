@@ -0,0 +1,96 @@
+"""
+Benchmark: lookup endpoints served by sync threads vs. the async path.
+
+Starts one gunicorn worker of each kind in turn: the WSGI app (wsgi.py, gthread
+worker with --threads threads) and the ASGI app (asgi.py, uvicorn worker, lookups
+on the aiomysql pool). Each is driven with a mix of the JSON lookups at every
+--concurrency level. The threaded worker can only have --threads lookups
+waiting on MySQL at once, so its throughput flattens there; the async worker
+keeps scaling until its pool (DB_AIO_POOL_MAX) or the CPU is the limit.
+
+Run against a loaded MySQL / MariaDB with the app's DB_* variables set:
+    python -m benchmarks.async_lookups --concurrency 4,16,64,256 --requests 4000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+from benchmarks.load_test import RESULTS_DIR, fixtures, gitRevision, report, runRoute
+from benchmarks.worker_scaling import startServer, stopServer
+import database.db_connector as db
+
+MODES = (
+    ("sync", "wsgi:app", None),
+    ("async", "asgi:app", "uvicorn.workers.UvicornWorker"),
+)
+
+
+def lookupPaths(data, count):
+    '''
+    a shuffled mix of every lookup endpoint, built from existing keys
+    '''
+    builders = (
+        lambda: f"/athletes/details?athleteID={random.choice(data['athletes'])}",
+        lambda: f"/teams/details?teamID={random.choice(data['teams'])}",
+        lambda: f"/games/details?gameID={random.choice(data['games'])}",
+        lambda: f"/players/teams?athleteID={random.choice(data['athletes'])}",
+        lambda: f"/players/updateTeams?playerID={random.choice(data['players'])}",
+        lambda: f"/games/teams?sportType={random.choice(data['sports'])}",
+    )
+    return [builders[i % len(builders)]() for i in range(count)]
+
+def runMode(entry, workerClass, paths, args):
+    server, client = startServer(1, args.threads, args.port, entry, workerClass)
+    results = {}
+    try:
+        runRoute(client, 100, 8, lambda i: ("GET", paths[i % len(paths)], None, None))
+        for concurrency in (int(value) for value in args.concurrency.split(",")):
+            results[str(concurrency)] = runRoute(client, args.requests, concurrency,
+                                                 lambda i: ("GET", paths[i % len(paths)], None, None))
+    finally:
+        stopServer(server)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Lookup throughput of sync threads vs. the async path")
+    parser.add_argument("--concurrency", default = "4,16,64,256", help = "comma-separated client counts")
+    parser.add_argument("--threads", type = int, default = 4, help = "threads of the sync worker")
+    parser.add_argument("--requests", type = int, default = 4000, help = "requests per concurrency level")
+    parser.add_argument("--port", type = int, default = 3193)
+    args = parser.parse_args()
+
+    dbConnection = db.connectDB()
+    try:
+        data = fixtures(dbConnection)
+    finally:
+        dbConnection.close()
+    if not all(data[key] for key in ("athletes", "teams", "games", "players")):
+        raise SystemExit("Load some data first (e.g. POST /reset-database?scale=10)")
+    paths = lookupPaths(data, 1000)
+
+    results = {}
+    for mode, entry, workerClass in MODES:
+        print(f"\n=== {mode}: {entry}, 1 worker ===")
+        results[mode] = runMode(entry, workerClass, paths, args)
+        for concurrency, stats in results[mode].items():
+            report(f"{concurrency} clients", stats)
+
+    print()
+    for concurrency in results["sync"]:
+        sync, async_ = results["sync"][concurrency]["throughput"], results["async"][concurrency]["throughput"]
+        print(f"{concurrency:>4} clients: async {async_:8.1f} req/s vs sync {sync:8.1f} req/s ({async_ / sync:5.2f}x)")
+
+    os.makedirs(RESULTS_DIR, exist_ok = True)
+    outPath = os.path.join(RESULTS_DIR, f"lookups-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(outPath, "w") as file:
+        json.dump({
+            "started": datetime.datetime.now().isoformat(timespec = "seconds"),
+            "revision": gitRevision(),
+            "threads": args.threads,
+            "requests": args.requests,
+            "modes": results,
+        }, file, indent = 2)
+    print(f"\nResults saved to {outPath}")
@@ -0,0 +1,132 @@
+"""
+Benchmark: eligible-team lookups, NOT IN subquery vs. anti-join.
+
+Times the queries behind /players/teams and /players/updateTeams in their old
+form (NOT IN subquery, plus a separate round trip to resolve the player) and
+their anti-join form, against whatever data is loaded. Pass --scale N to first
+add N times the sample data with database/generator.py, so the Players table
+is large enough for the difference to show. Reload the sample afterwards with
+/reset-database.
+
+Usage: python -m benchmarks.eligible_teams [--scale N] [--runs N]
+"""
+
+import argparse
+import random
+import statistics
+import time
+import MySQLdb
+import database.db_connector as db
+import database.generator as generator
+
+OLD_TEAMS = ("SELECT teamID, name AS schoolName, teamName, sportType, varsityJv, academicYear "
+             "FROM Schools as s "
+             "JOIN Teams as t ON s.schoolID = t.schoolID "
+             "JOIN Athletes as a ON a.schoolID = s.schoolID "
+             "WHERE a.athleteID = %s "
+             "AND t.teamID NOT IN (SELECT teamID FROM Players WHERE athleteID = %s)")
+
+NEW_TEAMS = ("SELECT t.teamID, s.name AS schoolName, t.teamName, t.sportType, t.varsityJv, t.academicYear "
+             "FROM Athletes AS a "
+             "JOIN Teams AS t ON t.schoolID = a.schoolID "
+             "JOIN Schools AS s ON s.schoolID = t.schoolID "
+             "LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID "
+             "WHERE a.athleteID = %s AND p.playerID IS NULL")
+
+OLD_RESOLVE = ("SELECT a.athleteID, a.schoolID "
+               "FROM Players AS p JOIN Athletes AS a ON p.athleteID = a.athleteID "
+               "WHERE p.playerID = %s")
+
+OLD_UPDATE_TEAMS = ("SELECT t.teamID, s.name AS schoolName, t.teamName, "
+                    "t.sportType, t.varsityJv, t.seasonName, t.academicYear "
+                    "FROM Teams AS t "
+                    "JOIN Schools AS s ON s.schoolID = t.schoolID "
+                    "WHERE teamID NOT IN (SELECT teamID FROM Players WHERE athleteID = %s) "
+                    "AND s.schoolID = %s")
+
+NEW_UPDATE_TEAMS = ("SELECT t.teamID, s.name AS schoolName, t.teamName, "
+                    "t.sportType, t.varsityJv, t.seasonName, t.academicYear "
+                    "FROM Players AS cur "
+                    "JOIN Athletes AS a ON a.athleteID = cur.athleteID "
+                    "JOIN Teams AS t ON t.schoolID = a.schoolID "
+                    "JOIN Schools AS s ON s.schoolID = t.schoolID "
+                    "LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID "
+                    "WHERE cur.playerID = %s AND p.playerID IS NULL")
+
+
+def timeit(runs, call):
+    '''
+    returns per-call latencies in milliseconds
+    '''
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:34} mean={statistics.mean(samples):8.3f} ms  "
+          f"p50={statistics.median(samples):8.3f} ms  p95={p95:8.3f} ms")
+    return statistics.mean(samples)
+
+
+def run(dbConnection, runs):
+    cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
+    cursor.execute("SELECT COUNT(*) AS n FROM Players")
+    print(f"Players rows: {cursor.fetchone()['n']}, {runs} runs each")
+
+    cursor.execute("SELECT athleteID FROM Athletes ORDER BY RAND() LIMIT %s", (runs,))
+    athleteIDs = [row["athleteID"] for row in cursor.fetchall()]
+    cursor.execute("SELECT playerID FROM Players ORDER BY RAND() LIMIT %s", (runs,))
+    playerIDs = [row["playerID"] for row in cursor.fetchall()]
+    if not athleteIDs or not playerIDs:
+        print("No athletes / players loaded")
+        return
+
+    def execute(query, params):
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def oldTeams():
+        athleteID = random.choice(athleteIDs)
+        execute(OLD_TEAMS, (athleteID, athleteID))
+
+    def newTeams():
+        execute(NEW_TEAMS, (random.choice(athleteIDs),))
+
+    def oldUpdateTeams():
+        athlete = execute(OLD_RESOLVE, (random.choice(playerIDs),))[0]
+        execute(OLD_UPDATE_TEAMS, (athlete["athleteID"], athlete["schoolID"]))
+
+    def newUpdateTeams():
+        execute(NEW_UPDATE_TEAMS, (random.choice(playerIDs),))
+
+    # Warm the buffer pool so neither variant pays for the first disk reads
+    timeit(min(runs, 20), oldTeams)
+    timeit(min(runs, 20), newTeams)
+
+    for route, old, new in (("/players/teams", oldTeams, newTeams),
+                            ("/players/updateTeams", oldUpdateTeams, newUpdateTeams)):
+        before = report(f"{route} NOT IN", timeit(runs, old))
+        after = report(f"{route} anti-join", timeit(runs, new))
+        print(f"{route}: {before / after:.2f}x faster\n" if after else "")
+    cursor.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Compare NOT IN and anti-join eligible-team lookups")
+    parser.add_argument("--scale", type = int, default = 0, help = "multiples of the sample data to generate first")
+    parser.add_argument("--runs", type = int, default = 500, help = "timed calls per query")
+    args = parser.parse_args()
+
+    dbConnection = db.connectDB()
+    try:
+        if args.scale:
+            print(f"Generated {generator.generate(dbConnection, args.scale)}")
+        run(dbConnection, args.runs)
+    finally:
+        dbConnection.close()
@@ -0,0 +1,458 @@
+"""
+Load test for every route in app.py.
+
+For each dataset scale (multiples of the DDL.sql sample) the database is reset
+through /reset-database?scale=N, which fills it with generated rows, then every read route is hit by a pool of concurrent clients and
+every write route is exercised with create / update / delete requests for rows
+the run adds itself. Per-route p50 / p95 / p99 latency and throughput are printed,
+saved as JSON under benchmarks/results/, and compared with the previous run:
+routes whose p95 grew or whose throughput fell by more than --threshold are
+flagged as regressions (and the exit status is 1).
+
+Run the app against a local MySQL / MariaDB first, e.g.
+    DB_HOST=127.0.0.1 DB_USER=bench DB_PASSWORD=... DB_NAME=athletics python app.py
+then, with the same DB_* variables:
+    python -m benchmarks.load_test --scales 1,10,100 --requests 200 --concurrency 8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import glob
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+import urllib.parse
+import uuid
+import MySQLdb
+import database.db_connector as db
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SPORT_SEASONS = {"football": "fall", "volleyball": "fall", "basketball": "winter",
+                 "soccer": "winter", "baseball": "spring", "tennis": "spring"}
+
+
+# ########################################
+# ########## SEEDING
+
+def seed(client, scale):
+    '''
+    reloads the DDL.sql sample through /reset-database, grown to scale times its size
+    by database/generator.py; returns the seconds the reset took on the server
+    '''
+    body, headers = form({"scale": scale})
+    status, _, data = client.request("POST", "/reset-database", body, dict(headers, Accept = "application/json"))
+    if status >= 400:
+        raise RuntimeError(f"/reset-database failed with HTTP {status}")
+    return json.loads(data)["seconds"]
+
+def fixtures(dbConnection):
+    '''
+    samples of existing keys to build request parameters from
+    '''
+    cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
+
+    def column(query):
+        cursor.execute(query)
+        return [next(iter(row.values())) for row in cursor.fetchall()]
+
+    data = {
+        "schools": column("SELECT schoolID FROM Schools ORDER BY RAND() LIMIT 500"),
+        "athletes": column("SELECT athleteID FROM Athletes ORDER BY RAND() LIMIT 500"),
+        "teams": column("SELECT teamID FROM Teams ORDER BY RAND() LIMIT 500"),
+        "players": column("SELECT playerID FROM Players ORDER BY RAND() LIMIT 500"),
+        "games": column("SELECT gameID FROM Games ORDER BY RAND() LIMIT 500"),
+        "facilities": column("SELECT facilityID FROM Facilities ORDER BY RAND() LIMIT 500"),
+        "sports": list(SPORT_SEASONS),
+        "names": column("SELECT lastName FROM Athletes ORDER BY RAND() LIMIT 500"),
+    }
+    cursor.close()
+    return data
+
+
+# ########################################
+# ########## HTTP CLIENT
+
+class Client:
+    '''
+    keep-alive HTTP client with one connection per thread
+    '''
+
+    def __init__(self, baseUrl, timeout = 300):
+        parts = urllib.parse.urlsplit(baseUrl)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method, path, body = None, headers = None):
+        '''
+        returns (status, headers, body); redirects are not followed
+        '''
+        for attempt in (1, 2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout = self.timeout)
+            try:
+                connection.request(method, path, body = body, headers = headers or {})
+                response = connection.getresponse()
+                data = response.read()
+                if response.will_close:
+                    connection.close()
+                    self._local.connection = None
+                return response.status, response.headers, data
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+
+def form(fields):
+    return urllib.parse.urlencode(fields), {"Content-Type": "application/x-www-form-urlencoded"}
+
+def upload(filename, content):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: text/csv\r\n\r\n{content}\r\n--{boundary}--\r\n").encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+# ########################################
+# ########## SCENARIOS
+
+def readRoutes(data):
+    '''
+    (name, builder[, headers]) for every GET route; builder(i) returns the request path
+    '''
+    pick = lambda key: (lambda i: random.choice(data[key]) if data[key] else 0)
+    athlete, team, player, game, sport, lastName = (pick(key) for key in
+                                                    ("athletes", "teams", "players", "games", "sports", "names"))
+    return (
+        ("GET /", lambda i: "/"),
+        ("GET /schools", lambda i: "/schools"),
+        ("GET /facilities", lambda i: "/facilities"),
+        ("GET /athletes", lambda i: "/athletes"),
+        ("GET /athletes (sorted)", lambda i: "/athletes?sort=last_name&dir=desc&size=100"),
+        ("GET /athletes/details", lambda i: f"/athletes/details?athleteID={athlete(i)}"),
+        ("GET /teams", lambda i: "/teams"),
+        ("GET /teams/details", lambda i: f"/teams/details?teamID={team(i)}"),
+        ("GET /players", lambda i: "/players"),
+        ("GET /players/teams", lambda i: f"/players/teams?athleteID={athlete(i)}"),
+        ("GET /players/roster", lambda i: f"/players/roster?teamID={team(i)}"),
+        ("GET /players/updateTeams", lambda i: f"/players/updateTeams?playerID={player(i)}"),
+        ("GET /players/export", lambda i: "/players/export"),
+        ("GET /games", lambda i: "/games"),
+        ("GET /games/teams", lambda i: f"/games/teams?sportType={sport(i)}&teamID={team(i)}"),
+        ("GET /games/details", lambda i: f"/games/details?gameID={game(i)}"),
+        ("GET /games/export", lambda i: "/games/export?format=ndjson"),
+        ("GET /standings", lambda i: f"/standings?sportType={sport(i)}"),
+        ("GET /api/v1/standings/<id>", lambda i: f"/api/v1/standings/{team(i)}"),
+        ("GET /search", lambda i: f"/search?q={urllib.parse.quote(str(lastName(i))[:1 + i % 3])}"),
+        ("GET /search (JSON)", lambda i: f"/search?q={urllib.parse.quote(str(lastName(i))[:1 + i % 3])}",
+         {"Accept": "application/json"}),
+        ("GET /lookups", lambda i: "/lookups"),
+        ("GET /lookups?since= (delta)", lambda i: f"/lookups?since={urllib.parse.quote(data['lookupsSince'])}"),
+        ("GET /cache/stats", lambda i: "/cache/stats"),
+        ("GET /metrics", lambda i: "/metrics"),
+        ("GET /api/v1/athletes", lambda i: "/api/v1/athletes?size=100"),
+        ("GET /api/v1/games/<id>", lambda i: f"/api/v1/games/{game(i)}"),
+    )
+
+def created(dbConnection, query):
+    cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+def writeRoutes(dbConnection, data, runID):
+    '''
+    (name, builder or None, setup) for every POST route, in dependency order
+    setup() runs before the route and returns the rows the builder works through
+    builder(i, rows) returns (path, body, headers)
+    '''
+    marker = f"Load{runID}"
+
+    def athleteForm(prefix, i, schoolID, athleteID = None):
+        fields = {f"{prefix}_school": schoolID, f"{prefix}_firstName": f"Bench{i}",
+                  f"{prefix}_lastName": marker, f"{prefix}_gradeLevel": 9 + i % 4,
+                  f"{prefix}_isEligible": 1, f"{prefix}_isActive": 1, f"{prefix}_emergencyContact": "555-000-0000"}
+        if athleteID is not None:
+            fields[f"{prefix}_id"] = athleteID
+        return fields
+
+    def teamForm(prefix, i, schoolID, teamID = None):
+        sport = list(SPORT_SEASONS)[i % len(SPORT_SEASONS)]
+        fields = {f"{prefix}_school": schoolID, f"{prefix}_name": f"{marker} Team {i}",
+                  f"{prefix}_sportType": sport, f"{prefix}_varsityJv": "varsity",
+                  f"{prefix}_seasonName": SPORT_SEASONS[sport], f"{prefix}_academicYear": 2030}
+        if teamID is not None:
+            fields[f"{prefix}_id"] = teamID
+        return fields
+
+    myAthletes = lambda: created(dbConnection, f"SELECT athleteID, schoolID FROM Athletes WHERE lastName = '{marker}'")
+    myTeams = lambda: created(dbConnection, f"SELECT teamID, schoolID FROM Teams WHERE teamName LIKE '{marker} Team %'")
+    myPlayers = lambda: created(dbConnection,
+        "SELECT p.playerID, MIN(t.teamID) AS teamID FROM Players AS p "
+        "JOIN Athletes AS a ON a.athleteID = p.athleteID "
+        "JOIN Teams AS t ON t.schoolID = a.schoolID "
+        "LEFT JOIN Players AS other ON other.athleteID = a.athleteID AND other.teamID = t.teamID "
+        f"WHERE a.lastName = '{marker}' AND other.playerID IS NULL GROUP BY p.playerID")
+    eligiblePairs = lambda: created(dbConnection,
+        "SELECT a.athleteID, t.teamID FROM Athletes AS a JOIN Teams AS t ON t.schoolID = a.schoolID "
+        "LEFT JOIN Players AS p ON p.athleteID = a.athleteID AND p.teamID = t.teamID "
+        f"WHERE a.lastName = '{marker}' AND p.playerID IS NULL")
+    myGames = lambda: created(dbConnection,
+        f"SELECT g.gameID, g.facilityID FROM Games AS g JOIN Teams AS t ON t.teamID = g.homeTeamID "
+        f"WHERE t.teamName LIKE '{marker} Team %'")
+    gameSlots = lambda: created(dbConnection,
+        f"SELECT h.teamID AS homeTeamID, a.teamID AS awayTeamID, f.facilityID FROM Teams AS h "
+        f"JOIN Teams AS a ON a.sportType = h.sportType AND a.teamID <> h.teamID "
+        f"JOIN Facilities AS f ON f.schoolID = h.schoolID "
+        f"WHERE h.teamName LIKE '{marker} Team %' LIMIT 5000")
+
+    def gameDate(i):
+        return (datetime.date(2031, 1, 1) + datetime.timedelta(days = i)).isoformat()
+
+    def csvAthletes(i, rows):
+        lines = ["schoolID,firstName,lastName,gradeLevel"]
+        lines += [f"{random.choice(data['schools'])},Import{i}_{n},{marker},{9 + n % 4}" for n in range(50)]
+        return upload("athletes.csv", "\n".join(lines))
+
+    def csvPlayers(i, rows):
+        lines = ["athleteID,teamID"] + [f"{row['athleteID']},{row['teamID']}" for row in rows[i * 50:(i + 1) * 50]]
+        return upload("players.csv", "\n".join(lines))
+
+    def proposals(i):
+        # A batch of ten proposed games for /games/conflicts, some on the same dates
+        return json.dumps({"games": [{"homeTeamID": random.choice(data["teams"]),
+                                      "awayTeamID": random.choice(data["teams"]),
+                                      "facilityID": random.choice(data["facilities"]),
+                                      "gameDate": gameDate(i % 30 + n % 3), "gameTime": f"{12 + n}:00"}
+                                     for n in range(10)]}), {"Content-Type": "application/json"}
+
+    def post(path, build):
+        return lambda i, rows: (path, *build(i, rows))
+
+    return (
+        ("POST /athletes/create", lambda: data["schools"], post("/athletes/create",
+            lambda i, rows: form(athleteForm("create_athlete", i, random.choice(rows))))),
+        ("POST /athletes/update", myAthletes, post("/athletes/update",
+            lambda i, rows: form(athleteForm("update_athlete", i, rows[i]["schoolID"], rows[i]["athleteID"])))),
+        ("POST /athletes/import", lambda: data["schools"], post("/athletes/import", csvAthletes)),
+        ("POST /teams/create", lambda: data["schools"], post("/teams/create",
+            lambda i, rows: form(teamForm("create_team", i, random.choice(rows))))),
+        ("POST /teams/update", myTeams, post("/teams/update",
+            lambda i, rows: form(teamForm("update_team", i, rows[i]["schoolID"], rows[i]["teamID"])))),
+        ("POST /players/create", eligiblePairs, post("/players/create",
+            lambda i, rows: form({"athleteID": rows[i]["athleteID"], "teamID": rows[i]["teamID"]}))),
+        ("POST /players/import", eligiblePairs, post("/players/import", csvPlayers)),
+        ("POST /players/update", myPlayers, post("/players/update",
+            lambda i, rows: form({"update_playerID": rows[i]["playerID"], "update_teamID": rows[i]["teamID"]}))),
+        # Plans a season for one sport without inserting it
+        ("POST /games/schedule (dry run)", lambda: data["teams"], post("/games/schedule",
+            lambda i, rows: (form({"schedule_sport": data["sports"][i % len(data["sports"])],
+                                   "schedule_startDate": gameDate(20000 + i), "dryRun": 1})[0],
+                             {"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"}))),
+        # Read-only: checks a batch of proposals against the schedule and each other
+        ("POST /games/conflicts", lambda: data["facilities"] and data["teams"], post("/games/conflicts",
+            lambda i, rows: proposals(i))),
+        ("POST /games/create", gameSlots, post("/games/create",
+            lambda i, rows: form({"homeTeamID": rows[i]["homeTeamID"], "awayTeamID": rows[i]["awayTeamID"],
+                                  "facilityID": rows[i]["facilityID"], "gameDate": gameDate(i), "gameTime": "18:00",
+                                  "gameType": "exhibition", "status": "scheduled"}))),
+        ("POST /games/update", myGames, post("/games/update",
+            lambda i, rows: form({"update_gameID": rows[i]["gameID"], "update_facilityID": rows[i]["facilityID"],
+                                  "update_gameDate": gameDate(10000 + i), "update_gameTime": "19:30",
+                                  "update_gameType": "exhibition", "update_gameStatus": "completed",
+                                  "update_homeScore": i % 7, "update_awayScore": i % 5}))),
+        ("POST /games/delete", myGames, post("/games/delete",
+            lambda i, rows: form({"delete_gameID": rows[i]["gameID"]}))),
+        ("POST /players/delete", myPlayers, post("/players/delete",
+            lambda i, rows: form({"delete_playerID": rows[i]["playerID"], "delete_player_name": marker}))),
+        ("POST /teams/delete", myTeams, post("/teams/delete",
+            lambda i, rows: form({"delete_team_id": rows[i]["teamID"], "delete_team_name": marker}))),
+        ("POST /athletes/delete", myAthletes, post("/athletes/delete",
+            lambda i, rows: form({"delete_athlete_id": rows[i]["athleteID"], "delete_athlete_name": marker}))),
+    )
+
+
+# ########################################
+# ########## RUNNER
+
+def percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+def runRoute(client, requests, concurrency, build):
+    '''
+    sends requests built by build(i) -> (method, path, body, headers) from a thread pool
+    returns latency percentiles (ms), throughput and the error count
+    '''
+    def one(i):
+        method, path, body, headers = build(i)
+        started = time.perf_counter()
+        try:
+            status, responseHeaders, _ = client.request(method, path, body, headers)
+            # Write routes report failures as a redirect carrying ?error=
+            failed = status >= 400 or "error=" in (responseHeaders.get("Location") or "")
+        except Exception:
+            failed = True
+        return (time.perf_counter() - started) * 1000, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers = concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, failed in results if failed),
+        "p50": round(percentile(latencies, 0.50), 3),
+        "p95": round(percentile(latencies, 0.95), 3),
+        "p99": round(percentile(latencies, 0.99), 3),
+        "mean": round(sum(latencies) / len(latencies), 3),
+        "throughput": round(requests / wall, 2) if wall else None,
+    }
+
+def lookupsSince(client):
+    '''
+    a /lookups version one write behind the server's, so ?since= answers with a one-section delta
+    '''
+    _, _, body = client.request("GET", "/lookups", None, {"Accept": "application/json"})
+    parts = json.loads(body)["version"].split(".")
+    # The last part is the Players data version (see database/lookups.py)
+    parts[-1] = str(max(0, int(parts[-1]) - 1))
+    return ".".join(parts)
+
+def runScale(client, dbConnection, scale, args):
+    results = {}
+    resetSeconds = seed(client, scale)
+    print(f"\n=== scale {scale}x (reset {resetSeconds * 1000:.0f} ms) ===")
+    data = fixtures(dbConnection)
+    data["lookupsSince"] = lookupsSince(client)
+
+    for name, path, *extra in readRoutes(data):
+        headers = extra[0] if extra else None
+        # Exports stream whole tables; fewer requests keep the run time reasonable
+        count = max(1, args.requests // 10) if "export" in name else args.requests
+        results[name] = runRoute(client, count, args.concurrency,
+                                 lambda i, path = path, headers = headers: ("GET", path(i), None, headers))
+        report(name, results[name])
+
+    if not args.no_writes:
+        runID = uuid.uuid4().hex[:8]
+        for name, setup, build in writeRoutes(dbConnection, data, runID):
+            rows = setup()
+            count = min(args.requests, len(rows))
+            if "import" in name:
+                count = min(count, max(1, args.requests // 10), max(1, len(rows) // 50))
+            if count == 0:
+                print(f"{name:32} skipped (no rows to work on)")
+                continue
+            results[name] = runRoute(client, count, args.concurrency,
+                                     lambda i, build = build, rows = rows: ("POST", *build(i, rows)))
+            report(name, results[name])
+
+    return {"resetSeconds": round(resetSeconds, 3), "routes": results}
+
+def report(name, stats):
+    print(f"{name:32} n={stats['requests']:<5} err={stats['errors']:<4} p50={stats['p50']:8.2f}  "
+          f"p95={stats['p95']:8.2f}  p99={stats['p99']:8.2f} ms  {stats['throughput']:8.1f} req/s")
+
+
+# ########################################
+# ########## REGRESSIONS
+
+def previousRun():
+    runs = sorted(glob.glob(os.path.join(RESULTS_DIR, "run-*.json")))
+    if not runs:
+        return None, None
+    with open(runs[-1]) as file:
+        return runs[-1], json.load(file)
+
+def regressions(baseline, current, threshold, floorMs = 1.0):
+    '''
+    routes whose p95 latency or throughput moved the wrong way by more than threshold
+    floorMs: p95 changes smaller than this are noise and never flagged
+    '''
+    flagged = []
+    for scale, run in current["scales"].items():
+        before = baseline.get("scales", {}).get(scale, {}).get("routes", {})
+        for name, stats in run["routes"].items():
+            old = before.get(name)
+            if not old:
+                continue
+            if stats["p95"] - old["p95"] > floorMs and stats["p95"] > old["p95"] * (1 + threshold):
+                flagged.append(f"{scale}x {name}: p95 {old['p95']:.2f} -> {stats['p95']:.2f} ms")
+            if old["throughput"] and stats["throughput"] < old["throughput"] * (1 - threshold):
+                flagged.append(f"{scale}x {name}: throughput {old['throughput']:.1f} -> {stats['throughput']:.1f} req/s")
+    return flagged
+
+def gitRevision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True,
+                              text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark every route of the athletics app")
+    parser.add_argument("--base-url", default = "http://127.0.0.1:3092")
+    parser.add_argument("--scales", default = "1,10,100", help = "comma-separated multiples of the DDL.sql sample")
+    parser.add_argument("--requests", type = int, default = 200, help = "requests per route")
+    parser.add_argument("--concurrency", type = int, default = 8, help = "concurrent clients")
+    parser.add_argument("--threshold", type = float, default = 0.2, help = "relative change flagged as a regression")
+    parser.add_argument("--no-writes", action = "store_true", help = "only benchmark GET routes")
+    parser.add_argument("--baseline", help = "results file to compare with (default: the latest run)")
+    args = parser.parse_args()
+
+    client = Client(args.base_url)
+    dbConnection = db.connectDB()
+    # Autocommit so every lookup sees the rows the app has just written
+    dbConnection.autocommit(True)
+    try:
+        current = {
+            "started": datetime.datetime.now().isoformat(timespec = "seconds"),
+            "revision": gitRevision(),
+            "baseUrl": args.base_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "scales": {},
+        }
+        for scale in (int(value) for value in args.scales.split(",")):
+            current["scales"][str(scale)] = runScale(client, dbConnection, scale, args)
+    finally:
+        dbConnection.close()
+
+    if args.baseline:
+        baselinePath = args.baseline
+        with open(baselinePath) as file:
+            baseline = json.load(file)
+    else:
+        baselinePath, baseline = previousRun()
+
+    os.makedirs(RESULTS_DIR, exist_ok = True)
+    outPath = os.path.join(RESULTS_DIR, f"run-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(outPath, "w") as file:
+        json.dump(current, file, indent = 2)
+    print(f"\nResults saved to {outPath}")
+
+    if baseline is None:
+        print("No previous run to compare with")
+    else:
+        flagged = regressions(baseline, current, args.threshold)
+        print(f"Compared with {baselinePath}: {len(flagged)} regression(s)")
+        for line in flagged:
+            print(f"  REGRESSION {line}")
+        if flagged:
+            raise SystemExit(1)
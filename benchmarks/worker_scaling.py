@@ -0,0 +1,113 @@
+"""
+Benchmark: throughput of the production serving mode by worker count.
+
+For each worker count, starts `gunicorn -c gunicorn.conf.py wsgi:app` on its own
+port with WEB_WORKERS set, waits for it to answer, then drives a mix of read
+routes from a pool of concurrent clients and records throughput and latency.
+Speedup is relative to the first (smallest) worker count; on a multi-core box it
+should grow close to linearly until the cores or the database are saturated.
+
+List pages are normally answered from the page cache. --uncached adds a unique
+query string to every request so each one is rendered from the database.
+
+Run against a loaded MySQL / MariaDB with the app's DB_* variables set:
+    python -m benchmarks.worker_scaling --workers 1,2,4,8 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.load_test import Client, RESULTS_DIR, gitRevision, report, runRoute
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ("/schools", "/facilities", "/athletes?sort=last_name&size=100", "/teams", "/players",
+         "/games?sort=game_date&dir=desc", "/standings", "/api/v1/athletes?size=100")
+
+
+def startServer(workers, threads, port, entry = "wsgi:app", workerClass = None):
+    '''
+    starts gunicorn with the given worker / thread counts and waits until it answers
+    entry / workerClass: e.g. "asgi:app" with "uvicorn.workers.UvicornWorker"
+    '''
+    env = dict(os.environ, WEB_WORKERS = str(workers), WEB_THREADS = str(threads), BIND = f"127.0.0.1:{port}",
+               WEB_WORKER_CLASS = workerClass or "")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", entry],
+                              cwd = ROOT, env = env, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+    client = Client(f"http://127.0.0.1:{port}")
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            client.request("GET", "/")
+            return server, client
+        except OSError:
+            time.sleep(0.2)
+    stopServer(server)
+    raise RuntimeError("gunicorn did not start within 60 seconds")
+
+def stopServer(server):
+    # SIGTERM lets the workers finish in-flight requests (graceful_timeout)
+    server.terminate()
+    try:
+        server.wait(timeout = 60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+def runWorkers(workers, args, port):
+    server, client = startServer(workers, args.threads, port)
+    try:
+        # Warm up: compile queries and fill the caches before timing
+        runRoute(client, len(PATHS) * 4, args.concurrency, lambda i: ("GET", PATHS[i % len(PATHS)], None, None))
+
+        def build(i):
+            path = PATHS[i % len(PATHS)]
+            if args.uncached:
+                path += ("&" if "?" in path else "?") + f"_={i}"
+            return "GET", path, None, None
+
+        return runRoute(client, args.requests, args.concurrency, build)
+    finally:
+        stopServer(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Throughput of gunicorn workers serving the athletics app")
+    parser.add_argument("--workers", default = "1,2,4,8", help = "comma-separated worker counts")
+    parser.add_argument("--threads", type = int, default = 4, help = "threads per worker")
+    parser.add_argument("--requests", type = int, default = 2000, help = "requests per worker count")
+    parser.add_argument("--concurrency", type = int, default = 32, help = "concurrent clients")
+    parser.add_argument("--port", type = int, default = 3192)
+    parser.add_argument("--uncached", action = "store_true", help = "make every URL unique to bypass the page cache")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.threads} threads per worker, {args.concurrency} clients, "
+          f"{'uncached' if args.uncached else 'cached'} pages")
+    results = {}
+    for workers in (int(value) for value in args.workers.split(",")):
+        results[str(workers)] = runWorkers(workers, args, args.port)
+        report(f"{workers} worker(s)", results[str(workers)])
+
+    base = next(iter(results.values()))["throughput"]
+    print()
+    for workers, stats in results.items():
+        print(f"{workers:>3} worker(s): {stats['throughput'] / base:5.2f}x the throughput of {next(iter(results))}")
+
+    os.makedirs(RESULTS_DIR, exist_ok = True)
+    outPath = os.path.join(RESULTS_DIR, f"workers-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(outPath, "w") as file:
+        json.dump({
+            "started": datetime.datetime.now().isoformat(timespec = "seconds"),
+            "revision": gitRevision(),
+            "cpus": os.cpu_count(),
+            "threads": args.threads,
+            "concurrency": args.concurrency,
+            "uncached": args.uncached,
+            "workers": results,
+        }, file, indent = 2)
+    print(f"\nResults saved to {outPath}")
@@ -0,0 +1,60 @@
+"""
+Async MySQL access for the ASGI lookup endpoints (see asgi.py).
+
+An aiomysql connection pool, opened on the event loop of each worker process,
+so a lookup waiting on MySQL yields to the other requests instead of holding a
+thread. Uses the same credentials as db_connector.py; connections run in
+autocommit mode like the pooled synchronous ones, and are for reads only.
+"""
+
+import os
+import time
+import aiomysql
+import database.db_connector as db
+import metrics
+
+AIO_POOL_MIN = int(os.getenv('DB_AIO_POOL_MIN', 1))    # connections opened at startup
+AIO_POOL_MAX = int(os.getenv('DB_AIO_POOL_MAX', 20))   # max connections per worker process
+
+pool = None
+
+async def openPool(minsize = AIO_POOL_MIN, maxsize = AIO_POOL_MAX):
+    '''
+    creates the worker's connection pool; call once the event loop is running
+    '''
+    global pool
+    if pool is None:
+        pool = await aiomysql.create_pool(host = db.host, user = db.user, password = db.passwd, db = db.db,
+                                          minsize = minsize, maxsize = maxsize, autocommit = True,
+                                          charset = "utf8mb4", pool_recycle = int(db.POOL_RECYCLE),
+                                          cursorclass = aiomysql.DictCursor)
+    return pool
+
+async def closePool():
+    '''
+    closes every connection, waiting for checked-out ones to be returned
+    '''
+    global pool
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+        pool = None
+
+async def fetchAll(query, query_params = ()):
+    '''
+    executes a read-only SQL query on a pooled connection and returns its rows as dicts
+    '''
+    async with pool.acquire() as dbConnection:
+        async with dbConnection.cursor() as cursor:
+            started = time.perf_counter()
+            await cursor.execute(query, query_params)
+            rows = await cursor.fetchall()
+            metrics.observeQuery(query, time.perf_counter() - started, len(rows), query_params)
+            return rows
+
+async def fetchOne(query, query_params = ()):
+    '''
+    returns the first row of a read-only SQL query, or None
+    '''
+    rows = await fetchAll(query, query_params)
+    return rows[0] if rows else None
@@ -0,0 +1,241 @@
+"""
+In-process read-through cache for reference data (Schools, Facilities, sport types, counts).
+
+Every cached value is tagged with the tables it was read from. Writes bump those
+tables' data versions through invalidate(), and an entry whose tables have moved
+on since it was filled is treated as a miss. Entries also expire after a TTL and
+the least recently used entry is evicted once the cache is full.
+
+Entries live in each process, but the data versions can be moved into shared
+memory with share() before worker processes are forked (see gunicorn.conf.py),
+so a write handled by one worker invalidates every worker's entries.
+"""
+
+from collections import OrderedDict
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+
+CACHE_SIZE = int(os.getenv('CACHE_SIZE', 256))   # max number of cached values
+CACHE_TTL = float(os.getenv('CACHE_TTL', 300))   # seconds before a cached value expires
+
+# Deleting / updating a row in a parent table cascades to these child tables (see DDL.sql)
+CASCADES = {
+    "Schools": ("Teams", "Facilities", "Athletes"),
+    "Teams": ("Players", "Games", "Standings"),
+    "Athletes": ("Players",),
+    "Facilities": ("Games",),
+    "Players": ("RosterView",),
+    "Games": ("Standings",),
+}
+
+# Every table a write can be tagged with; SharedVersions has one slot per table
+TABLES = ("Schools", "Facilities", "Athletes", "Teams", "Players", "Games", "Standings", "RosterView")
+
+MISS = object()
+
+
+class LocalVersions:
+    '''
+    data versions and last write times, visible to this process only
+    '''
+
+    def __init__(self):
+        self.started = time.time()      # writes before this are unknown to this store
+        self._versions = {}             # table -> data version
+        self._modified = {}             # table -> time of the last write
+        self._lock = threading.Lock()
+
+    def get(self, table):
+        return self._versions.get(table, 0)
+
+    def modified(self, table):
+        return self._modified.get(table, self.started)
+
+    def bump(self, tables, now):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+
+
+class SharedVersions:
+    '''
+    data versions and last write times in an anonymous shared memory map
+    processes forked after it is created read and bump the same counters
+    each slot is (version, last write time); 0.0 means no write since started
+    '''
+
+    SLOT = struct.Struct("qd")
+
+    def __init__(self, tables = TABLES):
+        self.started = time.time()
+        self._slots = {table: index * self.SLOT.size for index, table in enumerate(tables)}
+        self._map = mmap.mmap(-1, self.SLOT.size * len(tables))
+        self._lock = multiprocessing.Lock()   # serializes bumps across processes; reads take no lock
+
+    def get(self, table):
+        offset = self._slots.get(table)
+        return 0 if offset is None else self.SLOT.unpack_from(self._map, offset)[0]
+
+    def modified(self, table):
+        offset = self._slots.get(table)
+        modified = 0.0 if offset is None else self.SLOT.unpack_from(self._map, offset)[1]
+        return modified or self.started
+
+    def bump(self, tables, now):
+        with self._lock:
+            for table in tables:
+                offset = self._slots[table]
+                version, _ = self.SLOT.unpack_from(self._map, offset)
+                self.SLOT.pack_into(self._map, offset, version + 1, now)
+
+
+class TTLCache:
+    '''
+    thread-safe LRU cache whose entries expire after a TTL or when a tagged table changes
+    '''
+
+    def __init__(self, maxsize = CACHE_SIZE, ttl = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, expires, {table: version})
+        self.store = LocalVersions()    # table data versions; see share()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def started(self):
+        '''
+        time the data versions were created; writes before this are unknown to the cache
+        '''
+        return self.store.started
+
+    def get(self, key):
+        '''
+        returns the cached value for key, or MISS
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, versions = entry
+                if expires > time.monotonic() and all(
+                        self.store.get(table) == version for table, version in versions.items()):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return MISS
+
+    def set(self, key, value, tables = (), ttl = None, versions = None):
+        '''
+        stores value under key, tagged with the tables it was read from
+        versions: table versions captured before the value was read, so a write that
+        lands while the value is being loaded still invalidates it
+        '''
+        with self._lock:
+            if versions is None:
+                versions = {table: self.store.get(table) for table in tables}
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl), versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last = False)
+                self.evictions += 1
+
+    def versions(self, tables):
+        '''
+        returns the current data version of each table
+        '''
+        return {table: self.store.get(table) for table in tables}
+
+    def lastModified(self, tables):
+        '''
+        returns the time of the most recent write to any of the tables
+        '''
+        return max([self.store.modified(table) for table in tables] or [self.started])
+
+    def invalidate(self, *tables):
+        '''
+        marks tables (and the tables their deletes cascade to) as changed
+        '''
+        changed = set()
+        pending = list(tables)
+        while pending:
+            table = pending.pop()
+            if table not in changed:
+                changed.add(table)
+                pending.extend(CASCADES.get(table, ()))
+
+        self.store.bump(changed, time.time())
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self):
+        '''
+        drops every entry and marks every known table as changed
+        '''
+        with self._lock:
+            self._entries.clear()
+        self.invalidate(*TABLES)
+
+    def stats(self):
+        '''
+        hit / miss counters for monitoring
+        '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "versions": {table: self.store.get(table) for table in TABLES},
+                "shared": isinstance(self.store, SharedVersions),
+            }
+
+
+cache = TTLCache()
+
+def share():
+    '''
+    moves the data versions into shared memory; call in the parent before forking workers
+    '''
+    cache.store = SharedVersions()
+
+def cached(key, tables, loader, ttl = None):
+    '''
+    returns the cached value for key, calling loader() to fill it on a miss
+    tables: tables the value is read from; a write to any of them invalidates it
+    '''
+    value = cache.get(key)
+    if value is MISS:
+        versions = cache.versions(tables)
+        value = loader()
+        cache.set(key, value, tables, ttl, versions)
+    return value
+
+def versions(tables):
+    return cache.versions(tables)
+
+def lastModified(tables):
+    return cache.lastModified(tables)
+
+def invalidate(*tables):
+    cache.invalidate(*tables)
+
+def clear():
+    cache.clear()
+
+def stats():
+    return cache.stats()
@@ -0,0 +1,205 @@
+"""
+Conflict checking for proposed games, before they are created or updated.
+
+A proposed game conflicts when:
+- its home and away team are the same team
+- its facility already hosts a game that date (the facility_in_use key)
+- either team already plays within WINDOW_MINUTES of its start time that day
+  (cancelled / postponed games do not count)
+
+A batch is checked against existing Games in one round trip: one lookup
+per kind (facility, home team, away team), each a row-constructor IN list that
+is served by facility_in_use, idx_games_home_date and idx_games_away_date.
+The proposals are also checked against each other with a sweep over each
+team's games sorted by start time, which compares every pair that starts
+within the window.
+"""
+
+import collections
+import datetime
+import os
+import database.db_connector as db
+
+WINDOW_MINUTES = int(os.getenv('CONFLICT_WINDOW_MINUTES', 180))   # a team's games must start this far apart
+
+# Games that no longer occupy their teams
+INACTIVE_STATUSES = ("cancelled", "postponed")
+
+FIELDS = ("homeTeamID", "awayTeamID", "facilityID", "gameDate", "gameTime")
+
+
+def check(dbConnection, proposals, window = WINDOW_MINUTES):
+    '''
+    returns every conflict for a list of proposed games
+    proposals: dicts with homeTeamID, awayTeamID, facilityID, gameDate, gameTime and,
+    for an update, the gameID being changed (missing fields are taken from that game)
+    each conflict: {"index", "type", "message"} plus "gameID" (an existing game)
+    or "otherIndex" (another proposal) it collides with
+    '''
+    games = _complete(dbConnection, [dict(proposal) for proposal in proposals])
+    conflicts = []
+
+    for index, game in enumerate(games):
+        if game["homeTeamID"] is not None and game["homeTeamID"] == game["awayTeamID"]:
+            conflicts.append({"index": index, "type": "same_team",
+                              "message": "Home and away team must be different"})
+
+    checkable = [(index, game) for index, game in enumerate(games)
+                 if game["gameDate"] is not None and (game["facilityID"] is not None or game["homeTeamID"] is not None)]
+    if checkable:
+        conflicts += _againstExisting(dbConnection, checkable, window)
+    conflicts += _withinBatch(checkable, window)
+
+    return sorted(conflicts, key = lambda conflict: conflict["index"])
+
+
+def _complete(dbConnection, games):
+    # Fill fields an update form leaves out (e.g. the teams) from the game being updated
+    gameIDs = sorted({_coerce(game, "gameID", int) for game in games if game.get("gameID")})
+    existing = {}
+    if gameIDs:
+        query = (f"SELECT gameID, {', '.join(FIELDS)} FROM Games "
+                 f"WHERE gameID IN ({', '.join(['%s'] * len(gameIDs))})")
+        existing = {row["gameID"]: row for row in db.query(dbConnection, query, gameIDs).fetchall()}
+
+    for game in games:
+        gameID = _coerce(game, "gameID", int) if game.get("gameID") else None
+        game["gameID"] = gameID
+        for field in FIELDS:
+            if game.get(field) in (None, "") and gameID in existing:
+                game[field] = existing[gameID][field]
+            game.setdefault(field, None)
+            if game[field] == "":
+                game[field] = None
+        for field in ("homeTeamID", "awayTeamID", "facilityID"):
+            if game[field] is not None:
+                game[field] = _coerce(game, field, int)
+        game["gameDate"] = _coerce(game, "gameDate", _date)
+        game["minutes"] = _coerce(game, "gameTime", _minutes)
+    return games
+
+
+def existingQueries(facilityKeys, teamKeys):
+    '''
+    returns the (facility, home team, away team) queries for the stored games on the given days
+    facilityKeys / teamKeys: (facilityID, gameDate) / (teamID, gameDate) pairs
+    '''
+    columns = "gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, status"
+    queries = []
+    for column, keys in (("facilityID", facilityKeys), ("homeTeamID", teamKeys), ("awayTeamID", teamKeys)):
+        if keys:
+            rows = ", ".join(["(%s, %s)"] * len(keys))
+            queries.append((f"SELECT {columns} FROM Games WHERE ({column}, gameDate) IN ({rows})",
+                            [value for key in keys for value in key]))
+        else:
+            queries.append(f"SELECT {columns} FROM Games WHERE FALSE")
+    return queries
+
+
+def _againstExisting(dbConnection, checkable, window):
+    facilityKeys = sorted({(game["facilityID"], game["gameDate"]) for _, game in checkable if game["facilityID"] is not None})
+    teamKeys = sorted({(game[side], game["gameDate"]) for _, game in checkable
+                       for side in ("homeTeamID", "awayTeamID") if game[side] is not None})
+    byFacility, byHome, byAway = db.queryBatch(dbConnection, existingQueries(facilityKeys, teamKeys))
+
+    facilityGames = {}
+    for row in byFacility:
+        facilityGames.setdefault((row["facilityID"], row["gameDate"]), []).append(row)
+    teamGames = {}
+    for row in byHome + byAway:
+        if row["status"] in INACTIVE_STATUSES:
+            continue
+        for side in ("homeTeamID", "awayTeamID"):
+            teamGames.setdefault((row[side], row["gameDate"]), {})[row["gameID"]] = row
+
+    conflicts = []
+    for index, game in checkable:
+        for other in facilityGames.get((game["facilityID"], game["gameDate"]), ()):
+            if other["gameID"] != game["gameID"]:
+                conflicts.append({"index": index, "type": "facility", "gameID": other["gameID"],
+                                  "message": f"Facility {game['facilityID']} already hosts game {other['gameID']} "
+                                             f"on {game['gameDate']}"})
+        for side in ("homeTeamID", "awayTeamID"):
+            teamID = game[side]
+            for other in teamGames.get((teamID, game["gameDate"]), {}).values():
+                if other["gameID"] != game["gameID"] and _overlaps(game["minutes"], _minutes(other["gameTime"]), window):
+                    conflicts.append({"index": index, "type": "team", "teamID": teamID, "gameID": other["gameID"],
+                                      "message": f"Team {teamID} already plays game {other['gameID']} at "
+                                                 f"{_clock(other['gameTime'])} on {game['gameDate']}"})
+    return conflicts
+
+
+def _withinBatch(checkable, window):
+    conflicts = []
+
+    # Two proposals for the same facility and date
+    seen = {}
+    for index, game in checkable:
+        key = (game["facilityID"], game["gameDate"])
+        if game["facilityID"] is None:
+            continue
+        if key in seen:
+            conflicts.append({"index": index, "type": "facility", "otherIndex": seen[key],
+                              "message": f"Facility {game['facilityID']} is proposed twice on {game['gameDate']}"})
+        else:
+            seen[key] = index
+
+    # Sweep each team's proposals in start-time order, comparing each start with every earlier start
+    # still inside the window; proposals without a time overlap every other proposal that day
+    byTeam = {}
+    for index, game in checkable:
+        for side in ("homeTeamID", "awayTeamID"):
+            if game[side] is not None:
+                byTeam.setdefault((game[side], game["gameDate"]), []).append((game["minutes"], index))
+    for (teamID, gameDate), starts in byTeam.items():
+        timed = sorted(start for start in starts if start[0] is not None)
+        timeless = [index for minutes, index in starts if minutes is None]
+
+        pairs = []
+        active = collections.deque()
+        for minutes, index in timed:
+            while active and not _overlaps(active[0][0], minutes, window):
+                active.popleft()
+            pairs += [(index, other) for _, other in active]
+            active.append((minutes, index))
+        for position, index in enumerate(timeless):
+            pairs += [(index, other) for _, other in timed] + [(index, other) for other in timeless[:position]]
+
+        for second, first in pairs:
+            if first != second:
+                conflicts.append({"index": second, "type": "team", "teamID": teamID, "otherIndex": first,
+                                  "message": f"Team {teamID} is proposed to play twice within "
+                                             f"{window} minutes on {gameDate}"})
+    return conflicts
+
+
+def _overlaps(start, otherStart, window):
+    # Without a start time the games can only be compared by date
+    if start is None or otherStart is None:
+        return True
+    return abs(start - otherStart) < window
+
+def _coerce(game, field, convert):
+    # Proposals are unchecked JSON: a list, an object or a malformed string is a bad request
+    try:
+        return convert(game[field])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {field}: {game[field]!r}") from None
+
+def _date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+def _minutes(value):
+    # TIME columns come back as timedelta; form input is "HH:MM" or "HH:MM:SS"
+    if value is None:
+        return None
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds() // 60)
+    hours, minutes = str(value).split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+def _clock(value):
+    minutes = _minutes(value)
+    return "unknown time" if minutes is None else f"{minutes // 60:02d}:{minutes % 60:02d}"
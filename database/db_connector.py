@@ -6,31 +6,191 @@ Source URL: https://canvas.oregonstate.edu/courses/2017561/pages/exploration-web
 """
 
 from dotenv import load_dotenv
+from flask import g, has_app_context
+from contextlib import contextmanager
 import os
+import queue
+import threading
+import time
 import MySQLdb
+from MySQLdb.constants import CLIENT
+import database.cache as cache
+import metrics
 
 load_dotenv()
 
-# Database credentials
-host = 'classmysql.engr.oregonstate.edu'    
-user = 'cs340_chenjame'
+# Database credentials (DB_HOST / DB_USER / DB_NAME point the app at a local server for benchmarking)
+host = os.getenv('DB_HOST', 'classmysql.engr.oregonstate.edu')    
+user = os.getenv('DB_USER', 'cs340_chenjame')
 passwd = os.getenv('DB_PASSWORD')    
-db = 'cs340_chenjame'
+db = os.getenv('DB_NAME', 'cs340_chenjame')
+
+# Connection pool settings
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))           # max connections kept open
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+POOL_RECYCLE = float(os.getenv('DB_POOL_RECYCLE', 300)) # seconds a connection may sit idle before being replaced
+STREAM_BATCH = int(os.getenv('DB_STREAM_BATCH', 1000))  # rows fetched per round trip by stream()
+
+# Errors after which a connection cannot be trusted: the link to the server is gone or out of step
+BROKEN_ERRORS = (MySQLdb.OperationalError, MySQLdb.InterfaceError)
 
 def connectDB(host = host, user = user, passwd = passwd, db = db):
     '''
     connects to a database and returns a database object
+    multi-statement execution is enabled so queryBatch() can send several queries at once
+    utf8mb4 is set explicitly (the server default may be latin1) so '✓' / '✗' round-trip intact
     '''
-    dbConnection = MySQLdb.connect(host,user,passwd,db)
+    dbConnection = MySQLdb.connect(host,user,passwd,db, client_flag = CLIENT.MULTI_STATEMENTS, charset = "utf8mb4")
     return dbConnection
 
+
+class ConnectionPool:
+    '''
+    thread-safe pool of reusable MySQLdb connections
+    size: maximum number of open connections
+    timeout: seconds to wait for a connection before raising
+    recycle: seconds a connection may stay idle before it is closed and replaced
+    '''
+
+    def __init__(self, size = POOL_SIZE, timeout = POOL_TIMEOUT, recycle = POOL_RECYCLE, connect = connectDB):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._connect = connect
+        self._idle = queue.LifoQueue()   # (connection, time returned)
+        self._slots = threading.BoundedSemaphore(size)
+
+    def checkout(self):
+        '''
+        returns a healthy connection, reusing an idle one when possible
+        '''
+        if not self._slots.acquire(timeout = self.timeout):
+            raise RuntimeError("Timed out waiting for a database connection from the pool")
+
+        try:
+            while True:
+                try:
+                    dbConnection, returnedAt = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+
+                # Replace connections that have been idle too long
+                if time.monotonic() - returnedAt > self.recycle:
+                    self._discard(dbConnection)
+                    continue
+
+                # Health check: ping fails if the server dropped the connection
+                try:
+                    dbConnection.ping()
+                    return dbConnection
+                except MySQLdb.Error:
+                    self._discard(dbConnection)
+
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, dbConnection, broken = False):
+        '''
+        returns a connection to the pool, discarding it if it is broken
+        '''
+        try:
+            if broken:
+                self._discard(dbConnection)
+                return
+
+            # Drop any uncommitted work so the next request starts clean
+            try:
+                if not dbConnection.get_autocommit():
+                    dbConnection.rollback()
+            except MySQLdb.Error:
+                self._discard(dbConnection)
+                return
+
+            self._idle.put((dbConnection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def warm(self, count = None):
+        '''
+        opens connections ahead of the first request
+        '''
+        connections = [self.checkout() for _ in range(min(count or self.size, self.size))]
+        for dbConnection in connections:
+            self.checkin(dbConnection)
+
+    def closeAll(self):
+        '''
+        closes every idle connection (checked-out connections close on return)
+        '''
+        while True:
+            try:
+                dbConnection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(dbConnection)
+
+    def _open(self):
+        # Reads run in autocommit mode so they never need a COMMIT round trip;
+        # writes opt into an explicit transaction through transaction()
+        dbConnection = self._connect()
+        dbConnection.autocommit(True)
+        return dbConnection
+
+    @staticmethod
+    def _discard(dbConnection):
+        try:
+            dbConnection.close()
+        except MySQLdb.Error:
+            pass
+
+
+pool = ConnectionPool()
+
+def getConnection():
+    '''
+    returns the pooled connection for the current Flask app context,
+    checking one out on first use. It is returned by releaseConnection() on teardown.
+    '''
+    if "dbConnection" not in g:
+        g.dbConnection = pool.checkout()
+    return g.dbConnection
+
+def releaseConnection(exception = None):
+    '''
+    returns the app context's connection to the pool, if one was checked out
+    '''
+    dbConnection = g.pop("dbConnection", None)
+    broken = g.pop("dbBroken", False) or isinstance(exception, BROKEN_ERRORS)
+    if dbConnection is not None:
+        pool.checkin(dbConnection, broken = broken)
+
+def markBroken(dbConnection, exception = None):
+    '''
+    flags the app context's connection so releaseConnection() discards it instead of pooling it
+    the routes catch their own exceptions, so teardown never sees the error that broke it
+    exception: only errors in BROKEN_ERRORS count; None marks it broken unconditionally
+    '''
+    if exception is not None and not isinstance(exception, BROKEN_ERRORS):
+        return
+    if has_app_context() and g.get("dbConnection") is dbConnection:
+        g.dbBroken = True
+
+def init_app(app):
+    '''
+    ties connection checkout / return to the Flask app context
+    '''
+    app.teardown_appcontext(releaseConnection)
+
 def query(dbConnection = None, query = None, query_params = ()):
     '''
-    executes a given SQL query on the given db connection and returns a Cursor object
+    executes a given read-only SQL query on the given db connection and returns a Cursor object
     dbConnection: a MySQLdb connection object created by connectDB()
     query: string containing SQL query
     returns: A Cursor object as specified at https://www.python.org/dev/peps/pep-0249/#cursor-objects.
     You need to run .fetchall() or .fetchone() on that object to actually acccess the results.
+    Pooled connections run in autocommit mode, so reads are never followed by a COMMIT.
+    Use transaction() for anything that modifies the database.
     '''
 
     if dbConnection is None:
@@ -41,14 +201,185 @@ def query(dbConnection = None, query = None, query_params = ()):
         print("query is empty! Please pass a SQL query in query")
         return None
 
-    print("Executing %s with %s" % (query, query_params));
     # Create a cursor to execute query. Why? Because apparently they optimize execution by retaining a reference according to PEP0249
     cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
 
     # Sanitize the query before executing it.
-    cursor.execute(query, query_params)
-    
-    # Commit any changes to the database.
-    dbConnection.commit()
+    started = time.perf_counter()
+    try:
+        cursor.execute(query, query_params)
+    except Exception as e:
+        markBroken(dbConnection, e)
+        raise
+    metrics.observeQuery(query, time.perf_counter() - started, cursor.rowcount, query_params)
     
     return cursor
+
+class Cached:
+    '''
+    marks a query in a queryBatch() whose result may be served from the reference-data cache
+    tables: tables the query reads; a write to any of them invalidates the cached rows
+    '''
+
+    def __init__(self, query, tables, query_params = ()):
+        self.query = query
+        self.query_params = tuple(query_params)
+        self.tables = tuple(tables)
+        self.key = (query, self.query_params)
+
+def queryBatch(dbConnection = None, queries = ()):
+    '''
+    executes several read-only SQL queries in a single round trip
+    dbConnection: a MySQLdb connection object created by connectDB()
+    queries: sequence of query strings, (query, query_params) tuples or Cached queries
+    returns: a list holding the fetched rows of each query, in order
+    Cached queries that hit the cache are left out of the round trip entirely.
+
+    games, teams = db.queryBatch(dbConnection, (query1, (query2, (sportType,))))
+    '''
+
+    if dbConnection is None:
+        print("No connection to the database found! Have you called connectDB() first?")
+        return None
+
+    results = [None] * len(queries)
+    pending = []   # (position, Cached or None, table versions before the read)
+    statements = []
+    for position, item in enumerate(queries):
+        if isinstance(item, Cached):
+            rows = cache.cache.get(item.key)
+            if rows is not cache.MISS:
+                results[position] = rows
+                continue
+            pending.append((position, item, cache.cache.versions(item.tables)))
+            query, query_params = item.query, item.query_params
+        else:
+            pending.append((position, None, None))
+            query, query_params = (item, ()) if isinstance(item, str) else item
+        statements.append(_bind(dbConnection, query, query_params))
+
+    if not statements:
+        return results
+
+    cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
+    started = time.perf_counter()
+    try:
+        cursor.execute(b";\n".join(statements))
+
+        # Each statement produces its own result set
+        fetched = [cursor.fetchall()]
+        while cursor.nextset():
+            fetched.append(cursor.fetchall())
+        cursor.close()
+    except Exception:
+        # A statement that fails partway through the batch leaves the later result sets unread
+        markBroken(dbConnection)
+        raise
+
+    # The server answers the whole batch in one round trip; split its time evenly for the per-statement histograms
+    share = (time.perf_counter() - started) / len(statements)
+    for statement, rows in zip(statements, fetched):
+        metrics.observeQuery(statement, share, len(rows))
+
+    for (position, item, versions), rows in zip(pending, fetched):
+        results[position] = rows
+        if item is not None:
+            cache.cache.set(item.key, rows, item.tables, versions = versions)
+
+    return results
+
+def stream(dbConnection = None, query = None, query_params = (), batchSize = STREAM_BATCH):
+    '''
+    executes a read-only SQL query with an unbuffered server-side cursor and yields rows as dicts
+    rows are pulled from the server batchSize at a time, so memory use stays flat however
+    many rows the query returns. The connection cannot run other queries until the generator
+    is exhausted or closed.
+    '''
+
+    if dbConnection is None:
+        print("No connection to the database found! Have you called connectDB() first?")
+        return
+
+    cursor = dbConnection.cursor(MySQLdb.cursors.SSDictCursor)
+    started = time.perf_counter()
+    count = 0
+    try:
+        cursor.execute(query, query_params)
+        while True:
+            rows = cursor.fetchmany(batchSize)
+            if not rows:
+                break
+            count += len(rows)
+            yield from rows
+    except Exception as e:
+        markBroken(dbConnection, e)
+        raise
+    finally:
+        # Closing an unbuffered cursor drains any rows left on the wire
+        cursor.close()
+        # Includes the time spent writing rows to the client between batches
+        metrics.observeQuery(query, time.perf_counter() - started, count, query_params)
+
+def _bind(dbConnection, query, query_params):
+    # Escapes parameters the same way cursor.execute() does, so statements can be joined
+    statement = query.strip().rstrip(";").encode(dbConnection.encoding)
+    if query_params:
+        statement = statement % tuple(dbConnection.literal(param) for param in query_params)
+    return statement
+
+@contextmanager
+def transaction(dbConnection, tables = ()):
+    '''
+    runs a block of writes in a single transaction and yields a Cursor object
+    commits once when the block finishes, or rolls back and re-raises on error
+    tables: tables the block writes to; cached reads of them are invalidated after the commit
+    The stored procedures in PL.sql leave transaction control to their caller, so a CALL
+    and the statements after it in the block commit or roll back together.
+
+    with db.transaction(dbConnection, tables=("Players",)) as cursor:
+        cursor.execute("CALL sp_DeletePlayer(%s)", (playerID,))
+    '''
+    started = time.perf_counter()
+    dbConnection.begin()
+    cursor = dbConnection.cursor()
+    try:
+        yield cursor
+        dbConnection.commit()
+    except Exception as e:
+        markBroken(dbConnection, e)
+        try:
+            dbConnection.rollback()
+        except MySQLdb.Error:
+            markBroken(dbConnection)
+        raise
+    else:
+        cache.invalidate(*tables)
+        metrics.observeTransaction(tables, time.perf_counter() - started)
+    finally:
+        cursor.close()
+        # Procedures such as sp_load_athleticsdb switch autocommit off for the session
+        if not dbConnection.get_autocommit():
+            dbConnection.autocommit(True)
+
+def executeDDL(dbConnection = None, query = None, query_params = ()):
+    '''
+    runs a statement that commits on its own (DDL, TRUNCATE, or a CALL to a procedure that uses them)
+    MySQL ends any open transaction implicitly before such statements, so they run outside
+    transaction(): a rollback could not undo them. Callers must clear any cache the statement affects.
+    '''
+    started = time.perf_counter()
+    cursor = dbConnection.cursor()
+    try:
+        cursor.execute(query, query_params)
+        # Consume the status result a CALL returns
+        while cursor.nextset():
+            pass
+    except Exception as e:
+        markBroken(dbConnection, e)
+        raise
+    finally:
+        cursor.close()
+        # Procedures such as sp_load_athleticsdb switch autocommit off for the session
+        if not dbConnection.get_autocommit():
+            dbConnection.autocommit(True)
+    metrics.observeQuery(query, time.perf_counter() - started, cursor.rowcount, query_params)
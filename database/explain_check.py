@@ -0,0 +1,154 @@
+"""
+EXPLAIN-based index check for the queries issued by app.py.
+
+Runs EXPLAIN on each query and fails if any table other than the small
+reference tables is read with a full table scan (type = ALL). On the tiny seed
+data the optimizer may prefer a scan anyway, so run this after loading a
+realistic dataset (see sp_load_athleticsdb).
+
+The statements are the app's own: the module-level queries of app.py, the
+pagination seek queries built by Page.query() from a real cursor, and the
+builders in database/search.py and database/conflicts.py. Parameters come
+from rows already in the database, so each lookup plans against real values.
+
+Usage: python -m database.explain_check [--verbose]
+"""
+
+import sys
+import MySQLdb
+import app as web
+import database.conflicts as conflicts
+import database.db_connector as db
+import database.pagination as pagination
+import database.search as search
+
+# Reference tables with a handful of rows; scanning them is cheaper than an index lookup
+ALLOW_FULL_SCAN = {"Schools", "s"}
+
+# (route, table) pairs that read every row by design
+EXPECTED_SCANS = {("/games/export", "g")}
+
+# (route, SELECT, sort columns, key, sorts served by an index) for each paginated list
+PAGED_LISTS = (
+    ("/athletes", web.ATHLETE_ROWS, web.ATHLETE_SORT, "a.athleteID", ("id", "last_name", "first_name")),
+    ("/teams", web.TEAM_ROWS, web.TEAM_SORT, "t.teamID", ("id", "team_name")),
+    ("/players", web.PLAYER_ROWS, web.PLAYER_SORT, "r.playerID", ("id", "last_name")),
+    ("/games", web.GAME_ROWS, web.GAME_SORT, "g.gameID", ("id", "game_date")),
+)
+
+# sp_RefreshRoster's lookup, copied from PL.sql; EXPLAIN cannot look inside a stored procedure
+REFRESH_ROSTER = ("SELECT p.playerID, a.firstName, t.sportType, s.name FROM Players AS p "
+                  "JOIN Athletes AS a ON a.athleteID = p.athleteID JOIN Teams AS t ON t.teamID = p.teamID "
+                  "JOIN Schools AS s ON s.schoolID = a.schoolID WHERE p.athleteID = %s")
+
+
+def samples(dbConnection):
+    '''
+    returns one existing athlete, team, player and game to take query parameters from
+    '''
+    athletes, teams, players, games = db.queryBatch(dbConnection, (
+        "SELECT athleteID, firstName, lastName FROM Athletes ORDER BY athleteID LIMIT 1",
+        "SELECT teamID, teamName, sportType FROM Teams ORDER BY teamID LIMIT 1",
+        "SELECT playerID, athleteID, teamID FROM Players ORDER BY playerID LIMIT 1",
+        "SELECT g.gameID, g.homeTeamID, g.awayTeamID, g.facilityID, g.gameDate, f.facilityName "
+        "FROM Games AS g JOIN Facilities AS f ON f.facilityID = g.facilityID ORDER BY g.gameID LIMIT 1",
+    ))
+    if not (athletes and teams and players and games):
+        raise ValueError("Load a dataset first: every table needs at least one row")
+    return athletes[0], teams[0], players[0], games[0]
+
+
+def pageQueries(dbConnection):
+    '''
+    returns (route, query, query_params) for the second page of each indexed sort, in both directions
+    the cursor is taken from the first page, exactly as a "Next" link would carry it
+    '''
+    queries = []
+    for route, select, sortColumns, key, sorts in PAGED_LISTS:
+        for sort in sorts:
+            for direction in ("asc", "desc"):
+                args = {"sort": sort, "dir": direction}
+                first = pagination.Page(args, sortColumns, key)
+                first.load(db.query(dbConnection, *first.query(select)).fetchall())
+                if first.nextCursor is None:
+                    continue
+                page = pagination.Page(dict(args, after = first.nextCursor), sortColumns, key)
+                queries.append((f"{route} (by {sort}, {direction})", *page.query(select)))
+    return queries
+
+
+def appQueries(dbConnection):
+    '''
+    returns (route, query, query_params) for every query in app.py that filters or joins
+    '''
+    athlete, team, player, game = samples(dbConnection)
+
+    queries = pageQueries(dbConnection) + [
+        ("/athletes/details", web.ATHLETE_DETAILS, (athlete["athleteID"],)),
+        ("/teams/details", web.TEAM_DETAILS, (team["teamID"],)),
+        ("/games/details", web.GAME_DETAILS, (game["gameID"],)),
+        ("/players/teams", web.ELIGIBLE_TEAMS, (athlete["athleteID"],)),
+        ("/players/updateTeams", web.REASSIGNABLE_TEAMS, (player["playerID"],)),
+        ("/players/roster", web.TEAM_ROSTER, (player["teamID"],)),
+        ("/games/teams", web.SPORT_TEAMS, (team["sportType"],)),
+        ("/games (sport counts)", web.SPORT_COUNTS.query, web.SPORT_COUNTS.query_params),
+        ("/games/export", web.SCHEDULE_EXPORT, ()),
+        ("/standings", f"{web.STANDINGS_ROWS} WHERE t.sportType = %s{web.STANDINGS_ORDER}", (team["sportType"],)),
+        ("sp_RefreshRoster (athlete)", REFRESH_ROSTER, (player["athleteID"],)),
+    ]
+
+    facilityKeys = [(game["facilityID"], game["gameDate"])]
+    teamKeys = sorted({(game["homeTeamID"], game["gameDate"]), (game["awayTeamID"], game["gameDate"])})
+    for kind, (query, query_params) in zip(("facility", "home team", "away team"),
+                                           conflicts.existingQueries(facilityKeys, teamKeys)):
+        queries.append((f"/games/conflicts ({kind})", query, query_params))
+
+    # "first last" exercises all four athlete branches
+    term = search.normalize(f"{athlete['firstName']} {athlete['lastName'][:2]}")
+    queries.append(("/search (athletes)", *search.athleteQuery(term, search.SEARCH_LIMIT)))
+    for kind, template, name in (("teams", search.TEAM_QUERY, team["teamName"]),
+                                 ("facilities", search.FACILITY_QUERY, game["facilityName"])):
+        queries.append((f"/search ({kind})", template.format(limit = search.SEARCH_LIMIT),
+                        (search.prefix(name[:2]),)))
+    return queries
+
+
+def explain(dbConnection, query, query_params):
+    cursor = dbConnection.cursor(MySQLdb.cursors.DictCursor)
+    cursor.execute("EXPLAIN " + query, query_params)
+    plan = cursor.fetchall()
+    cursor.close()
+    return plan
+
+
+def check(dbConnection, verbose = False):
+    '''
+    returns a list of (route, table) pairs that are read with a full table scan
+    '''
+    failures = []
+    for route, query, query_params in appQueries(dbConnection):
+        for step in explain(dbConnection, query, query_params):
+            table = step.get("table") or ""
+            # Derived tables such as <union1,2> are the temporary result of indexed branches
+            fullScan = (step.get("type") == "ALL" and table not in ALLOW_FULL_SCAN
+                        and not table.startswith("<") and (route, table) not in EXPECTED_SCANS)
+            if verbose or fullScan:
+                status = "FULL SCAN" if fullScan else "ok"
+                print(f"{status:9} {route:32} {table:12} type={step.get('type')} key={step.get('key')} "
+                      f"rows={step.get('rows')} extra={step.get('Extra')}")
+            if fullScan:
+                failures.append((route, table))
+    return failures
+
+
+if __name__ == "__main__":
+    dbConnection = db.connectDB()
+    try:
+        failures = check(dbConnection, verbose = "--verbose" in sys.argv)
+    finally:
+        dbConnection.close()
+
+    if failures:
+        print(f"{len(failures)} full table scan(s) found")
+        sys.exit(1)
+    print("Every query uses an index")
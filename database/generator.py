@@ -0,0 +1,243 @@
+"""
+Synthetic data generator for scale testing.
+
+generate(dbConnection, scale) adds `scale` times the DDL.sql sample (4 schools,
+7 teams, 6 facilities, 8 athletes, 8 players, 5 games) on top of whatever is
+loaded. Keys are assigned here, continuing from each table's current maximum,
+so rows can reference each other without reading anything back. Every
+constraint holds by construction:
+- school names are numbered, so distinct_name holds
+- each school's teams walk a distinct (sport, level, year) combination, so unique_teams holds,
+  and seasons always match their sport (valid_season_sports)
+- an athlete joins distinct teams at their own school (unique_players)
+- a game's home and away teams differ
+- games are booked only at facilities generated in the same call, and every (facility, date)
+  is checked against the slots already taken, so facility_in_use holds even where two
+  seasons' date ranges overlap
+
+Completed and forfeited games get scores, and their results are added to Standings
+as one upsert per team, the same increments the game procedures apply. The new
+players are projected into the RosterView read model with one REPLACE ... SELECT.
+
+Rows are written with multi-row INSERTs (executemany) of CHUNK_SIZE rows,
+committed chunk by chunk, with foreign key checks off for the session while
+loading.
+"""
+
+import datetime
+import os
+import random
+import time
+import database.db_connector as db
+import database.roster as roster
+
+CHUNK_SIZE = int(os.getenv('GENERATOR_CHUNK_SIZE', 5000))   # rows per multi-row INSERT / commit
+
+# Rows per unit of scale, matching the DDL.sql sample
+PER_SCALE = {"Schools": 4, "Teams": 7, "Facilities": 6, "Athletes": 8, "Players": 8, "Games": 5}
+
+SPORT_SEASONS = (("football", "fall"), ("volleyball", "fall"), ("basketball", "winter"),
+                 ("soccer", "winter"), ("baseball", "spring"), ("tennis", "spring"))
+SEASON_START = {"fall": (8, 25), "winter": (11, 20), "spring": (3, 1)}
+FIRST_YEAR = 2024
+
+PLACES = ("Lincoln", "Jefferson", "Washington", "Roosevelt", "Franklin", "Madison", "Adams", "Monroe",
+          "Jackson", "Kennedy", "Hamilton", "Grant", "Riverside", "Lakeview", "Hillcrest", "Oakridge")
+MASCOTS = ("Lions", "Jaguars", "Wildcats", "Ravens", "Eagles", "Bears", "Hawks", "Tigers",
+           "Falcons", "Mustangs", "Panthers", "Wolves", "Cougars", "Spartans", "Knights", "Comets")
+STREETS = ("Education Blvd", "Scholar Way", "Academic Ave", "Learning Lane", "Campus Dr", "College St")
+FACILITIES = (("Stadium", 2500), ("Gymnasium", 1200), ("Field House", 1800),
+              ("Baseball Field", 1500), ("Tennis Courts", 300), ("Arena", 2000))
+FIRST_NAMES = ("John", "Michael", "David", "Christopher", "James", "Robert", "Daniel", "Matthew",
+               "Emily", "Sarah", "Jessica", "Ashley", "Olivia", "Sophia", "Ava", "Mia",
+               "Ethan", "Noah", "Liam", "Lucas", "Grace", "Chloe", "Zoe", "Nora")
+LAST_NAMES = ("Smith", "Johnson", "Brown", "Williams", "Wilson", "Davis", "Miller", "Taylor",
+              "Anderson", "Thomas", "Moore", "Martin", "Lee", "Garcia", "Clark", "Lewis",
+              "Walker", "Hall", "Young", "King", "Wright", "Lopez", "Hill", "Scott")
+GAME_TYPES = ("regular season",) * 6 + ("preseason", "playoff", "tournament", "exhibition")
+GAME_STATUSES = ("scheduled",) * 6 + ("completed",) * 3 + ("cancelled", "postponed", "forfeited", "in progress")
+COUNTED_STATUSES = ("completed", "forfeited")   # results that count in Standings
+GAME_TIMES = ("15:00:00", "15:30:00", "16:00:00", "17:00:00", "17:30:00", "18:00:00", "19:00:00", "19:30:00")
+
+INSERTS = {
+    "Schools": "INSERT INTO Schools (schoolID, name, address, phone) VALUES (%s, %s, %s, %s)",
+    "Teams": ("INSERT INTO Teams (teamID, schoolID, teamName, sportType, varsityJv, seasonName, academicYear) "
+              "VALUES (%s, %s, %s, %s, %s, %s, %s)"),
+    "Facilities": "INSERT INTO Facilities (facilityID, schoolID, facilityName, capacity) VALUES (%s, %s, %s, %s)",
+    "Athletes": ("INSERT INTO Athletes (athleteID, schoolID, firstName, lastName, gradeLevel, "
+                 "isEligible, isActive, emergencyContact) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"),
+    "Players": "INSERT INTO Players (playerID, teamID, athleteID) VALUES (%s, %s, %s)",
+    "Games": ("INSERT INTO Games (gameID, homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status, "
+              "homeScore, awayScore) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"),
+    # Added to any row the team already has (see sp_ApplyGameResult in PL.sql)
+    "Standings": ("INSERT INTO Standings (teamID, gamesPlayed, wins, losses, ties, pointsFor, pointsAgainst) "
+                  "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+                  "ON DUPLICATE KEY UPDATE gamesPlayed = gamesPlayed + VALUES(gamesPlayed), "
+                  "wins = wins + VALUES(wins), losses = losses + VALUES(losses), ties = ties + VALUES(ties), "
+                  "pointsFor = pointsFor + VALUES(pointsFor), pointsAgainst = pointsAgainst + VALUES(pointsAgainst)"),
+}
+KEYS = {"Schools": "schoolID", "Teams": "teamID", "Facilities": "facilityID",
+        "Athletes": "athleteID", "Players": "playerID", "Games": "gameID"}
+
+
+class Writer:
+    '''
+    buffers rows per table and flushes them as multi-row INSERTs of chunkSize rows
+    '''
+
+    def __init__(self, dbConnection, chunkSize = CHUNK_SIZE):
+        self.dbConnection = dbConnection
+        self.chunkSize = chunkSize
+        self.buffers = {table: [] for table in INSERTS}
+        self.counts = {table: 0 for table in INSERTS}
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.chunkSize:
+            self.flush(table)
+
+    def flush(self, table = None):
+        for name in ((table,) if table else INSERTS):
+            rows = self.buffers[name]
+            if rows:
+                with db.transaction(self.dbConnection, tables = (name,)) as cursor:
+                    cursor.executemany(INSERTS[name], rows)
+                self.counts[name] += len(rows)
+                self.buffers[name] = []
+
+
+def generate(dbConnection, scale, seed = None, chunkSize = CHUNK_SIZE):
+    '''
+    adds scale times the DDL.sql sample of synthetic rows to every table
+    seed: makes the generated data reproducible
+    returns {table: rows inserted} plus the elapsed "seconds"
+    '''
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    targets = {table: count * scale for table, count in PER_SCALE.items()}
+    nextID = _nextKeys(dbConnection)
+    writer = Writer(dbConnection, chunkSize)
+    projected = 0
+
+    cursor = dbConnection.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        # Schools
+        schoolIDs = list(range(nextID["Schools"], nextID["Schools"] + targets["Schools"]))
+        schoolNames = {}
+        for n, schoolID in enumerate(schoolIDs):
+            place = PLACES[rng.randrange(len(PLACES))]
+            schoolNames[schoolID] = (place, MASCOTS[rng.randrange(len(MASCOTS))])
+            writer.add("Schools", (schoolID, f"{place} High School {schoolID}",
+                                   f"{rng.randint(100, 9999)} {rng.choice(STREETS)}, Springfield, IL",
+                                   f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"))
+
+        # Teams: spread round-robin over the schools; the k-th team of a school takes
+        # the k-th (sport, level, year) combination, which is unique within the school
+        teamsBySchool = {schoolID: [] for schoolID in schoolIDs}
+        teamsBySport = {sport: [] for sport, _ in SPORT_SEASONS}
+        teamSports = {}
+        for n in range(targets["Teams"]):
+            teamID = nextID["Teams"] + n
+            schoolID = schoolIDs[n % len(schoolIDs)]
+            k = len(teamsBySchool[schoolID])
+            sport, season = SPORT_SEASONS[k % len(SPORT_SEASONS)]
+            level = ("varsity", "jv")[(k // len(SPORT_SEASONS)) % 2]
+            year = FIRST_YEAR + k // (len(SPORT_SEASONS) * 2)
+            place, mascot = schoolNames[schoolID]
+            writer.add("Teams", (teamID, schoolID, f"{place} {mascot}", sport, level, season, year))
+            teamsBySchool[schoolID].append(teamID)
+            teamsBySport[sport].append(teamID)
+            teamSports[teamID] = (sport, season, year)
+
+        # Facilities
+        facilitiesBySchool = {schoolID: [] for schoolID in schoolIDs}
+        for n in range(targets["Facilities"]):
+            facilityID = nextID["Facilities"] + n
+            schoolID = schoolIDs[n % len(schoolIDs)]
+            kind, capacity = FACILITIES[len(facilitiesBySchool[schoolID]) % len(FACILITIES)]
+            writer.add("Facilities", (facilityID, schoolID, f"{schoolNames[schoolID][0]} {kind}",
+                                      rng.randint(capacity // 2, capacity)))
+            facilitiesBySchool[schoolID].append(facilityID)
+
+        # Athletes, each rostered on distinct teams at their own school
+        playersLeft = targets["Players"]
+        playerID = nextID["Players"]
+        for n in range(targets["Athletes"]):
+            athleteID = nextID["Athletes"] + n
+            schoolID = schoolIDs[rng.randrange(len(schoolIDs))]
+            writer.add("Athletes", (athleteID, schoolID, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                                    rng.randint(9, 12), int(rng.random() > 0.05), int(rng.random() > 0.03),
+                                    f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"))
+
+            # Spread the remaining players evenly over the remaining athletes
+            share = -(-playersLeft // (targets["Athletes"] - n))
+            teams = teamsBySchool[schoolID]
+            for teamID in rng.sample(teams, min(share, len(teams))):
+                writer.add("Players", (playerID, teamID, athleteID))
+                playerID += 1
+                playersLeft -= 1
+
+        # Games: same-sport opponents where possible, at one of the home school's facilities,
+        # on the next free date of that facility
+        facilityIDs = [facilityID for facilities in facilitiesBySchool.values() for facilityID in facilities]
+        teamSchool = {teamID: schoolID for schoolID, teams in teamsBySchool.items() for teamID in teams}
+        teamIDs = list(teamSchool)
+        booked = {}   # facilityID -> next free day offset
+        takenSlots = set()   # (facilityID, gameDate) already booked; seasons overlap, so offsets alone can collide
+        records = {}  # teamID -> [played, wins, losses, ties, pointsFor, pointsAgainst]
+        if len(teamIDs) >= 2 and facilityIDs:
+            for n in range(targets["Games"]):
+                homeTeamID = teamIDs[rng.randrange(len(teamIDs))]
+                sport, season, year = teamSports[homeTeamID]
+                opponents = teamsBySport[sport] if len(teamsBySport[sport]) > 1 else teamIDs
+                awayTeamID = homeTeamID
+                while awayTeamID == homeTeamID:
+                    awayTeamID = opponents[rng.randrange(len(opponents))]
+
+                facilities = facilitiesBySchool[teamSchool[homeTeamID]] or facilityIDs
+                facilityID = facilities[rng.randrange(len(facilities))]
+                offset = booked.get(facilityID, rng.randint(0, 6))
+                booked[facilityID] = offset + rng.randint(1, 3)
+                month, day = SEASON_START[season]
+                gameDate = datetime.date(year, month, day) + datetime.timedelta(days = offset)
+                while (facilityID, gameDate) in takenSlots:
+                    gameDate += datetime.timedelta(days = 1)
+                takenSlots.add((facilityID, gameDate))
+
+                status = rng.choice(GAME_STATUSES)
+                homeScore = awayScore = None
+                if status in COUNTED_STATUSES:
+                    homeScore, awayScore = rng.randint(0, 10), rng.randint(0, 10)
+                    for teamID, scored, allowed in ((homeTeamID, homeScore, awayScore),
+                                                    (awayTeamID, awayScore, homeScore)):
+                        record = records.setdefault(teamID, [0] * 6)
+                        for i, value in enumerate((1, scored > allowed, scored < allowed, scored == allowed,
+                                                   scored, allowed)):
+                            record[i] += value
+
+                writer.add("Games", (nextID["Games"] + n, homeTeamID, awayTeamID, facilityID, gameDate,
+                                     rng.choice(GAME_TIMES), rng.choice(GAME_TYPES), status, homeScore, awayScore))
+
+        for teamID, record in records.items():
+            writer.add("Standings", (teamID, *record))
+
+        writer.flush()
+        if writer.counts["Players"]:
+            projected = roster.projectFrom(dbConnection, nextID["Players"])
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        cursor.close()
+
+    counts = dict(writer.counts)
+    counts["RosterView"] = projected
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    return counts
+
+
+def _nextKeys(dbConnection):
+    # One round trip for the next free key of every table
+    rows = db.queryBatch(dbConnection, [f"SELECT COALESCE(MAX({key}), 0) + 1 AS nextID FROM {table}"
+                                        for table, key in KEYS.items()])
+    return {table: result[0]["nextID"] for table, result in zip(KEYS, rows)}
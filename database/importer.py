@@ -0,0 +1,246 @@
+"""
+Bulk CSV import of athletes and roster assignments (players).
+
+Rows are read from the CSV in chunks. Each chunk is validated field by field,
+then checked against Schools / Athletes / Teams / Players with one IN (...)
+lookup per table, and the valid rows are inserted with a single multi-row
+INSERT (executemany) inside one transaction. If the database still rejects a
+chunk, its rows are retried one at a time so only the offending rows fail.
+"""
+
+import csv
+import io
+import os
+import MySQLdb
+import database.db_connector as db
+import database.roster as roster
+
+CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 500))   # rows validated / inserted per transaction
+
+ATHLETE_INSERT = ("INSERT INTO Athletes (schoolID, firstName, lastName, gradeLevel, "
+                  "isEligible, isActive, emergencyContact) VALUES (%s, %s, %s, %s, %s, %s, %s)")
+PLAYER_INSERT = "INSERT INTO Players (athleteID, teamID) VALUES (%s, %s)"
+
+TRUE_VALUES = ("1", "true", "yes", "y", "✓")
+FALSE_VALUES = ("0", "false", "no", "n", "✗")
+
+
+class ImportReport:
+    '''
+    running totals and per-row errors for one import
+    row numbers are CSV line numbers (the header is line 1)
+    '''
+
+    def __init__(self):
+        self.inserted = 0
+        self.errors = {}
+
+    def fail(self, line, message):
+        self.errors.setdefault(line, []).append(message)
+
+    def asDict(self):
+        return {
+            "inserted": self.inserted,
+            "failed": len(self.errors),
+            "errors": [{"row": line, "errors": messages} for line, messages in sorted(self.errors.items())],
+        }
+
+
+def readChunks(stream, size = CHUNK_SIZE):
+    '''
+    yields lists of (line number, row dict) from a CSV text or binary stream
+    '''
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding = "utf-8-sig", newline = "")
+    reader = csv.DictReader(stream)
+    chunk = []
+    for row in reader:
+        # Normalise header spelling / whitespace so "First Name" and "firstName" both work
+        row = {(key or "").replace(" ", "").replace("_", "").lower(): (value or "").strip()
+               for key, value in row.items()}
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def importAthletes(dbConnection, stream, chunkSize = CHUNK_SIZE):
+    '''
+    imports athletes from a CSV with columns:
+    schoolID (or school name), firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact
+    '''
+    report = ImportReport()
+    schoolsByName = {row["name"].lower(): row["schoolID"]
+                     for row in db.query(dbConnection, "SELECT schoolID, name FROM Schools").fetchall()}
+
+    for chunk in readChunks(stream, chunkSize):
+        candidates = []
+        for line, row in chunk:
+            values = _athleteValues(row, schoolsByName, lambda message: report.fail(line, message))
+            if values is not None and line not in report.errors:
+                candidates.append((line, values))
+
+        # Referential check: one lookup for every school the chunk mentions
+        schoolIDs = _existing(dbConnection, "Schools", "schoolID", {values[0] for _, values in candidates})
+        valid = []
+        for line, values in candidates:
+            if values[0] not in schoolIDs:
+                report.fail(line, f"School {values[0]} does not exist")
+            else:
+                valid.append((line, values))
+
+        _insertChunk(dbConnection, ATHLETE_INSERT, valid, report, ("Athletes",))
+
+    return report
+
+
+def importPlayers(dbConnection, stream, chunkSize = CHUNK_SIZE):
+    '''
+    imports roster assignments from a CSV with columns: athleteID, teamID
+    an athlete can only join a team at their own school, once
+    '''
+    report = ImportReport()
+    seen = set()
+
+    for chunk in readChunks(stream, chunkSize):
+        candidates = []
+        for line, row in chunk:
+            athleteID = _integer(row.get("athleteid"), "athleteID", lambda message: report.fail(line, message))
+            teamID = _integer(row.get("teamid"), "teamID", lambda message: report.fail(line, message))
+            if line in report.errors:
+                continue
+            if (athleteID, teamID) in seen:
+                report.fail(line, f"Duplicate of an earlier row for athlete {athleteID} on team {teamID}")
+                continue
+            seen.add((athleteID, teamID))
+            candidates.append((line, (athleteID, teamID)))
+
+        if not candidates:
+            continue
+
+        # Referential checks: one round trip for the athletes, teams and existing memberships in this chunk
+        athleteIDs = sorted({athleteID for _, (athleteID, _) in candidates})
+        teamIDs = sorted({teamID for _, (_, teamID) in candidates})
+        athletes, teams, existing = db.queryBatch(dbConnection, (
+            (f"SELECT athleteID, schoolID FROM Athletes WHERE athleteID IN ({_placeholders(athleteIDs)})", athleteIDs),
+            (f"SELECT teamID, schoolID FROM Teams WHERE teamID IN ({_placeholders(teamIDs)})", teamIDs),
+            (f"SELECT athleteID, teamID FROM Players WHERE athleteID IN ({_placeholders(athleteIDs)})", athleteIDs),
+        ))
+        athleteSchools = {row["athleteID"]: row["schoolID"] for row in athletes}
+        teamSchools = {row["teamID"]: row["schoolID"] for row in teams}
+        existing = {(row["athleteID"], row["teamID"]) for row in existing}
+
+        valid = []
+        for line, (athleteID, teamID) in candidates:
+            if athleteID not in athleteSchools:
+                report.fail(line, f"Athlete {athleteID} does not exist")
+            if teamID not in teamSchools:
+                report.fail(line, f"Team {teamID} does not exist")
+            if line in report.errors:
+                continue
+            if athleteSchools[athleteID] != teamSchools[teamID]:
+                report.fail(line, f"Team {teamID} is not at athlete {athleteID}'s school")
+            elif (athleteID, teamID) in existing:
+                report.fail(line, f"Athlete {athleteID} is already on team {teamID}")
+            else:
+                valid.append((line, (athleteID, teamID)))
+
+        # New players are projected into the roster read model in the same transaction
+        _insertChunk(dbConnection, PLAYER_INSERT, valid, report, ("Players",), after = roster.projectPairs)
+
+    return report
+
+
+def _insertChunk(dbConnection, statement, rows, report, tables, after = None):
+    # One multi-row INSERT per chunk; fall back to row-by-row to isolate rejected rows
+    # after(cursor, values): runs in the same transaction as each successful insert
+    if not rows:
+        return
+    try:
+        with db.transaction(dbConnection, tables = tables) as cursor:
+            cursor.executemany(statement, [values for _, values in rows])
+            if after:
+                after(cursor, [values for _, values in rows])
+        report.inserted += len(rows)
+        return
+    except MySQLdb.Error:
+        pass
+
+    for line, values in rows:
+        try:
+            with db.transaction(dbConnection, tables = tables) as cursor:
+                cursor.execute(statement, values)
+                if after:
+                    after(cursor, [values])
+            report.inserted += 1
+        except MySQLdb.Error as e:
+            report.fail(line, f"Database rejected row: {e}")
+
+
+def _athleteValues(row, schoolsByName, fail):
+    schoolID = row.get("schoolid")
+    if not schoolID and row.get("school"):
+        schoolID = schoolsByName.get(row["school"].lower())
+        if schoolID is None:
+            fail(f"Unknown school: {row['school']}")
+            return None
+    schoolID = _integer(schoolID, "schoolID", fail)
+
+    firstName = row.get("firstname", "")
+    lastName = row.get("lastname", "")
+    if not firstName:
+        fail("firstName is required")
+    if not lastName:
+        fail("lastName is required")
+    if len(firstName) > 120 or len(lastName) > 120:
+        fail("Names must be 120 characters or fewer")
+
+    gradeLevel = _integer(row.get("gradelevel"), "gradeLevel", fail)
+    if gradeLevel is not None and not 9 <= gradeLevel <= 12:
+        fail("gradeLevel must be between 9 and 12")
+
+    isEligible = _boolean(row.get("iseligible"), "isEligible", fail)
+    isActive = _boolean(row.get("isactive"), "isActive", fail)
+
+    emergencyContact = row.get("emergencycontact") or None
+    if emergencyContact and len(emergencyContact) > 20:
+        fail("emergencyContact must be 20 characters or fewer")
+
+    return (schoolID, firstName, lastName, gradeLevel, isEligible, isActive, emergencyContact)
+
+
+def _integer(value, field, fail):
+    if value in (None, ""):
+        fail(f"{field} is required")
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        fail(f"{field} must be a whole number, got {value!r}")
+        return None
+
+
+def _boolean(value, field, fail):
+    # Matches the table defaults: a blank flag means eligible / active
+    if value in (None, ""):
+        return 1
+    if value.lower() in TRUE_VALUES:
+        return 1
+    if value.lower() in FALSE_VALUES:
+        return 0
+    fail(f"{field} must be yes/no or 1/0, got {value!r}")
+    return None
+
+
+def _existing(dbConnection, table, key, ids):
+    ids = sorted(i for i in ids if i is not None)
+    if not ids:
+        return set()
+    query = f"SELECT {key} FROM {table} WHERE {key} IN ({_placeholders(ids)})"
+    return {row[key] for row in db.query(dbConnection, query, ids).fetchall()}
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
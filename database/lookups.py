@@ -0,0 +1,70 @@
+"""
+Lookup index for the form dropdowns: schools, teams, athletes and team memberships
+(Players) in one compact payload that the browser keeps and filters locally
+(static/lookups.js), instead of asking the server each time a select changes.
+
+The payload is split into sections, one per table, each cached under that table's
+data version. Its version string is the cache epoch followed by those data
+versions; a client that sends back the version it holds gets only the sections
+whose tables have been written to since.
+"""
+
+import database.cache as cache
+import database.db_connector as db
+
+# Section name -> (table, query); rows are sent as arrays in column order
+SECTIONS = {
+    "schools": ("Schools", "SELECT schoolID, name FROM Schools ORDER BY schoolID"),
+    "teams": ("Teams", "SELECT teamID, schoolID, teamName, sportType, varsityJv, seasonName, academicYear "
+                       "FROM Teams ORDER BY teamID"),
+    "athletes": ("Athletes", "SELECT athleteID, schoolID, firstName, lastName, isEligible, isActive "
+                             "FROM Athletes ORDER BY athleteID"),
+    "players": ("Players", "SELECT playerID, athleteID, teamID FROM Players ORDER BY playerID"),
+}
+
+TABLES = tuple(table for table, _ in SECTIONS.values())
+
+
+def version():
+    '''
+    returns the version of the index: the cache epoch, then each section table's data version
+    '''
+    versions = cache.versions(TABLES)
+    return ".".join([format(int(cache.cache.started * 1000), "x")] + [str(versions[table]) for table in TABLES])
+
+def changedSections(since):
+    '''
+    returns the sections that changed after version since, or None when since is unusable
+    (malformed, or from before a restart) and the client needs the whole index
+    '''
+    held, current = (since or "").split("."), version().split(".")
+    if len(held) != len(current) or held[0] != current[0]:
+        return None
+    return [name for name, old, new in zip(SECTIONS, held[1:], current[1:]) if old != new]
+
+def section(dbConnection, name):
+    '''
+    returns one section as {"columns": [...], "rows": [[...], ...]}, cached until its table changes
+    '''
+    table, query = SECTIONS[name]
+
+    def load():
+        cursor = db.query(dbConnection, query)
+        columns = [column[0] for column in cursor.description]
+        return {"columns": columns, "rows": [[row[column] for column in columns] for row in cursor.fetchall()]}
+
+    return cache.cached(("lookups", name), (table,), load)
+
+def payload(dbConnection, since = None):
+    '''
+    returns the lookup index, or with since only the sections changed after that version
+    "full" tells the client whether to replace its copy or merge the sections into it
+    '''
+    current = version()
+    names = changedSections(since) if since else None
+    full = names is None
+    return {
+        "version": current,
+        "full": full,
+        "sections": {name: section(dbConnection, name) for name in (SECTIONS if full else names)},
+    }
@@ -0,0 +1,165 @@
+"""
+Keyset (seek-by-primary-key) pagination for the list pages.
+
+Instead of OFFSET, each page remembers the sort value and primary key of its
+first / last row, and the next query seeks past them with an indexed range
+predicate. Pages cost the same no matter how deep the user browses.
+"""
+
+import base64
+import json
+import os
+import database.cache as cache
+import database.db_connector as db
+
+DEFAULT_PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+MAX_PAGE_SIZE = 500
+PAGE_SIZES = (25, 50, 100, 250)
+COUNT_TTL = float(os.getenv('COUNT_TTL', 300))  # seconds a cached total count is reused
+
+# Helper columns appended to each page query, stripped before rendering
+SORT_KEY = "_sortKey"
+ROW_KEY = "_rowKey"
+
+
+def encodeCursor(sortValue, rowKey):
+    '''
+    packs a row's sort value and primary key into an opaque, URL-safe token
+    '''
+    raw = json.dumps([None if sortValue is None else str(sortValue), rowKey])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decodeCursor(token):
+    '''
+    reverses encodeCursor(); returns None for a missing or malformed token
+    '''
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sortValue, rowKey = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sortValue, int(rowKey)
+    except (ValueError, TypeError):
+        return None
+
+
+def seek(sortExpr, key, ascending, sortValue, rowKey):
+    '''
+    returns (predicate, query_params) for the rows after (sortValue, rowKey) in scan order
+    sort columns can be NULL (e.g. a LEFT JOIN name), and MySQL sorts NULLs first in ascending
+    order and last in descending order; comparing with NULL matches nothing, so a boundary row
+    with a NULL sort value, and the NULLs that follow a non-NULL boundary, get their own branch
+    '''
+    op = ">" if ascending else "<"
+    if sortValue is None:
+        if ascending:
+            # The rest of the NULLs, then every non-NULL value
+            return f"(({sortExpr} IS NULL AND {key} > %s) OR {sortExpr} IS NOT NULL)", (rowKey,)
+        # Descending: only NULLs are left after a NULL
+        return f"({sortExpr} IS NULL AND {key} < %s)", (rowKey,)
+
+    predicate = f"{sortExpr} {op} %s OR ({sortExpr} = %s AND {key} {op} %s)"
+    if not ascending:
+        predicate += f" OR {sortExpr} IS NULL"
+    return f"({predicate})", (sortValue, sortValue, rowKey)
+
+
+class Page:
+    '''
+    one page of a keyset-paginated list
+    sortColumns: mapping of sort parameter name -> SQL expression (whitelist)
+    key: SQL expression for the primary key, used as the tie breaker
+    '''
+
+    def __init__(self, args, sortColumns, key, defaultSort = "id"):
+        self.sortColumns = sortColumns
+        self.key = key
+        self.sizes = PAGE_SIZES
+
+        try:
+            size = int(args.get("size", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            size = DEFAULT_PAGE_SIZE
+        self.size = max(1, min(size, MAX_PAGE_SIZE))
+
+        sort = args.get("sort", defaultSort)
+        self.sort = sort if sort in sortColumns else defaultSort
+        self.direction = "desc" if args.get("dir", "asc").lower() == "desc" else "asc"
+
+        self.after = decodeCursor(args.get("after"))
+        self.before = None if self.after else decodeCursor(args.get("before"))
+
+        self.rows = []
+        self.total = None
+        self.hasNext = False
+        self.hasPrev = False
+        self.nextCursor = None
+        self.prevCursor = None
+
+    def query(self, select, query_params = ()):
+        '''
+        returns (query, query_params) that fetches this page from the given SELECT
+        select: "SELECT ... FROM ... JOIN ..." without WHERE / ORDER BY / LIMIT
+        '''
+        sortExpr = self.sortColumns[self.sort]
+        params = list(query_params)
+
+        # Walking backwards from a "before" cursor flips the scan direction
+        ascending = (self.direction == "asc") != (self.before is not None)
+        order = "ASC" if ascending else "DESC"
+
+        where = ""
+        cursor = self.after or self.before
+        if cursor:
+            sortValue, rowKey = cursor
+            where, seekParams = seek(sortExpr, self.key, ascending, sortValue, rowKey)
+            where = f" WHERE {where}"
+            params += seekParams
+
+        # Add the sort value and key as helper columns so cursors can be built from the rows
+        select = select.replace(" FROM ", f", {sortExpr} AS {SORT_KEY}, {self.key} AS {ROW_KEY} FROM ", 1)
+        query = (f"{select}{where} ORDER BY {sortExpr} {order}, {self.key} {order} "
+                 f"LIMIT {self.size + 1}")
+        return query, tuple(params)
+
+    def load(self, rows):
+        '''
+        takes the rows fetched with query(), sets the page cursors and returns the rows to render
+        '''
+        rows = list(rows)
+        extra = len(rows) > self.size
+        rows = rows[:self.size]
+
+        if self.before:
+            rows.reverse()
+            self.hasPrev, self.hasNext = extra, True
+        else:
+            self.hasNext, self.hasPrev = extra, self.after is not None
+
+        if rows:
+            first, last = rows[0], rows[-1]
+            self.prevCursor = encodeCursor(first[SORT_KEY], first[ROW_KEY])
+            self.nextCursor = encodeCursor(last[SORT_KEY], last[ROW_KEY])
+
+        for row in rows:
+            row.pop(SORT_KEY, None)
+            row.pop(ROW_KEY, None)
+
+        self.rows = rows
+        return rows
+
+    def args(self, **overrides):
+        '''
+        query string arguments for a link to a related page
+        '''
+        args = {"size": self.size, "sort": self.sort, "dir": self.direction}
+        args.update(overrides)
+        return {k: v for k, v in args.items() if v is not None}
+
+
+def count(dbConnection, table):
+    '''
+    returns the number of rows in a table, cached until the table is written to
+    '''
+    return cache.cached(("count", table), (table,), lambda: db.query(
+        dbConnection, f"SELECT COUNT(*) AS total FROM {table}").fetchone()["total"], ttl = COUNT_TTL)
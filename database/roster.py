@@ -0,0 +1,45 @@
+"""
+Roster read model: RosterView, a denormalized copy of Players (see DDL.sql).
+
+Each RosterView row carries a player's athlete, team and school details in the
+form the /players page shows them, so the roster views read one table through
+its primary key or idx_roster_team instead of joining four. The stored
+procedures keep it current for single-row writes (sp_RefreshRoster in PL.sql);
+the bulk paths that insert Players directly (CSV import, the data generator)
+project their new rows here in the same way.
+"""
+
+import database.db_connector as db
+
+COLUMNS = ("playerID", "athleteID", "teamID", "firstName", "lastName", "school", "sportType", "varsityJv",
+           "academicYear", "eligible", "active")
+
+# Same projection as sp_RefreshRoster / sp_rebuild_roster
+PROJECT = (f"REPLACE INTO RosterView ({', '.join(COLUMNS)}) "
+           "SELECT p.playerID, a.athleteID, t.teamID, a.firstName, a.lastName, s.name, t.sportType, t.varsityJv, "
+           "t.academicYear, IF(a.isEligible, '✓', '✗'), IF(a.isActive, '✓', '✗') "
+           "FROM Players AS p "
+           "JOIN Athletes AS a ON a.athleteID = p.athleteID "
+           "JOIN Teams AS t ON t.teamID = p.teamID "
+           "JOIN Schools AS s ON s.schoolID = a.schoolID ")
+
+
+def projectPairs(cursor, pairs):
+    '''
+    projects the Players rows for (athleteID, teamID) pairs into RosterView
+    cursor: an open cursor, so the projection commits with the insert that created the rows
+    one row-constructor IN lookup, served by the unique_players key
+    '''
+    pairs = sorted(set(pairs))
+    if pairs:
+        cursor.execute(PROJECT + f"WHERE (p.athleteID, p.teamID) IN ({', '.join(['(%s, %s)'] * len(pairs))})",
+                       [value for pair in pairs for value in pair])
+
+def projectFrom(dbConnection, firstPlayerID):
+    '''
+    projects every Players row from firstPlayerID up into RosterView in one statement
+    used after a bulk load that assigned the player keys itself
+    '''
+    with db.transaction(dbConnection, tables = ("RosterView",)) as cursor:
+        cursor.execute(PROJECT + "WHERE p.playerID >= %s", (firstPlayerID,))
+        return cursor.rowcount
@@ -0,0 +1,192 @@
+"""
+Round-robin season scheduling.
+
+A season's teams (filtered like /games/teams: by sportType, optionally by
+varsityJv and academicYear) are paired with the circle method, so every team
+meets every other team once (twice for a double round robin) and plays at
+most once per round. Round r is played in the date window
+[startDate + r * roundDays, startDate + (r + 1) * roundDays).
+
+Each round's games are then matched to free (facility, date) slots in its
+window by maximum bipartite matching (augmenting paths), trying the home
+school's facilities first and the away school's next (the teams swap roles
+there). A slot is free when no existing game books that facility on that date
+(facility_in_use) and neither team already plays that day. Games no slot can
+take are reported back as unscheduled. The scheduled games are inserted with
+one multi-row INSERT in a single transaction.
+"""
+
+import datetime
+import os
+import database.db_connector as db
+
+ROUND_DAYS = int(os.getenv('SCHEDULE_ROUND_DAYS', 7))   # days in each round's date window
+
+INSERT_GAME = ("INSERT INTO Games (homeTeamID, awayTeamID, facilityID, gameDate, gameTime, gameType, status) "
+               "VALUES (%s, %s, %s, %s, %s, %s, %s)")
+
+
+def roundRobin(teamIDs, double = False):
+    '''
+    returns a list of rounds, each a list of (homeTeamID, awayTeamID) pairs
+    circle method: the first team stays put while the others rotate one place per round;
+    with an odd number of teams, one team sits out (a bye) each round
+    '''
+    teams = list(teamIDs)
+    if len(teams) % 2:
+        teams.append(None)
+    count = len(teams)
+    rounds = []
+    for r in range(count - 1):
+        pairs = []
+        for i in range(count // 2):
+            first, second = teams[i], teams[count - 1 - i]
+            if first is None or second is None:
+                continue
+            # Alternate home and away so no team hosts every week
+            if (i == 0 and r % 2) or (i > 0 and i % 2):
+                first, second = second, first
+            pairs.append((first, second))
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+
+    if double:
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return rounds
+
+
+def matchSlots(candidates):
+    '''
+    maximum bipartite matching of games to slots
+    candidates: for each game, its acceptable slots in order of preference
+    returns {game index: slot} for every game that could be placed
+    '''
+    owner = {}   # slot -> game index
+
+    def place(game, visited):
+        for slot in candidates[game]:
+            if slot in visited:
+                continue
+            visited.add(slot)
+            # Take a free slot, or move its current game to another of its slots
+            if slot not in owner or place(owner[slot], visited):
+                owner[slot] = game
+                return True
+        return False
+
+    for game in range(len(candidates)):
+        place(game, set())
+    return {game: slot for slot, game in owner.items()}
+
+
+def buildSchedule(teams, facilities, bookings, startDate, roundDays = ROUND_DAYS, endDate = None, double = False):
+    '''
+    plans a round-robin season without touching the database
+    teams: dicts with teamID and schoolID
+    facilities: dicts with facilityID and schoolID
+    bookings: existing games (dicts with homeTeamID, awayTeamID, facilityID, gameDate)
+    returns (games, unscheduled): games are dicts with round, homeTeamID, awayTeamID,
+    facilityID and gameDate; unscheduled are the pairs no free slot could take
+    '''
+    teamSchool = {team["teamID"]: team["schoolID"] for team in teams}
+    facilitiesBySchool = {}
+    for facility in facilities:
+        facilitiesBySchool.setdefault(facility["schoolID"], []).append(facility["facilityID"])
+
+    bookedSlots = {(game["facilityID"], game["gameDate"]) for game in bookings}
+    busyTeams = {(game[side], game["gameDate"]) for game in bookings for side in ("homeTeamID", "awayTeamID")}
+
+    games, unscheduled = [], []
+    for number, pairs in enumerate(roundRobin(sorted(teamSchool), double)):
+        first = startDate + datetime.timedelta(days = number * roundDays)
+        dates = [first + datetime.timedelta(days = d) for d in range(roundDays)
+                 if endDate is None or first + datetime.timedelta(days = d) <= endDate]
+
+        # Each candidate is (facilityID, date, hosts swapped?)
+        candidates = []
+        for home, away in pairs:
+            options = []
+            for host, swapped in ((home, False), (away, True)):
+                for facilityID in facilitiesBySchool.get(teamSchool[host], ()):
+                    for date in dates:
+                        if ((facilityID, date) not in bookedSlots and (home, date) not in busyTeams
+                                and (away, date) not in busyTeams):
+                            options.append((facilityID, date, swapped))
+            candidates.append(options)
+
+        # A slot is a facility on a date, whichever team hosts; match on that
+        slotKeys = [[(facilityID, date) for facilityID, date, _ in options] for options in candidates]
+        matched = matchSlots(slotKeys)
+
+        for index, (home, away) in enumerate(pairs):
+            if index not in matched:
+                unscheduled.append({"round": number + 1, "homeTeamID": home, "awayTeamID": away})
+                continue
+            facilityID, date = matched[index]
+            swapped = next(s for f, d, s in candidates[index] if (f, d) == (facilityID, date))
+            if swapped:
+                home, away = away, home
+            games.append({"round": number + 1, "homeTeamID": home, "awayTeamID": away,
+                          "facilityID": facilityID, "gameDate": date})
+            bookedSlots.add((facilityID, date))
+            busyTeams.update({(home, date), (away, date)})
+
+    return games, unscheduled
+
+
+def schedule(dbConnection, sportType, startDate, varsityJv = None, academicYear = None, roundDays = ROUND_DAYS,
+             endDate = None, double = False, gameTime = "18:00:00", gameType = "regular season", dryRun = False):
+    '''
+    schedules a full round robin for the matching teams and inserts it in one transaction
+    returns {"rounds", "games", "unscheduled"}; with dryRun nothing is written
+    '''
+    if roundDays < 1:
+        raise ValueError("Each round needs at least one day")
+    if endDate is not None and endDate < startDate:
+        raise ValueError("The season cannot end before it starts")
+
+    filters, params = ["t.sportType = %s"], [sportType]
+    if varsityJv:
+        filters.append("t.varsityJv = %s")
+        params.append(varsityJv)
+    if academicYear:
+        filters.append("t.academicYear = %s")
+        params.append(academicYear)
+    teams = db.query(dbConnection, f"SELECT t.teamID, t.schoolID FROM Teams AS t WHERE {' AND '.join(filters)}",
+                     params).fetchall()
+    if len(teams) < 2:
+        raise ValueError("At least two teams are needed to build a schedule")
+
+    rounds = len(teams) - 1 if len(teams) % 2 == 0 else len(teams)
+    rounds *= 2 if double else 1
+    lastDate = startDate + datetime.timedelta(days = rounds * roundDays - 1)
+    if endDate is not None:
+        lastDate = min(lastDate, endDate)
+
+    schoolIDs = sorted({team["schoolID"] for team in teams})
+    teamIDs = [team["teamID"] for team in teams]
+    facilities, bookings = db.queryBatch(dbConnection, (
+        (f"SELECT facilityID, schoolID FROM Facilities WHERE schoolID IN ({_placeholders(schoolIDs)})", schoolIDs),
+        # Existing games in the season that use these facilities or involve these teams
+        ("SELECT homeTeamID, awayTeamID, facilityID, gameDate FROM Games "
+         "WHERE gameDate BETWEEN %s AND %s "
+         f"AND (facilityID IN (SELECT facilityID FROM Facilities WHERE schoolID IN ({_placeholders(schoolIDs)})) "
+         f"OR homeTeamID IN ({_placeholders(teamIDs)}) OR awayTeamID IN ({_placeholders(teamIDs)}))",
+         [startDate, lastDate] + schoolIDs + teamIDs + teamIDs),
+    ))
+
+    games, unscheduled = buildSchedule(teams, facilities, bookings, startDate, roundDays, endDate, double)
+    for game in games:
+        game.update(gameTime = gameTime, gameType = gameType, status = "scheduled")
+
+    if games and not dryRun:
+        with db.transaction(dbConnection, tables = ("Games",)) as cursor:
+            cursor.executemany(INSERT_GAME, [(game["homeTeamID"], game["awayTeamID"], game["facilityID"],
+                                              game["gameDate"], game["gameTime"], game["gameType"], game["status"])
+                                             for game in games])
+
+    return {"rounds": rounds, "games": games, "unscheduled": unscheduled}
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
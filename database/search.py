@@ -0,0 +1,92 @@
+"""
+Prefix (typeahead) search over athlete names, team names, school names and facility names.
+
+Each kind is matched with a `column LIKE 'term%'` range scan on a B-tree index
+(see SEARCH INDEXES in DDL.sql), stopping after `limit` rows in index order, so
+a lookup reads about `limit` index entries however large the tables are. The
+four lookups go to the server as one queryBatch() round trip.
+
+Athletes match on first or last name, or on "first last" / "last first" when
+the term has more than one word. Each of those is its own UNION branch so every
+branch keeps a single index range; an OR across two columns would not.
+"""
+
+import os
+import database.db_connector as db
+
+SEARCH_LIMIT = int(os.getenv('SEARCH_LIMIT', 10))   # results per kind
+MAX_TERM_LENGTH = 120                                # the name columns are VARCHAR(120)
+
+KINDS = ("athletes", "teams", "schools", "facilities")
+
+# Tables read by a search; a write to any of them can change its results
+TABLES = ("Athletes", "Teams", "Schools", "Facilities")
+
+ATHLETE_SELECT = ("SELECT a.athleteID AS id, a.firstName AS firstName, a.lastName AS lastName, s.name AS school "
+                  "FROM Athletes AS a JOIN Schools AS s ON s.schoolID = a.schoolID ")
+
+TEAM_QUERY = ("SELECT t.teamID AS id, t.teamName AS teamName, s.name AS school, t.sportType AS sportType, "
+              "t.varsityJv AS varsityJv, t.academicYear AS academicYear "
+              "FROM Teams AS t JOIN Schools AS s ON s.schoolID = t.schoolID "
+              "WHERE t.teamName LIKE %s ORDER BY t.teamName, t.teamID LIMIT {limit}")
+
+SCHOOL_QUERY = ("SELECT schoolID AS id, name AS name FROM Schools "
+                "WHERE name LIKE %s ORDER BY name LIMIT {limit}")
+
+FACILITY_QUERY = ("SELECT f.facilityID AS id, f.facilityName AS facilityName, s.name AS school "
+                  "FROM Facilities AS f JOIN Schools AS s ON s.schoolID = f.schoolID "
+                  "WHERE f.facilityName LIKE %s ORDER BY f.facilityName, f.facilityID LIMIT {limit}")
+
+
+def normalize(term):
+    '''
+    collapses whitespace and trims the term to the length of the searched columns
+    '''
+    return " ".join((term or "").split())[:MAX_TERM_LENGTH]
+
+def prefix(term):
+    '''
+    returns a LIKE pattern matching values that start with term, with its wildcards escaped
+    '''
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def athleteQuery(term, limit):
+    '''
+    returns (query, query_params) for athletes whose first name, last name or full name starts with term
+    '''
+    # (where, order, params); each branch reads one index range in its own order
+    branches = [("a.lastName LIKE %s", "a.lastName, a.firstName", (prefix(term),)),
+                ("a.firstName LIKE %s", "a.firstName, a.lastName", (prefix(term),))]
+
+    words = term.split(" ", 1)
+    if len(words) == 2:
+        first, rest = words
+        branches += [("a.firstName = %s AND a.lastName LIKE %s", "a.lastName", (first, prefix(rest))),
+                     ("a.lastName = %s AND a.firstName LIKE %s", "a.firstName", (first, prefix(rest)))]
+
+    # Each branch stops after limit rows; the union is sorted and cut once more
+    query = " UNION ".join(f"({ATHLETE_SELECT}WHERE {where} ORDER BY {order} LIMIT {limit})"
+                           for where, order, _ in branches)
+    query += f" ORDER BY lastName, firstName, id LIMIT {limit}"
+    return query, tuple(param for _, _, params in branches for param in params)
+
+def search(dbConnection, term, limit = SEARCH_LIMIT):
+    '''
+    returns {"term": ..., "athletes": [...], "teams": [...], "schools": [...], "facilities": [...]}
+    every kind holds up to limit rows whose name starts with term (case-insensitive)
+    '''
+    term = normalize(term)
+    results = {"term": term}
+    if not term:
+        results.update((kind, []) for kind in KINDS)
+        return results
+
+    pattern = prefix(term)
+    rows = db.queryBatch(dbConnection, (
+        athleteQuery(term, limit),
+        (TEAM_QUERY.format(limit = limit), (pattern,)),
+        (SCHOOL_QUERY.format(limit = limit), (pattern,)),
+        (FACILITY_QUERY.format(limit = limit), (pattern,)),
+    ))
+    results.update(zip(KINDS, (list(kindRows) for kindRows in rows)))
+    return results
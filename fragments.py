@@ -0,0 +1,56 @@
+"""
+Template fragment caching and template precompilation.
+
+Dropdown <option> lists for reference data (schools, athletes, teams,
+facilities, sport types) are the same for every request until one of their
+tables is written to. Templates wrap them in a call block:
+
+    {% call fragment("school-options", "Schools") %} ... {% endcall %}
+
+The rendered HTML is kept in the reference data cache (database/cache.py),
+tagged with the named tables, so the write routes' transactions invalidate it
+through the same data versions as the cached queries.
+
+At startup every template is compiled once, and the compiled bytecode is
+written to a FileSystemBytecodeCache so later processes load it instead of
+parsing the templates again.
+"""
+
+import os
+import time
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+import database.cache as cache
+
+TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR') or None   # None: a per-user temp directory
+FRAGMENT_TTL = float(os.getenv('FRAGMENT_TTL', 3600))           # seconds a rendered fragment may be reused
+
+
+def fragment(name, *tables, caller = None):
+    '''
+    returns the cached HTML of a call block, rendering it on a miss
+    name: identifies the fragment; tables: the tables its data is read from
+    '''
+    return cache.cached(("fragment", name), tables, lambda: Markup(caller()), ttl = FRAGMENT_TTL)
+
+
+def warm(app):
+    '''
+    compiles every template, so the first request to each page skips parsing
+    returns the number of templates compiled and the seconds taken
+    '''
+    started = time.perf_counter()
+    names = app.jinja_env.list_templates(extensions = ("j2",))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names), round(time.perf_counter() - started, 3)
+
+
+def init_app(app):
+    '''
+    registers fragment() for templates, enables the bytecode cache and precompiles the templates
+    '''
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    app.jinja_env.globals["fragment"] = fragment
+    count, seconds = warm(app)
+    app.logger.debug(f"Compiled {count} templates in {seconds}s")
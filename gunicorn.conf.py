@@ -0,0 +1,50 @@
+"""
+gunicorn settings for the production serving mode (see wsgi.py and asgi.py).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    WEB_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+
+WEB_WORKERS prefork worker processes each run WEB_THREADS request threads. The app
+is imported once in the parent (preload_app), so templates are compiled before
+the fork and shared copy-on-write. The reference data cache's data versions are
+moved into shared memory first, so a write in one worker invalidates the cached
+pages and queries of all of them. Database connections cannot be shared across a
+fork, so each worker warms its own pool after it starts and closes it on exit.
+"""
+
+import multiprocessing
+import os
+import database.cache as cache
+import database.db_connector as db
+
+bind = os.getenv('BIND', '0.0.0.0:3092')
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('WEB_THREADS', 4))            # > 1 selects the gthread worker
+# asgi:app needs an ASGI worker, e.g. WEB_WORKER_CLASS=uvicorn.workers.UvicornWorker
+worker_class = os.getenv('WEB_WORKER_CLASS') or ("gthread" if threads > 1 else "sync")
+preload_app = True
+timeout = int(os.getenv('WEB_TIMEOUT', 120))           # reset-database at large scales is slow
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))  # in-flight requests finish on SIGTERM
+keepalive = 5
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 0))   # recycle workers after N requests (0: never)
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv('WEB_ACCESS_LOG') or None
+
+# Share the data versions before anything is forked (the app is preloaded after this file runs)
+cache.share()
+
+
+def post_fork(server, worker):
+    '''
+    opens this worker's database connections ahead of its first request
+    '''
+    try:
+        db.pool.warm(min(threads, db.pool.size))
+    except Exception as e:
+        server.log.warning(f"Could not warm the connection pool in worker {worker.pid}: {e}")
+
+def worker_exit(server, worker):
+    '''
+    closes this worker's idle database connections on a graceful shutdown
+    '''
+    db.pool.closeAll()
@@ -0,0 +1,140 @@
+"""
+HTTP conditional GET support (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+Validators are derived from the data versions of the tables a response reads,
+so an unchanged resource can be answered with 304 Not Modified before any query
+runs or any JSON is serialized.
+
+The HTML list pages use cachedPage(), which also keeps the rendered page keyed on
+its ETag: in the reference data cache, and optionally on disk (PAGE_CACHE_DIR),
+so a repeat request is served without querying or rendering until one of the
+page's tables is written to.
+"""
+
+from datetime import datetime, timezone
+import functools
+import hashlib
+import os
+import tempfile
+from flask import Response, request
+import database.cache as cache
+
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR') or None        # also keep rendered pages on disk when set
+PAGE_CACHE_FILES = int(os.getenv('PAGE_CACHE_FILES', 2048))  # max number of pages kept on disk
+
+
+def etagFor(tables, *parts):
+    '''
+    returns an ETag that changes whenever one of the tables is written to
+    parts: anything else the representation depends on (e.g. the request URL)
+    '''
+    versions = sorted(cache.versions(tables).items())
+    raw = repr((cache.cache.started, versions, parts)).encode()
+    return hashlib.sha1(raw).hexdigest()[:20]
+
+def lastModifiedFor(tables):
+    '''
+    returns the Last-Modified time for the tables, truncated to whole seconds as HTTP requires
+    '''
+    return datetime.fromtimestamp(int(cache.lastModified(tables)), timezone.utc)
+
+def notModified(etag, lastModified):
+    '''
+    checks the request's validators; If-None-Match takes precedence over If-Modified-Since
+    '''
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return lastModified <= request.if_modified_since
+    return False
+
+def conditional(tables, build, mimetype = "application/json"):
+    '''
+    returns a 304 when the client's copy is current, otherwise the body produced by build()
+    the serialized body is cached under its ETag, so repeat requests skip the database too
+    '''
+    etag = etagFor(tables, request.full_path)
+    lastModified = lastModifiedFor(tables)
+
+    if notModified(etag, lastModified):
+        response = Response(status = 304)
+    else:
+        body = cache.cached(("body", etag), tables, build)
+        response = Response(body, mimetype = mimetype)
+
+    return withValidators(response, etag, lastModified)
+
+def withValidators(response, etag, lastModified):
+    '''
+    adds the ETag / Last-Modified validators and the revalidation policy to a response
+    '''
+    response.set_etag(etag, weak = True)
+    response.last_modified = lastModified
+    # Let browsers and proxies keep a copy, but revalidate it on every use
+    response.cache_control.no_cache = True
+    return response
+
+
+def _pagePath(etag):
+    return os.path.join(PAGE_CACHE_DIR, f"{etag}.html")
+
+def _readPage(etag):
+    '''
+    returns a page stored on disk under its ETag, or None
+    '''
+    try:
+        with open(_pagePath(etag), encoding = "utf-8") as file:
+            return file.read()
+    except OSError:
+        return None
+
+def _writePage(etag, body):
+    '''
+    stores a page on disk under its ETag, dropping the oldest pages once there are too many
+    written to a temporary file and renamed, so a concurrent reader never sees half a page
+    '''
+    try:
+        os.makedirs(PAGE_CACHE_DIR, exist_ok = True)
+        fd, temp = tempfile.mkstemp(dir = PAGE_CACHE_DIR, suffix = ".tmp")
+        with os.fdopen(fd, "w", encoding = "utf-8") as file:
+            file.write(body)
+        os.replace(temp, _pagePath(etag))
+
+        pages = [entry for entry in os.scandir(PAGE_CACHE_DIR) if entry.name.endswith(".html")]
+        if len(pages) > PAGE_CACHE_FILES:
+            pages.sort(key = lambda entry: entry.stat().st_mtime)
+            for entry in pages[:len(pages) - PAGE_CACHE_FILES // 2]:
+                os.remove(entry.path)
+    except OSError as e:
+        print(f"Error writing cached page: {e}")
+
+def cachedPage(*tables):
+    '''
+    decorator for GET views whose HTML depends only on the URL and the data in tables
+    answers with a 304 or the cached page until one of the tables is written to
+    only rendered pages (str) are cached; errors and redirects pass through untouched
+    '''
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = cache.versions(tables)
+            etag = etagFor(tables, request.full_path)
+            lastModified = lastModifiedFor(tables)
+            if notModified(etag, lastModified):
+                return withValidators(Response(status = 304), etag, lastModified)
+
+            key = ("page", etag)
+            body = cache.cache.get(key)
+            if body is cache.MISS:
+                body = _readPage(etag) if PAGE_CACHE_DIR else None
+                if body is None:
+                    body = view(*args, **kwargs)
+                    if not isinstance(body, str):
+                        return body
+                    if PAGE_CACHE_DIR:
+                        _writePage(etag, body)
+                cache.cache.set(key, body, tables, versions = versions)
+
+            return withValidators(Response(body, mimetype = "text/html"), etag, lastModified)
+        return wrapper
+    return decorate
@@ -0,0 +1,205 @@
+"""
+Request-level instrumentation: query, route and template timings.
+
+Every SQL statement run through database/db_connector.py, every request and
+every render_template() call is timed and recorded in a latency histogram.
+Queries slower than SLOW_QUERY_MS are logged as one JSON line each, with
+the statement's fingerprint and parameter count but not the values. The
+aggregated histograms are served at /metrics in the Prometheus text format, and
+each response carries a Server-Timing header with that request's database time.
+
+Metrics are kept per process; each worker exposes its own /metrics.
+"""
+
+from collections import defaultdict
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from flask import Response, g, has_app_context, has_request_context, request, before_render_template, template_rendered
+import database.cache as cache
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))   # queries slower than this are logged
+# Parameter values hold names, contacts and other user input, so only their count is logged by default
+LOG_QUERY_PARAMS = os.getenv('LOG_QUERY_PARAMS') == "1"   # opt in to logging slow queries' values
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROWS_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+logger = logging.getLogger("athletics.metrics")
+
+
+class Histogram:
+    '''
+    thread-safe Prometheus-style histogram with one series per label combination
+    '''
+
+    def __init__(self, name, help, labels, buckets = SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = defaultdict(lambda: [[0] * len(self.buckets), 0.0, 0])   # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series[labels]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        '''
+        returns the histogram in the Prometheus text exposition format
+        '''
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total, count))
+                            for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            base = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, labels)]
+            for bound, bucketCount in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labelText(base, bound)} {bucketCount}")
+            lines.append(f"{self.name}_bucket{_labelText(base, '+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_labelText(base)} {total}")
+            lines.append(f"{self.name}_count{_labelText(base)} {count}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement execution time", ("statement",))
+QUERY_ROWS = Histogram("db_query_rows", "Rows returned per SQL statement", ("statement",), ROWS_BUCKETS)
+TRANSACTION_SECONDS = Histogram("db_transaction_duration_seconds", "Write transaction time, BEGIN to COMMIT", ("tables",))
+ROUTE_SECONDS = Histogram("http_request_duration_seconds", "Request handling time", ("route", "method", "status"))
+TEMPLATE_SECONDS = Histogram("template_render_duration_seconds", "Jinja template render time", ("template",))
+
+HISTOGRAMS = (ROUTE_SECONDS, TEMPLATE_SECONDS, QUERY_SECONDS, QUERY_ROWS, TRANSACTION_SECONDS)
+
+
+def fingerprint(query):
+    '''
+    returns a stable label for a statement: literals and whitespace are normalised,
+    and long statements are shortened but kept distinct with a hash suffix
+    '''
+    if isinstance(query, bytes):
+        query = query.decode(errors = "replace")
+    text = re.sub(r"\s+", " ", query).strip()
+    text = re.sub(r"'(?:[^'\\]|\\.)*'|\b\d+\b", "?", text)
+    if len(text) <= 100:
+        return text
+    return f"{text[:90]}... #{hashlib.sha1(text.encode()).hexdigest()[:8]}"
+
+def observeQuery(query, seconds, rows = None, query_params = ()):
+    '''
+    records one statement's execution time (and row count, when known)
+    called by db_connector for every query it runs
+    '''
+    label = fingerprint(query)
+    QUERY_SECONDS.observe(seconds, label)
+    if rows is not None and rows >= 0:
+        QUERY_ROWS.observe(rows, label)
+
+    if has_app_context():
+        g.dbTime = g.get("dbTime", 0.0) + seconds
+        g.dbQueries = g.get("dbQueries", 0) + 1
+
+    milliseconds = seconds * 1000
+    if milliseconds >= SLOW_QUERY_MS:
+        entry = {
+            "event": "slow_query",
+            "ms": round(milliseconds, 2),
+            "rows": rows,
+            "route": request.path if has_request_context() else None,
+            "statement": label,
+            "params": len(query_params or ()),
+        }
+        if LOG_QUERY_PARAMS:
+            entry["paramValues"] = [str(param) for param in query_params]
+        logger.warning(json.dumps(entry))
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps({"event": "query", "ms": round(milliseconds, 2), "rows": rows, "statement": label}))
+
+def observeTransaction(tables, seconds):
+    TRANSACTION_SECONDS.observe(seconds, ",".join(sorted(tables)) or "-")
+
+
+def render():
+    '''
+    returns every histogram plus the cache counters in the Prometheus text format
+    '''
+    stats = cache.stats()
+    counters = [
+        "# HELP cache_hits_total Reference data cache hits",
+        "# TYPE cache_hits_total counter",
+        f"cache_hits_total {stats['hits']}",
+        "# HELP cache_misses_total Reference data cache misses",
+        "# TYPE cache_misses_total counter",
+        f"cache_misses_total {stats['misses']}",
+        "# HELP cache_entries Reference data cache entries",
+        "# TYPE cache_entries gauge",
+        f"cache_entries {stats['size']}",
+    ]
+    return "\n".join([histogram.render() for histogram in HISTOGRAMS] + counters) + "\n"
+
+def clear():
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def init_app(app):
+    '''
+    times every request and template render, and serves /metrics
+    '''
+
+    @app.before_request
+    def startTimer():
+        g.requestStarted = time.perf_counter()
+
+    @app.after_request
+    def recordRequest(response):
+        started = g.pop("requestStarted", None)
+        if started is None:
+            return response
+        seconds = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        ROUTE_SECONDS.observe(seconds, route, request.method, str(response.status_code))
+
+        # Per-request breakdown, visible in the browser's network panel
+        dbTime, dbQueries = g.get("dbTime", 0.0), g.get("dbQueries", 0)
+        response.headers["Server-Timing"] = (f'db;dur={dbTime * 1000:.2f};desc="{dbQueries} queries", '
+                                             f'app;dur={seconds * 1000:.2f}')
+        return response
+
+    def templateStarted(sender, template, context, **extra):
+        g.setdefault("templateStarts", []).append(time.perf_counter())
+
+    def templateFinished(sender, template, context, **extra):
+        starts = g.get("templateStarts")
+        if starts:
+            TEMPLATE_SECONDS.observe(time.perf_counter() - starts.pop(), template.name or "<string>")
+
+    before_render_template.connect(templateStarted, app, weak = False)
+    template_rendered.connect(templateFinished, app, weak = False)
+
+    def metricsView():
+        return Response(render(), mimetype = "text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metricsView, methods = ["GET"])
+
+
+def _labelText(base, bound = None):
+    labels = base + ([f'le="{bound}"'] if bound is not None else [])
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,146 @@
+// Lookup index for the form dropdowns (see database/lookups.py and /lookups).
+//
+// Schools, teams, athletes and team memberships are loaded once, kept in localStorage
+// with their version, and refreshed with a delta (/lookups?since=<version>) that only
+// carries the sections changed since. Lookups.fetchJSON(url) answers the dropdown
+// endpoints below from that copy, in the same shape as the server would, and falls
+// back to fetching url when the index is not loaded or does not know the key.
+//
+//   /players/teams?athleteID=     teams an athlete can join
+//   /players/updateTeams?playerID= teams a player can be moved to
+//   /players/roster?teamID=       a team's roster ('' for every team)
+//   /games/teams?sportType=       teams of a sport
+
+window.Lookups = (function () {
+    const STORAGE_KEY = 'lookups';
+    let held = null;      // {version, sections}
+    let index = null;     // lookup maps built from held
+    let loading = null;
+
+    function objects(section) {
+        return section.rows.map(row => Object.fromEntries(section.columns.map((column, i) => [column, row[i]])));
+    }
+
+    function build(sections) {
+        const schools = new Map(objects(sections.schools).map(s => [s.schoolID, s.name]));
+        const teams = objects(sections.teams);
+        const athletes = new Map(objects(sections.athletes).map(a => [a.athleteID, a]));
+        const players = objects(sections.players);
+
+        const teamsByID = new Map(teams.map(t => [t.teamID, t]));
+        const teamsBySchool = new Map();
+        teams.forEach(t => {
+            if (!teamsBySchool.has(t.schoolID)) teamsBySchool.set(t.schoolID, []);
+            teamsBySchool.get(t.schoolID).push(t);
+        });
+        const memberships = new Map();
+        players.forEach(p => {
+            if (!memberships.has(p.athleteID)) memberships.set(p.athleteID, new Set());
+            memberships.get(p.athleteID).add(p.teamID);
+        });
+
+        return {schools, teams, teamsByID, teamsBySchool, athletes,
+                players, playersByID: new Map(players.map(p => [p.playerID, p])), memberships};
+    }
+
+    function save() {
+        try {
+            localStorage.setItem(STORAGE_KEY, JSON.stringify(held));
+        } catch (error) {
+            // Storage full or disabled: the index still works for this page
+        }
+    }
+
+    function restore() {
+        try {
+            return JSON.parse(localStorage.getItem(STORAGE_KEY));
+        } catch (error) {
+            return null;
+        }
+    }
+
+    async function load() {
+        const previous = held || restore();
+        const url = previous ? `/lookups?since=${encodeURIComponent(previous.version)}` : '/lookups';
+        const res = await fetch(url, {headers: {'Accept': 'application/json'}});
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        const update = await res.json();
+
+        const sections = update.full ? update.sections : Object.assign({}, previous.sections, update.sections);
+        index = build(sections);
+        held = {version: update.version, sections};
+        save();
+    }
+
+    // Loads the index, or brings the copy held up to date with a delta
+    function refresh() {
+        loading = load().catch(error => {
+            console.error('Error loading lookups:', error);
+            held = index = null;
+            save();
+        });
+        return loading;
+    }
+
+    // Teams at the athlete's school they are not already on (the anti-join of /players/teams)
+    function openTeams(athleteID, withSeason) {
+        const athlete = index.athletes.get(athleteID);
+        if (!athlete) return undefined;
+        const joined = index.memberships.get(athleteID) || new Set();
+        return (index.teamsBySchool.get(athlete.schoolID) || [])
+            .filter(t => !joined.has(t.teamID))
+            .map(t => Object.assign(
+                {teamID: t.teamID, schoolName: index.schools.get(t.schoolID), teamName: t.teamName,
+                 sportType: t.sportType, varsityJv: t.varsityJv, academicYear: t.academicYear},
+                withSeason ? {seasonName: t.seasonName} : {}));
+    }
+
+    const RESOLVERS = {
+        '/players/teams': params => openTeams(Number(params.get('athleteID')), false),
+
+        '/players/updateTeams': params => {
+            const player = index.playersByID.get(Number(params.get('playerID')));
+            return player ? openTeams(player.athleteID, true) : undefined;
+        },
+
+        '/games/teams': params => index.teams
+            .filter(t => t.sportType === params.get('sportType'))
+            .map(t => ({teamID: t.teamID, schoolName: index.schools.get(t.schoolID),
+                        varsityJv: t.varsityJv, academicYear: t.academicYear})),
+
+        '/players/roster': params => {
+            const teamID = params.get('teamID') ? Number(params.get('teamID')) : null;
+            const rows = [];
+            for (const p of index.players) {
+                if (teamID !== null && p.teamID !== teamID) continue;
+                const athlete = index.athletes.get(p.athleteID);
+                const team = index.teamsByID.get(p.teamID);
+                if (!athlete || !team) return undefined;
+                rows.push({
+                    'id': p.playerID, 'first_name': athlete.firstName, 'last_name': athlete.lastName,
+                    'school': index.schools.get(athlete.schoolID), 'sport': team.sportType,
+                    'varsity_/_JV': team.varsityJv, 'academic_year': team.academicYear,
+                    'eligible': athlete.isEligible ? '✓' : '✗', 'active': athlete.isActive ? '✓' : '✗'
+                });
+            }
+            return rows;
+        }
+    };
+
+    // Answers a dropdown endpoint from the index; anything else (or a miss) goes to the server
+    async function fetchJSON(url) {
+        const target = new URL(url, window.location.origin);
+        const resolve = RESOLVERS[target.pathname];
+        if (resolve) {
+            if (loading) await loading;
+            const result = index ? resolve(target.searchParams) : undefined;
+            if (result !== undefined) return result;
+        }
+
+        const res = await fetch(url, {headers: {'Accept': 'application/json'}});
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+    }
+
+    return {refresh, fetchJSON, loaded: () => index !== null};
+})();
@@ -0,0 +1,113 @@
+// Partial-page updates for the create / update / delete forms.
+//
+// A form marked data-partial="<tbody id>" is posted with fetch and an X-Partial: row
+// header. The server answers with the changed row rendered as a <tr> (see writeResponse()
+// in app.py), and this script patches that row into the table in place of a redirect
+// and a full reload of the list page. Without JavaScript the forms post and redirect as before.
+//
+//   data-options="<select id>"  also keeps that select's <option> for the row in step
+//   data-success="..."          message shown above the table after the change
+//   data-busy="..." (button)    button label while the request is in flight
+
+(function () {
+    function showMessage(table, text) {
+        const previous = document.querySelector('[data-partial-message]');
+        if (previous) previous.remove();
+        if (!text) return;
+
+        const message = document.createElement('div');
+        message.className = 'success-message';
+        message.dataset.partialMessage = '';
+        message.textContent = text;
+        table.parentNode.insertBefore(message, table);
+    }
+
+    function parseRow(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        return template.content.firstElementChild;
+    }
+
+    function patchRow(tbody, action, id, html, form) {
+        const current = tbody.querySelector(`tr[data-row-id="${CSS.escape(id)}"]`)
+            || (action === 'deleted' ? form.closest('tr') : null);
+
+        if (action === 'deleted') {
+            if (current) current.remove();
+            return null;
+        }
+
+        const row = parseRow(html);
+        if (!row) return null;
+        if (current) {
+            current.replaceWith(row);
+        } else if (action === 'created') {
+            const empty = tbody.querySelector('tr[data-empty]');
+            if (empty) empty.remove();
+            tbody.prepend(row);
+        }
+        return row;
+    }
+
+    function patchOption(select, action, id, row) {
+        if (!select) return;
+        const option = select.querySelector(`option[value="${CSS.escape(id)}"]`);
+        if (action === 'deleted') {
+            if (option) option.remove();
+        } else if (row && row.dataset.label) {
+            const target = option || select.appendChild(document.createElement('option'));
+            target.value = id;
+            target.textContent = row.dataset.label;
+        }
+    }
+
+    document.addEventListener('submit', async (e) => {
+        const form = e.target;
+        const tbody = form.dataset.partial && document.getElementById(form.dataset.partial);
+        // Leave forms alone that are not marked, or whose own handler is holding the submit
+        if (!tbody || e.defaultPrevented) return;
+        e.preventDefault();
+
+        const buttons = Array.from(form.querySelectorAll('[type="submit"]'));
+        const labels = buttons.map(button => button.textContent);
+        buttons.forEach(button => {
+            button.disabled = true;
+            if (button.dataset.busy) button.textContent = button.dataset.busy;
+        });
+
+        try {
+            const response = await fetch(form.action, {
+                method: 'POST',
+                body: new FormData(form),
+                headers: {'X-Partial': 'row'}
+            });
+
+            if (!response.ok) {
+                // The list page has the message for every error code, so show the error there
+                const body = await response.json().catch(() => ({}));
+                window.location.href = body.location || window.location.href;
+                return;
+            }
+
+            const action = response.headers.get('X-Row-Action');
+            const id = response.headers.get('X-Row-Id');
+            const table = tbody.closest('table');
+            const row = patchRow(tbody, action, id, await response.text(), form);
+            patchOption(document.getElementById(form.dataset.options), action, id, row);
+            showMessage(table, form.dataset.success);
+            if (action !== 'deleted') form.reset();
+            // Pull the change into the dropdown lookup index, if this page uses one
+            if (window.Lookups && Lookups.loaded()) Lookups.refresh();
+
+        } catch (error) {
+            console.error('Error saving changes:', error);
+            alert('Error saving changes. Please try again.');
+
+        } finally {
+            buttons.forEach((button, i) => {
+                button.disabled = false;
+                button.textContent = labels[i];
+            });
+        }
+    });
+})();
@@ -0,0 +1,112 @@
+// Typeahead for the search box in the navigation bar (see /search and database/search.py).
+//
+// Each pause in typing asks /search for names starting with the term and lists them
+// under the box; only the latest request's answer is shown, and answers are kept per
+// term for the page's lifetime so backspacing does not ask again. Arrow keys move
+// through the suggestions, Enter opens one, and Enter with none picked (or without
+// JavaScript) submits the form to the full results page.
+
+(function () {
+    const DELAY_MS = 120;
+    const KINDS = [['athletes', 'Athlete'], ['teams', 'Team'], ['schools', 'School'], ['facilities', 'Facility']];
+
+    const form = document.getElementById('search-form');
+    const input = document.getElementById('search-q');
+    const list = document.getElementById('search-suggestions');
+    if (!form || !input || !list) return;
+
+    const answers = new Map();   // term -> results
+    let timer = null;
+    let latest = 0;
+    let active = -1;
+
+    function items() {
+        return Array.from(list.querySelectorAll('a'));
+    }
+
+    function highlight(index) {
+        const links = items();
+        active = links.length ? (index + links.length) % links.length : -1;
+        links.forEach((link, i) => link.classList.toggle('active', i === active));
+    }
+
+    function close() {
+        list.hidden = true;
+        active = -1;
+    }
+
+    function render(results) {
+        list.replaceChildren();
+        for (const [kind, label] of KINDS) {
+            for (const row of results[kind] || []) {
+                const link = document.createElement('a');
+                link.href = row.url;
+                const name = document.createElement('span');
+                name.className = 'search-name';
+                name.textContent = row.label;
+                const detail = document.createElement('span');
+                detail.className = 'search-detail';
+                detail.textContent = `${label} · ${row.detail}`;
+                link.append(name, detail);
+
+                const item = document.createElement('li');
+                item.append(link);
+                list.append(item);
+            }
+        }
+        if (!list.children.length) {
+            const item = document.createElement('li');
+            item.className = 'search-none';
+            item.textContent = 'No matches';
+            list.append(item);
+        }
+        active = -1;
+        list.hidden = false;
+    }
+
+    async function suggest(term) {
+        const request = ++latest;
+        try {
+            let results = answers.get(term);
+            if (!results) {
+                const res = await fetch(`/search?q=${encodeURIComponent(term)}`, {headers: {'Accept': 'application/json'}});
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                results = await res.json();
+                answers.set(term, results);
+            }
+            // A slower answer to an earlier term must not replace the current one
+            if (request === latest && input.value.trim() === term) render(results);
+        } catch (error) {
+            console.error('Error searching:', error);
+        }
+    }
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        const term = input.value.trim().replace(/\s+/g, ' ');
+        if (!term) {
+            latest++;
+            close();
+            return;
+        }
+        timer = setTimeout(() => suggest(term), DELAY_MS);
+    });
+
+    input.addEventListener('keydown', (e) => {
+        if (list.hidden) return;
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            window.location.href = items()[active].href;
+        } else if (e.key === 'Escape') {
+            close();
+        }
+    });
+
+    // Close when focus leaves the box and its suggestions
+    form.addEventListener('focusout', (e) => {
+        if (!form.contains(e.relatedTarget)) close();
+    });
+})();
@@ -0,0 +1,106 @@
+"""
+Invalidation, expiry and eviction of the reference-data cache (database/cache.py).
+"""
+
+import multiprocessing
+import pytest
+import database.cache as cache
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    # A private cache, so tests neither see nor leave entries in the module-level one
+    ttlCache = cache.TTLCache(maxsize = len(cache.TABLES), ttl = 60)
+    monkeypatch.setattr(cache, "cache", ttlCache)
+    return ttlCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_invalidate_cascades_transitively(fresh):
+    for table in cache.TABLES:
+        fresh.set(table, "value", (table,))
+
+    fresh.invalidate("Teams")
+
+    # Teams -> Players / Games / Standings, and Players -> RosterView
+    stale = {"Teams", "Players", "Games", "Standings", "RosterView"}
+    for table in cache.TABLES:
+        assert (fresh.get(table) is cache.MISS) == (table in stale), table
+
+def test_invalidate_schools_reaches_every_table(fresh):
+    for table in cache.TABLES:
+        fresh.set(table, "value", (table,))
+    fresh.invalidate("Schools")
+    assert all(fresh.get(table) is cache.MISS for table in cache.TABLES)
+
+def test_entry_tagged_with_several_tables_misses_when_any_changes(fresh):
+    fresh.set("games page", "value", ("Games", "Teams", "Facilities", "Schools"))
+    fresh.invalidate("Facilities")
+    assert fresh.get("games page") is cache.MISS
+
+def test_write_during_load_invalidates_the_loaded_value(fresh):
+    def loader():
+        fresh.invalidate("Teams")
+        return "read before the write committed"
+    cache.cached("teams", ("Teams",), loader)
+    assert fresh.get("teams") is cache.MISS
+
+
+def test_entries_expire_after_their_ttl(fresh, clock):
+    fresh.set("default", "value")
+    fresh.set("short", "value", ttl = 5)
+    clock[0] += 6
+    assert fresh.get("short") is cache.MISS
+    assert fresh.get("default") == "value"
+    clock[0] += 60
+    assert fresh.get("default") is cache.MISS
+
+def test_least_recently_used_entry_is_evicted(fresh):
+    fresh.maxsize = 3
+    for key in ("a", "b", "c"):
+        fresh.set(key, key)
+    fresh.get("a")
+    fresh.set("d", "d")
+    assert fresh.get("b") is cache.MISS
+    assert [fresh.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+    assert fresh.evictions == 1
+
+
+def test_cached_keys_on_its_arguments(fresh):
+    calls = []
+    def loader(value):
+        return lambda: calls.append(value) or value
+
+    assert cache.cached(("count", "Teams"), ("Teams",), loader(1)) == 1
+    assert cache.cached(("count", "Games"), ("Games",), loader(2)) == 2
+    assert cache.cached(("count", "Teams"), ("Teams",), loader(3)) == 1
+    assert calls == [1, 2]
+
+
+def _bump(versions):
+    versions.bump(("Teams",), 1234.5)
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason = "needs fork()")
+def test_shared_versions_are_seen_across_processes():
+    versions = cache.SharedVersions()
+    child = multiprocessing.get_context("fork").Process(target = _bump, args = (versions,))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert versions.get("Teams") == 1
+    assert versions.modified("Teams") == 1234.5
+    assert versions.get("Games") == 0
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason = "needs fork()")
+def test_shared_write_in_one_worker_invalidates_another(fresh):
+    fresh.store = cache.SharedVersions()
+    fresh.set("teams", "value", ("Teams",))
+    child = multiprocessing.get_context("fork").Process(target = fresh.invalidate, args = ("Schools",))
+    child.start()
+    child.join()
+    assert fresh.get("teams") is cache.MISS
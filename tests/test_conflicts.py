@@ -0,0 +1,55 @@
+"""
+Conflict checking for proposed games (database/conflicts.py).
+"""
+
+import datetime
+import pytest
+import app as web
+import database.conflicts as conflicts
+
+DATE = datetime.date(2024, 9, 15)
+
+
+def proposals(*times, teamID = 1):
+    # Proposals for the same team on DATE, each at its own facility; None is a proposal without a time
+    return [(index, {"homeTeamID": teamID, "awayTeamID": 100 + index, "facilityID": 200 + index,
+                     "gameDate": DATE, "minutes": minutes})
+            for index, minutes in enumerate(times)]
+
+def teamPairs(found):
+    return {frozenset((conflict["index"], conflict["otherIndex"])) for conflict in found
+            if conflict["type"] == "team"}
+
+
+def test_timeless_proposal_conflicts_with_every_timed_one():
+    # 10:00 and 14:00 are far enough apart, but a game without a time overlaps both
+    found = conflicts._withinBatch(proposals(600, 840, None), window = 180)
+    assert teamPairs(found) == {frozenset((0, 2)), frozenset((1, 2))}
+
+def test_non_adjacent_starts_inside_the_window():
+    # 0 and 170 minutes are not neighbours in start order but still within 180 minutes
+    found = conflicts._withinBatch(proposals(0, 100, 170), window = 180)
+    assert teamPairs(found) == {frozenset((0, 1)), frozenset((1, 2)), frozenset((0, 2))}
+
+def test_starts_outside_the_window_do_not_conflict():
+    found = conflicts._withinBatch(proposals(0, 180, 360), window = 180)
+    assert teamPairs(found) == set()
+
+def test_timeless_proposals_conflict_with_each_other():
+    found = conflicts._withinBatch(proposals(None, None), window = 180)
+    assert teamPairs(found) == {frozenset((0, 1))}
+
+@pytest.mark.parametrize("field, value", [("homeTeamID", [1]), ("facilityID", {"id": 2}), ("awayTeamID", "two"),
+                                          ("gameID", [3]), ("gameDate", "15/09/2024"), ("gameTime", ["18:00"])])
+def test_malformed_fields_are_reported_by_name(field, value):
+    game = {"homeTeamID": 1, "awayTeamID": 2, "facilityID": 3, "gameDate": "2024-09-15", "gameTime": "18:00"}
+    game[field] = value
+    with pytest.raises(ValueError, match = f"Invalid {field}"):
+        conflicts.check(None, [game])
+
+def test_malformed_fields_are_a_bad_request(monkeypatch):
+    monkeypatch.setattr(web.db, "getConnection", lambda: None)
+    game = {"homeTeamID": [1], "awayTeamID": 2, "gameDate": "2024-09-15"}
+    response = web.app.test_client().post("/games/conflicts", json = {"games": [game]})
+    assert response.status_code == 400
+    assert "homeTeamID" in response.get_json()["error"]
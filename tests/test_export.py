@@ -0,0 +1,28 @@
+"""
+CSV / NDJSON exports (exportResponse in app.py).
+"""
+
+import app as web
+import database.db_connector as db
+
+
+def export(monkeypatch, rows, url):
+    monkeypatch.setattr(db, "getConnection", lambda: None)
+    monkeypatch.setattr(db, "stream", lambda dbConnection, query: iter(rows))
+    return web.app.test_client().get(url)
+
+
+def test_empty_csv_export_has_header(monkeypatch):
+    response = export(monkeypatch, [], "/games/export")
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == ",".join(web.SCHEDULE_EXPORT_COLUMNS) + "\r\n"
+
+def test_csv_export_writes_rows_under_header(monkeypatch):
+    row = dict.fromkeys(web.ROSTER_EXPORT_COLUMNS, "")
+    row.update(playerID=1, firstName="Ada")
+    lines = export(monkeypatch, [row], "/players/export").get_data(as_text=True).splitlines()
+    assert lines[0] == ",".join(web.ROSTER_EXPORT_COLUMNS)
+    assert lines[1].startswith("1,,Ada,")
+
+def test_empty_ndjson_export_is_empty(monkeypatch):
+    assert export(monkeypatch, [], "/games/export?format=ndjson").get_data(as_text=True) == ""
@@ -0,0 +1,64 @@
+"""
+Synthetic data generation (database/generator.py).
+"""
+
+import contextlib
+import database.db_connector as db
+import database.generator as generator
+import database.roster as roster
+
+
+class FakeCursor:
+    def __init__(self, written):
+        self.written = written
+
+    def execute(self, statement, params = ()):
+        pass
+
+    def executemany(self, statement, rows):
+        table = next(name for name, insert in generator.INSERTS.items() if insert == statement)
+        self.written.setdefault(table, []).extend(rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.written = {}
+
+    def cursor(self, *args):
+        return FakeCursor(self.written)
+
+
+def generate(monkeypatch, perScale, scale = 1, seed = 7):
+    connection = FakeConnection()
+
+    @contextlib.contextmanager
+    def transaction(dbConnection, tables = ()):
+        yield dbConnection.cursor()
+
+    monkeypatch.setattr(generator, "PER_SCALE", perScale)
+    monkeypatch.setattr(db, "queryBatch", lambda dbConnection, queries: [[{"nextID": 1}] for _ in queries])
+    monkeypatch.setattr(db, "transaction", transaction)
+    monkeypatch.setattr(roster, "projectFrom", lambda dbConnection, firstPlayerID: 0)
+    generator.generate(connection, scale, seed = seed)
+    return connection.written
+
+
+def test_each_facility_books_each_date_once(monkeypatch):
+    # One school with one facility and teams in every season and year, so the seasons' date ranges overlap
+    written = generate(monkeypatch, {"Schools": 1, "Teams": 24, "Facilities": 1, "Athletes": 0, "Players": 0,
+                                     "Games": 600})
+    slots = [(game[3], game[4]) for game in written["Games"]]
+    assert len(slots) == 600
+    assert len(set(slots)) == len(slots)
+
+def test_generated_rows_keep_the_table_constraints(monkeypatch):
+    written = generate(monkeypatch, generator.PER_SCALE, scale = 20)
+    teams = {team[0]: team for team in written["Teams"]}
+    assert len({(team[1], team[3], team[4], team[6]) for team in teams.values()}) == len(teams)   # so unique_teams holds
+    athleteSchools = {athlete[0]: athlete[1] for athlete in written["Athletes"]}
+    assert len({(player[1], player[2]) for player in written["Players"]}) == len(written["Players"])
+    assert all(teams[teamID][1] == athleteSchools[athleteID] for _, teamID, athleteID in written["Players"])
+    assert all(game[1] != game[2] for game in written["Games"])
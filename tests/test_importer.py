@@ -0,0 +1,140 @@
+"""
+Batch validation and the per-row fallback of the CSV import (database/importer.py).
+"""
+
+import io
+import MySQLdb
+import database.db_connector as db
+import database.importer as importer
+import database.roster as roster
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def executemany(self, statement, rows):
+        self.connection.batches += 1
+        if self.connection.failBatch:
+            raise MySQLdb.IntegrityError(1062, "Duplicate entry in batch")
+        self.connection.pending += [("insert", tuple(values)) for values in rows]
+
+    def execute(self, statement, values):
+        if tuple(values) in self.connection.reject:
+            raise MySQLdb.IntegrityError(1062, f"Duplicate entry {tuple(values)}")
+        self.connection.pending.append(("insert", tuple(values)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    '''
+    keeps inserts pending until commit, so rolled back rows never count as written
+    '''
+
+    def __init__(self, failBatch = True, reject = ()):
+        self.failBatch = failBatch
+        self.reject = set(reject)
+        self.batches = 0
+        self.pending = []
+        self.committed = []
+
+    def begin(self):
+        self.pending = []
+
+    def cursor(self, *args):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed += self.pending
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def get_autocommit(self):
+        return True
+
+    def inserted(self, kind = "insert"):
+        return [values for action, values in self.committed if action == kind]
+
+
+def csvFile(text):
+    return io.StringIO(text.strip() + "\n")
+
+
+def playerLookups(monkeypatch, athletes, teams, existing = ()):
+    # athletes / teams: {id: schoolID}; existing: (athleteID, teamID) pairs already in Players
+    def queryBatch(dbConnection, queries):
+        return [[{"athleteID": athleteID, "schoolID": schoolID} for athleteID, schoolID in athletes.items()],
+                [{"teamID": teamID, "schoolID": schoolID} for teamID, schoolID in teams.items()],
+                [{"athleteID": athleteID, "teamID": teamID} for athleteID, teamID in existing]]
+    monkeypatch.setattr(db, "queryBatch", queryBatch)
+
+    def projectPairs(cursor, pairs):
+        cursor.connection.pending += [("project", tuple(pair)) for pair in pairs]
+    monkeypatch.setattr(roster, "projectPairs", projectPairs)
+
+
+def test_player_import_falls_back_to_rows_when_the_batch_fails(monkeypatch):
+    playerLookups(monkeypatch, athletes = {1: 10, 2: 10, 3: 10}, teams = {5: 10})
+    connection = FakeConnection(reject = {(2, 5)})
+    report = importer.importPlayers(connection, csvFile("athleteID,teamID\n1,5\n2,5\n3,5"))
+
+    assert connection.batches == 1
+    assert connection.inserted() == [(1, 5), (3, 5)]
+    result = report.asDict()
+    assert result["inserted"] == 2
+    assert [error["row"] for error in result["errors"]] == [3]
+    assert result["errors"][0]["errors"][0].startswith("Database rejected row")
+
+def test_projection_runs_only_for_inserted_players(monkeypatch):
+    playerLookups(monkeypatch, athletes = {1: 10, 2: 10, 3: 10}, teams = {5: 10})
+    connection = FakeConnection(reject = {(2, 5)})
+    importer.importPlayers(connection, csvFile("athleteID,teamID\n1,5\n2,5\n3,5"))
+    assert connection.inserted("project") == [(1, 5), (3, 5)]
+
+def test_player_import_validates_before_inserting(monkeypatch):
+    playerLookups(monkeypatch, athletes = {1: 10, 2: 10, 4: 20}, teams = {5: 10}, existing = [(2, 5)])
+    connection = FakeConnection(failBatch = False)
+    report = importer.importPlayers(connection, csvFile(
+        "athleteID,teamID\n"
+        "1,5\n"      # line 2: valid
+        "x,5\n"      # line 3: not a number
+        "9,5\n"      # line 4: no such athlete
+        "2,5\n"      # line 5: already on the team
+        "4,5\n"      # line 6: another school
+        "1,5\n"))    # line 7: repeats line 2
+    assert connection.inserted() == [(1, 5)]
+    assert connection.inserted("project") == [(1, 5)]
+    errors = {error["row"]: error["errors"] for error in report.asDict()["errors"]}
+    assert sorted(errors) == [3, 4, 5, 6, 7]
+    assert "athleteID must be a whole number" in errors[3][0]
+    assert errors[4] == ["Athlete 9 does not exist"]
+
+def test_athlete_import_reports_bad_rows_by_line(monkeypatch):
+    class Rows:
+        def __init__(self, rows):
+            self.rows = rows
+        def fetchall(self):
+            return self.rows
+
+    def query(dbConnection, query, query_params = ()):
+        if "FROM Schools WHERE" in query:
+            return Rows([{"schoolID": schoolID} for schoolID in query_params if schoolID == 10])
+        return Rows([{"schoolID": 10, "name": "North High"}])
+    monkeypatch.setattr(db, "query", query)
+
+    connection = FakeConnection(reject = {(10, "Bo", "Lee", 11, 1, 1, None)})
+    report = importer.importAthletes(connection, csvFile(
+        "school,firstName,lastName,gradeLevel\n"
+        "North High,Ada,Park,9\n"        # line 2: valid
+        "North High,Bo,Lee,11\n"         # line 3: rejected by the database
+        "South High,Cy,Moss,10\n"        # line 4: unknown school
+        "North High,,Ng,13\n"))          # line 5: no first name, grade out of range
+    assert connection.inserted() == [(10, "Ada", "Park", 9, 1, 1, None)]
+    errors = {error["row"]: error["errors"] for error in report.asDict()["errors"]}
+    assert sorted(errors) == [3, 4, 5]
+    assert errors[4] == ["Unknown school: South High"]
+    assert errors[5] == ["firstName is required", "gradeLevel must be between 9 and 12"]
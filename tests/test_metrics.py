@@ -0,0 +1,36 @@
+"""
+Slow query logging (metrics.py).
+"""
+
+import json
+import logging
+import metrics
+
+QUERY = "SELECT athleteID FROM Athletes WHERE lastName = %s AND emergencyContact = %s"
+
+
+def slowQueryLog(caplog):
+    records = [json.loads(record.getMessage()) for record in caplog.records if record.name == metrics.logger.name]
+    return [entry for entry in records if entry["event"] == "slow_query"]
+
+
+def test_slow_query_log_leaves_out_parameter_values(caplog):
+    with caplog.at_level(logging.WARNING, logger = metrics.logger.name):
+        metrics.observeQuery(QUERY, 10.0, 1, ("Park", "555-0100"))
+    entry, = slowQueryLog(caplog)
+    assert entry["params"] == 2
+    assert "paramValues" not in entry
+    assert "Park" not in caplog.text and "555-0100" not in caplog.text
+
+def test_parameter_values_are_logged_only_when_enabled(caplog, monkeypatch):
+    monkeypatch.setattr(metrics, "LOG_QUERY_PARAMS", True)
+    with caplog.at_level(logging.WARNING, logger = metrics.logger.name):
+        metrics.observeQuery(QUERY, 10.0, 1, ("Park", "555-0100"))
+    entry, = slowQueryLog(caplog)
+    assert entry["paramValues"] == ["Park", "555-0100"]
+
+def test_bound_statement_literals_are_not_logged(caplog):
+    # queryBatch() binds parameters into the statement text before it is timed
+    with caplog.at_level(logging.WARNING, logger = metrics.logger.name):
+        metrics.observeQuery(b"SELECT athleteID FROM Athletes WHERE lastName = 'Park'", 10.0, 1)
+    assert "Park" not in caplog.text
@@ -0,0 +1,76 @@
+"""
+Keyset pagination (database/pagination.py) across NULL sort values.
+
+The page queries run on an in-memory SQLite table, which orders NULLs the way
+MySQL does: first when ascending, last when descending.
+"""
+
+import sqlite3
+import pytest
+import database.pagination as pagination
+
+NAMES = [None, "b", None, "a", "b", None, "c", "a", None, "c", "b"]
+
+SORT_COLUMNS = {"id": "t.id", "name": "t.name"}
+
+
+@pytest.fixture
+def dbConnection():
+    connection = sqlite3.connect(":memory:")
+    connection.row_factory = sqlite3.Row
+    connection.execute("CREATE TABLE Things (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO Things (id, name) VALUES (?, ?)", enumerate(NAMES, start = 1))
+    yield connection
+    connection.close()
+
+
+def fetchPage(dbConnection, args):
+    page = pagination.Page(args, SORT_COLUMNS, key = "t.id")
+    query, params = page.query("SELECT t.id, t.name FROM Things AS t")
+    rows = [dict(row) for row in dbConnection.execute(query.replace("%s", "?"), params)]
+    page.load(rows)
+    return page
+
+def walk(dbConnection, direction, size):
+    # Follows the "next" cursors from the first page to the last
+    args = {"sort": "name", "dir": direction, "size": size}
+    seen = []
+    while True:
+        page = fetchPage(dbConnection, args)
+        seen += [row["id"] for row in page.rows]
+        if not page.hasNext:
+            return seen
+        args = dict(args, after = page.nextCursor)
+
+def expected(direction):
+    nulls = [id for id, name in enumerate(NAMES, start = 1) if name is None]
+    named = sorted(((name, id) for id, name in enumerate(NAMES, start = 1) if name is not None),
+                   reverse = direction == "desc")
+    if direction == "asc":
+        return nulls + [id for _, id in named]
+    return [id for _, id in named] + sorted(nulls, reverse = True)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 4])
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_pages_cross_null_boundary(dbConnection, direction, size):
+    assert walk(dbConnection, direction, size) == expected(direction)
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_previous_page_across_null_boundary(dbConnection, direction):
+    size = 3
+    order = expected(direction)
+    args = {"sort": "name", "dir": direction, "size": size}
+    pages = [fetchPage(dbConnection, args)]
+    while pages[-1].hasNext:
+        pages.append(fetchPage(dbConnection, dict(args, after = pages[-1].nextCursor)))
+
+    # Stepping back from each page lands on the page before it
+    for number, page in enumerate(pages[1:], start = 1):
+        previous = fetchPage(dbConnection, dict(args, before = page.prevCursor))
+        assert [row["id"] for row in previous.rows] == order[(number - 1) * size:number * size]
+
+
+def test_null_cursor_round_trip():
+    assert pagination.decodeCursor(pagination.encodeCursor(None, 7)) == (None, 7)
@@ -0,0 +1,30 @@
+"""
+/reset-database (reset_database in app.py).
+"""
+
+import pytest
+import app as web
+import database.cache as cache
+import database.db_connector as db
+
+
+def reset(monkeypatch, executeDDL, url = "/reset-database"):
+    monkeypatch.setattr(db, "getConnection", lambda: None)
+    monkeypatch.setattr(db, "executeDDL", executeDDL)
+    return web.app.test_client().post(url, headers={"Accept": "application/json"})
+
+
+def test_failed_reset_still_clears_the_cache(monkeypatch):
+    def fail(dbConnection, query):
+        raise RuntimeError("INSERT INTO Teams SELECT * FROM seed_Teams failed")
+
+    cache.cached(("test", "reset"), ("Teams",), lambda: "before")
+    assert reset(monkeypatch, fail).status_code == 500
+    assert cache.cached(("test", "reset"), ("Teams",), lambda: "after") == "after"
+
+@pytest.mark.parametrize("mode, procedure", [("", "sp_reset_athleticsdb"), ("full", "sp_load_athleticsdb")])
+def test_reset_calls_the_procedure_for_its_mode(monkeypatch, mode, procedure):
+    calls = []
+    response = reset(monkeypatch, lambda dbConnection, query: calls.append(query), f"/reset-database?mode={mode}")
+    assert response.status_code == 200
+    assert calls == [f"CALL {procedure}();"]
@@ -0,0 +1,96 @@
+"""
+Round-robin pairing and slot matching (database/scheduler.py).
+"""
+
+import collections
+import datetime
+import pytest
+import database.scheduler as scheduler
+
+START = datetime.date(2024, 9, 2)
+
+
+def meetings(rounds):
+    return collections.Counter(frozenset(pair) for pairs in rounds for pair in pairs)
+
+def teams(count, schools = None):
+    # Team i belongs to school i unless schools maps it elsewhere
+    return [{"teamID": i, "schoolID": (schools or {}).get(i, i)} for i in range(1, count + 1)]
+
+
+@pytest.mark.parametrize("count", range(2, 11))
+@pytest.mark.parametrize("double", [False, True])
+def test_every_pair_meets_once_per_round_robin(count, double):
+    rounds = scheduler.roundRobin(range(1, count + 1), double)
+    pairs = meetings(rounds)
+    assert len(pairs) == count * (count - 1) // 2
+    assert set(pairs.values()) == {2 if double else 1}
+
+@pytest.mark.parametrize("count", range(2, 11))
+def test_double_round_robin_swaps_home_and_away(count):
+    rounds = scheduler.roundRobin(range(1, count + 1), double = True)
+    assert collections.Counter(pair for pairs in rounds for pair in pairs) == \
+        collections.Counter((away, home) for pairs in rounds for home, away in pairs)
+
+@pytest.mark.parametrize("count", range(2, 11))
+def test_no_team_plays_twice_in_a_round(count):
+    for pairs in scheduler.roundRobin(range(1, count + 1)):
+        playing = [team for pair in pairs for team in pair]
+        assert len(playing) == len(set(playing))
+
+@pytest.mark.parametrize("count", [3, 5, 7, 9])
+def test_odd_count_gets_one_bye_per_round(count):
+    rounds = scheduler.roundRobin(range(1, count + 1))
+    assert len(rounds) == count
+    byes = [set(range(1, count + 1)) - {team for pair in pairs for team in pair} for pairs in rounds]
+    assert all(len(sitting) == 1 for sitting in byes)
+    # Each team sits out exactly once
+    assert sorted(team for sitting in byes for team in sitting) == list(range(1, count + 1))
+
+
+def test_match_slots_never_shares_a_slot():
+    # Four games competing for three slots, with the preferred slot shared by all of them
+    slots = [(1, START), (1, START + datetime.timedelta(days = 1)), (2, START)]
+    candidates = [[slots[0], slots[1]], [slots[0]], [slots[0], slots[2]], [slots[0], slots[1], slots[2]]]
+    matched = scheduler.matchSlots(candidates)
+    assert len(matched) == 3
+    assert len(set(matched.values())) == len(matched)
+    assert all(slot in candidates[game] for game, slot in matched.items())
+
+def test_match_slots_moves_an_earlier_game_to_fit_a_later_one():
+    # Greedy would give game 0 slot "a" and leave game 1 without one
+    matched = scheduler.matchSlots([["a", "b"], ["a"]])
+    assert matched == {0: "b", 1: "a"}
+
+
+def test_build_schedule_places_every_game_in_its_round_window():
+    facilities = [{"facilityID": 10 + i, "schoolID": i} for i in range(1, 5)]
+    games, unscheduled = scheduler.buildSchedule(teams(4), facilities, [], START, roundDays = 7)
+    assert unscheduled == []
+    assert len(games) == 6
+    assert len({(game["facilityID"], game["gameDate"]) for game in games}) == len(games)
+    for game in games:
+        first = START + datetime.timedelta(days = (game["round"] - 1) * 7)
+        assert first <= game["gameDate"] < first + datetime.timedelta(days = 7)
+        # Played at the home school's facility
+        assert game["facilityID"] == 10 + game["homeTeamID"]
+
+def test_build_schedule_reports_games_without_a_slot():
+    # One facility and one day per round: only one of the two games in each round fits
+    facilities = [{"facilityID": 10, "schoolID": 1}]
+    schools = {team: 1 for team in range(1, 5)}
+    games, unscheduled = scheduler.buildSchedule(teams(4, schools), facilities, [], START, roundDays = 1)
+    assert len(games) == 3
+    assert len(unscheduled) == 3
+    assert sorted(game["round"] for game in games) == [1, 2, 3]
+    assert sorted(game["round"] for game in unscheduled) == [1, 2, 3]
+
+def test_build_schedule_skips_booked_slots_and_busy_teams():
+    facilities = [{"facilityID": 10, "schoolID": 1}, {"facilityID": 20, "schoolID": 2}]
+    bookings = [{"homeTeamID": 99, "awayTeamID": 98, "facilityID": 10, "gameDate": START},
+                {"homeTeamID": 2, "awayTeamID": 97, "facilityID": 30, "gameDate": START + datetime.timedelta(days = 1)}]
+    games, unscheduled = scheduler.buildSchedule(teams(2), facilities, bookings, START, roundDays = 3)
+    assert unscheduled == []
+    game, = games
+    assert (game["facilityID"], game["gameDate"]) != (10, START)
+    assert game["gameDate"] != START + datetime.timedelta(days = 1)
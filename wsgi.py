@@ -0,0 +1,13 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py sets the number of worker processes and threads, loads the app
+once in the parent before forking, and opens / closes each worker's database
+connections. `python app.py` still runs the single-process development server.
+"""
+
+from app import app
+
+application = app